@@ -1,20 +1,55 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
+from flask import (
+    Flask,
+    Response,
+    render_template,
+    request,
+    jsonify,
+    redirect,
+    stream_with_context,
+    url_for,
+    flash,
+)
 from flask_sqlalchemy import SQLAlchemy
 from apscheduler.schedulers.background import BackgroundScheduler
 from datetime import datetime
 import os
 import atexit
+import json
 import re
+import tempfile
 import threading
-from models import db, Setting, Guest, ActionLog
+from sqlalchemy import insert
+from models import db, Setting, Guest, ActionLog, normalize_name
 from services.sheets import (
     parse_public_url,
     to_csv_url,
-    fetch_csv_data,
+    fetch_csv_if_changed,
+    get_fetch_stats,
     process_guest_data,
+    saved_fetch_state,
+    save_fetch_state,
+    clear_fetch_state,
 )
+from services.classifier import SHEET_RULES
+from services.pagination import keyset_paginate
+from services.schema import upgrade_schema
 from services.outreach import messenger_link
-from services.ollama import draft_message
+from services.drafting import draft_page_messages, stream_page_messages
+from services import (
+    columns,
+    csv_import,
+    database,
+    dedup,
+    draft_cache,
+    http_client,
+    ollama_monitor,
+    pregenerate,
+    search,
+    sheets,
+    stats,
+    sync,
+    worker_lock,
+)
 import random
 import hashlib
 from pathlib import Path
@@ -28,12 +63,134 @@ app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get(
 )
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
+# SQLite connection settings (see services/database.py); an empty value keeps
+# SQLite's default
+app.config["SQLITE_JOURNAL_MODE"] = os.environ.get("SQLITE_JOURNAL_MODE", "wal")
+app.config["SQLITE_BUSY_TIMEOUT_MS"] = int(
+    os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 10000)
+)
+app.config["SQLITE_SYNCHRONOUS"] = os.environ.get("SQLITE_SYNCHRONOUS", "normal")
+app.config["SQLITE_CACHE_SIZE_MB"] = float(os.environ.get("SQLITE_CACHE_SIZE_MB", 64))
+app.config["SQLITE_MMAP_SIZE_MB"] = float(os.environ.get("SQLITE_MMAP_SIZE_MB", 256))
+database.configure(
+    journal_mode=app.config["SQLITE_JOURNAL_MODE"] or None,
+    busy_timeout_ms=app.config["SQLITE_BUSY_TIMEOUT_MS"],
+    synchronous=app.config["SQLITE_SYNCHRONOUS"] or None,
+    cache_size_mb=app.config["SQLITE_CACHE_SIZE_MB"],
+    mmap_size_mb=app.config["SQLITE_MMAP_SIZE_MB"],
+)
+
+# Concurrent drafting for the review page
+app.config["DRAFT_MAX_WORKERS"] = int(os.environ.get("DRAFT_MAX_WORKERS", 4))
+app.config["DRAFT_PAGE_DEADLINE"] = float(os.environ.get("DRAFT_PAGE_DEADLINE", 8))
+# Names per Ollama request; above 1 drafts several guests with one prompt
+app.config["DRAFT_BATCH_SIZE"] = int(os.environ.get("DRAFT_BATCH_SIZE", 1))
+app.config["DRAFT_CACHE_TTL_HOURS"] = float(
+    os.environ.get("DRAFT_CACHE_TTL_HOURS", 168)
+)
+app.config["DRAFT_CACHE_MAX_ENTRIES"] = int(
+    os.environ.get("DRAFT_CACHE_MAX_ENTRIES", 5000)
+)
+# Draft on the request thread when a guest has no pre-generated message yet
+app.config["DRAFT_INLINE_ON_MISS"] = (
+    os.environ.get("DRAFT_INLINE_ON_MISS", "true").lower() == "true"
+)
+# Stream drafts into the review page instead of waiting for the whole page
+app.config["REVIEW_STREAMING"] = (
+    os.environ.get("REVIEW_STREAMING", "true").lower() == "true"
+)
+app.config["REVIEW_STREAM_DEADLINE"] = float(
+    os.environ.get("REVIEW_STREAM_DEADLINE", 30)
+)
+
+# Background pre-generation of drafts for guests needing an address
+app.config["PREGENERATE_DRAFTS"] = (
+    os.environ.get("PREGENERATE_DRAFTS", "true").lower() == "true"
+)
+app.config["PREGEN_INTERVAL_SECONDS"] = int(
+    os.environ.get("PREGEN_INTERVAL_SECONDS", 60)
+)
+app.config["PREGEN_BATCH_SIZE"] = int(os.environ.get("PREGEN_BATCH_SIZE", 10))
+app.config["PREGEN_MAX_ATTEMPTS"] = int(os.environ.get("PREGEN_MAX_ATTEMPTS", 3))
+app.config["PREGEN_SATURATION_SECONDS"] = float(
+    os.environ.get("PREGEN_SATURATION_SECONDS", 20)
+)
+app.config["PREGEN_PAUSE_SECONDS"] = float(os.environ.get("PREGEN_PAUSE_SECONDS", 300))
+
+# Shared keep-alive HTTP session for Ollama and Google Sheets
+app.config["HTTP_POOL_CONNECTIONS"] = int(os.environ.get("HTTP_POOL_CONNECTIONS", 4))
+app.config["HTTP_POOL_MAXSIZE"] = int(os.environ.get("HTTP_POOL_MAXSIZE", 10))
+app.config["HTTP_MAX_RETRIES"] = int(os.environ.get("HTTP_MAX_RETRIES", 2))
+app.config["HTTP_BACKOFF_FACTOR"] = float(os.environ.get("HTTP_BACKOFF_FACTOR", 0.3))
+http_client.configure(
+    pool_connections=app.config["HTTP_POOL_CONNECTIONS"],
+    pool_maxsize=app.config["HTTP_POOL_MAXSIZE"],
+    max_retries=app.config["HTTP_MAX_RETRIES"],
+    backoff_factor=app.config["HTTP_BACKOFF_FACTOR"],
+)
+
+# Ollama availability is probed in the background, never on the request path
+app.config["OLLAMA_HEALTH_INTERVAL"] = float(
+    os.environ.get("OLLAMA_HEALTH_INTERVAL", 30)
+)
+app.config["OLLAMA_FAILURE_THRESHOLD"] = int(
+    os.environ.get("OLLAMA_FAILURE_THRESHOLD", 3)
+)
+app.config["OLLAMA_CIRCUIT_OPEN_SECONDS"] = float(
+    os.environ.get("OLLAMA_CIRCUIT_OPEN_SECONDS", 120)
+)
+ollama_monitor.configure(
+    interval=app.config["OLLAMA_HEALTH_INTERVAL"],
+    failure_threshold=app.config["OLLAMA_FAILURE_THRESHOLD"],
+    open_seconds=app.config["OLLAMA_CIRCUIT_OPEN_SECONDS"],
+)
+
+# Dashboard counts are cached and kept current by edits made in any worker
+# (they bump Setting.stats_generation); the TTL bounds staleness from changes
+# made by scripts or other tools
+app.config["DASHBOARD_STATS_TTL"] = float(os.environ.get("DASHBOARD_STATS_TTL", 60))
+stats.configure(ttl=app.config["DASHBOARD_STATS_TTL"])
+
+# Name similarity (0-100) at which guests are reported as likely duplicates
+app.config["DEDUP_THRESHOLD"] = float(
+    os.environ.get("DEDUP_THRESHOLD", dedup.DEFAULT_THRESHOLD)
+)
+
+# Most operations accepted by one /bulk-update-guests request
+app.config["BULK_UPDATE_MAX_OPERATIONS"] = int(
+    os.environ.get("BULK_UPDATE_MAX_OPERATIONS", 1000)
+)
+
+# Minutes between background Google Sheets syncs
+app.config["SHEETS_SYNC_INTERVAL"] = float(os.environ.get("SHEETS_SYNC_INTERVAL", 30))
+
+# Parser for sheet exports: "csv" (stdlib, pandas never loaded) or "pandas"
+app.config["CSV_PARSER"] = os.environ.get("CSV_PARSER", "csv")
+sheets.configure(csv_parser=app.config["CSV_PARSER"])
+
+# Background jobs run in one process only: with several web workers the
+# first one to lock this file runs the scheduler
+app.config["SCHEDULER_LOCK_FILE"] = os.environ.get(
+    "SCHEDULER_LOCK_FILE",
+    os.path.join(tempfile.gettempdir(), "wedding_outreach_scheduler.lock"),
+)
+
+# When background jobs start: "first_request" once the process serves
+# traffic, "startup" in create_app(), "off" only via start_background_jobs()
+app.config["SCHEDULER_START"] = os.environ.get("SCHEDULER_START", "first_request")
+
+# Importing the app never touches the database; tables are created by
+# `flask init-db` unless this is set
+app.config["INIT_DB_ON_START"] = (
+    os.environ.get("INIT_DB_ON_START", "false").lower() == "true"
+)
+
 db.init_app(app)
 
-# Initialize scheduler
+# Started by start_background_jobs() in the process holding the scheduler lock
 scheduler = BackgroundScheduler()
-scheduler.start()
-atexit.register(lambda: scheduler.shutdown())
+_background_jobs = {"started": False}
+_background_jobs_lock = threading.Lock()
 
 # Global lock for sheet synchronization
 _sheet_sync_lock = threading.Lock()
@@ -78,7 +235,49 @@ def refresh_sheet_data():
             print(f"Background refresh failed: {e}")
 
 
-def sync_guests_from_sheet(csv_url):
+def check_ollama():
+    """Background job to refresh the cached Ollama availability"""
+    with app.app_context():
+        try:
+            setting = Setting.query.first()
+            if setting and setting.ollama_base:
+                ollama_monitor.get_status(setting.ollama_base)
+        except Exception as e:
+            print(f"Ollama health check failed: {e}")
+
+
+def pregenerate_drafts():
+    """Background job to draft messages ahead of the reviewer"""
+    with app.app_context():
+        try:
+            setting = Setting.query.first()
+            if (
+                setting
+                and setting.ollama_base
+                and setting.ollama_model
+                and ollama_monitor.is_available(setting.ollama_base)
+            ):
+                pregenerate.run_batch(
+                    setting.ollama_base,
+                    setting.ollama_model,
+                    get_wedding_details(setting),
+                    first_name=get_first_name,
+                    # Leave some slack so runs don't pile up behind each other
+                    time_budget=app.config["PREGEN_INTERVAL_SECONDS"] * 0.8,
+                    batch_size=app.config["PREGEN_BATCH_SIZE"],
+                    saturation_seconds=app.config["PREGEN_SATURATION_SECONDS"],
+                    pause_seconds=app.config["PREGEN_PAUSE_SECONDS"],
+                    max_attempts=app.config["PREGEN_MAX_ATTEMPTS"],
+                    cache_max_entries=app.config["DRAFT_CACHE_MAX_ENTRIES"],
+                    cache_ttl_hours=app.config["DRAFT_CACHE_TTL_HOURS"],
+                    prompt_batch_size=app.config["DRAFT_BATCH_SIZE"],
+                )
+        except Exception as e:
+            db.session.rollback()
+            print(f"Draft pre-generation failed: {e}")
+
+
+def sync_guests_from_sheet(csv_url, force=False):
     """Sync guests from Google Sheets CSV URL with proper locking"""
     # Acquire lock to prevent concurrent syncs
     if not _sheet_sync_lock.acquire(blocking=False):
@@ -90,24 +289,49 @@ def sync_guests_from_sheet(csv_url):
             db.session.begin()
             
             try:
-                df = fetch_csv_data(csv_url)
-                guests_data = process_guest_data(df)
-
-                # Use a more robust replacement strategy
-                # First, get existing guest IDs to preserve any custom data
-                existing_guests = {g.name.lower(): g for g in Guest.query.all()}
-                
-                # Clear existing guests
-                Guest.query.delete()
-                
-                # Add new guests
-                for guest_data in guests_data:
-                    guest = Guest(**guest_data)
-                    db.session.add(guest)
-
+                setting = Setting.query.first()
+
+                # Skip parsing and syncing when the export hasn't changed
+                # since the last sync applied by any worker
+                previous = None if force else saved_fetch_state(setting, csv_url)
+                df, validators = fetch_csv_if_changed(csv_url, previous)
+                if df is None:
+                    db.session.rollback()
+                    return {
+                        "total": stats.guest_counts()["total"],
+                        "inserted": 0,
+                        "updated": 0,
+                        "deleted": 0,
+                        "unchanged": 0,
+                        "skipped": True,
+                        "seconds": 0.0,
+                    }
+
+                # Headers rarely change between syncs, so reuse the mapping
+                # stored for them instead of detecting again
+                headers = list(df.columns)
+                mapping, cached = columns.mapping_for(headers, setting)
+                guests_data = process_guest_data(df, mapping)
+                if setting and not cached:
+                    columns.store_mapping(setting, headers, mapping)
+
+                # Apply only the rows that changed so guest ids, history and
+                # manual edits survive the sync
+                summary = sync.sync_guests(guests_data)
+                summary["skipped"] = False
+
+                if setting:
+                    save_fetch_state(setting, csv_url, validators)
                 db.session.commit()
-                return len(guests_data)
-                
+                if summary["inserted"] or summary["updated"] or summary["deleted"]:
+                    stats.invalidate()
+                app.logger.info(
+                    "Sheet sync: %(inserted)d added, %(updated)d updated, "
+                    "%(deleted)d deleted, %(unchanged)d unchanged in %(seconds).2fs",
+                    summary,
+                )
+                return summary
+
             except Exception as e:
                 db.session.rollback()
                 raise e
@@ -116,8 +340,11 @@ def sync_guests_from_sheet(csv_url):
 
 
 def create_tables():
-    """Create tables and seed default setting if needed"""
+    """Create tables, upgrade older databases and seed default setting if needed"""
     db.create_all()
+    for change in upgrade_schema():
+        app.logger.info("Schema upgrade: %s", change)
+    search.ensure_search_index()
 
     # Create default setting if none exists
     if not Setting.query.first():
@@ -128,6 +355,24 @@ def create_tables():
         db.session.commit()
 
 
+def get_first_name(name):
+    """First name used to personalize a guest's message"""
+    return name.split()[0] if name else "there"
+
+
+def get_wedding_details(setting):
+    """Wedding details used to personalize messages, or None without settings"""
+    if not setting:
+        return None
+
+    return {
+        "bride_name": setting.bride_name or "Jessica",
+        "groom_name": setting.groom_name or "Charles",
+        "wedding_date": setting.wedding_date or "",
+        "message_sender": setting.message_sender or "both",
+    }
+
+
 def generate_funny_message(first_name, wedding_details=None):
     """Generate a unique, funny, personalized message for each guest"""
 
@@ -211,29 +456,111 @@ def generate_funny_message(first_name, wedding_details=None):
     return selected_message
 
 
-# Initialize database
-with app.app_context():
-    create_tables()
+def init_db():
+    """Create and upgrade tables and the search index, one process at a time"""
+    with app.app_context(), worker_lock.exclusive(
+        app.config["SCHEDULER_LOCK_FILE"] + ".init"
+    ):
+        create_tables()
+
+
+def start_background_jobs():
+    """
+    Schedule the background jobs and start the scheduler, once per process.
+
+    Only the process holding the scheduler lock starts it; in the others this
+    returns False and does nothing.
+    """
+    with _background_jobs_lock:
+        if _background_jobs["started"]:
+            return scheduler.running
+        _background_jobs["started"] = True
+
+        if not worker_lock.acquire_leader(app.config["SCHEDULER_LOCK_FILE"]):
+            return False
+
+        # Sync the Google Sheet in the background; a no-op until a sheet URL
+        # is saved
+        scheduler.add_job(
+            func=refresh_sheet_data,
+            trigger="interval",
+            minutes=app.config["SHEETS_SYNC_INTERVAL"],
+            id="refresh_sheet",
+            max_instances=1,
+            coalesce=True,
+            replace_existing=True,
+        )
+
+        # Refresh Ollama availability ahead of requests so /review only reads it
+        scheduler.add_job(
+            func=check_ollama,
+            trigger="interval",
+            seconds=app.config["OLLAMA_HEALTH_INTERVAL"],
+            id="check_ollama",
+            max_instances=1,
+            coalesce=True,
+            replace_existing=True,
+        )
+
+        # Keep drafting ahead of the reviewer; progress lives in the draft cache
+        if app.config["PREGENERATE_DRAFTS"]:
+            scheduler.add_job(
+                func=pregenerate_drafts,
+                trigger="interval",
+                seconds=app.config["PREGEN_INTERVAL_SECONDS"],
+                id="pregenerate_drafts",
+                max_instances=1,
+                coalesce=True,
+                replace_existing=True,
+            )
+
+        scheduler.start()
+        atexit.register(lambda: scheduler.shutdown())
+        return True
+
+
+def create_app():
+    """
+    Prepare this process to serve requests and return the app.
+
+    Importing this module only configures the app. Database setup and the
+    scheduler are per-process startup work done here (or later), so CLI
+    commands, scripts and idle workers start fast.
+    """
+    if app.config["INIT_DB_ON_START"]:
+        init_db()
+    if app.config["SCHEDULER_START"] == "startup":
+        start_background_jobs()
+    return app
+
+
+@app.before_request
+def start_background_jobs_on_first_request():
+    """Start the scheduler once this process is serving traffic"""
+    if (
+        not _background_jobs["started"]
+        and app.config["SCHEDULER_START"] == "first_request"
+    ):
+        start_background_jobs()
+
+
+@app.cli.command("init-db")
+def init_db_command():
+    """Create tables, upgrade older databases and build the search index."""
+    init_db()
+    print("Database initialized")
 
 
 @app.route("/")
 def dashboard():
     """Dashboard with guest counts"""
-    total_guests = Guest.query.count()
-    with_address = Guest.query.filter_by(status="has_address").count()
-    requested = Guest.query.filter_by(status="requested").count()
-    not_on_fb = Guest.query.filter_by(status="not_on_fb").count()
-    needs_address = Guest.query.filter_by(status="needs_address").count()
-
-    stats = {
-        "total": total_guests,
-        "with_address": with_address,
-        "requested": requested,
-        "not_on_fb": not_on_fb,
-        "needs_address": needs_address,
-    }
+    return render_template("index.html", stats=stats.guest_counts())
+
 
-    return render_template("index.html", stats=stats)
+@app.route("/dashboard-stats")
+def dashboard_stats():
+    """Guest counts per status, for refreshing the dashboard without a reload"""
+    return jsonify(stats.guest_counts())
 
 
 @app.route("/settings", methods=["GET", "POST"])
@@ -255,6 +582,12 @@ def settings():
             setting = Setting()
             db.session.add(setting)
 
+        # Remember what cached drafts were generated with
+        old_draft_key = (
+            setting.ollama_model,
+            draft_cache.wedding_details_hash(get_wedding_details(setting)),
+        )
+
         setting.sheet_public_url = sheet_url
         setting.ollama_base = ollama_base
         setting.ollama_model = ollama_model
@@ -279,19 +612,19 @@ def settings():
             setting.gid = None
             setting.csv_url = None
 
+        # Drafts no longer match the model or wedding details, drop them
+        new_draft_key = (
+            setting.ollama_model,
+            draft_cache.wedding_details_hash(get_wedding_details(setting)),
+        )
+        if new_draft_key != old_draft_key:
+            draft_cache.invalidate_all()
+            pregenerate.reset_failures()
+
         db.session.commit()
 
-        # Schedule background refresh every 30 minutes
-        if setting.csv_url:
-            if scheduler.get_job("refresh_sheet"):
-                scheduler.remove_job("refresh_sheet")
-            scheduler.add_job(
-                func=refresh_sheet_data,
-                trigger="interval",
-                minutes=30,
-                id="refresh_sheet",
-                replace_existing=True,
-            )
+        # The scheduled refresh_sheet job picks up the new URL on its next run,
+        # whichever worker runs the scheduler
 
         return redirect(url_for("settings"))
 
@@ -307,12 +640,19 @@ def refresh_sheet():
         return jsonify({"error": "No CSV URL configured"}), 400
 
     try:
-        count = sync_guests_from_sheet(setting.csv_url)
-        return jsonify({"success": True, "count": count})
+        data = request.get_json(silent=True) or {}
+        summary = sync_guests_from_sheet(setting.csv_url, force=bool(data.get("force")))
+        return jsonify({"success": True, "count": summary["total"], "changes": summary})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/sheet-sync-stats")
+def sheet_sync_stats():
+    """How many sheet fetches were parsed vs skipped as unchanged"""
+    return jsonify({**get_fetch_stats(), "columns": columns.get_stats()})
+
+
 @app.route("/review")
 def review():
     """Review page with guest filtering and messaging"""
@@ -328,25 +668,93 @@ def review():
     if status_filter and status_filter != "all":
         query = query.filter_by(status=status_filter)
 
+    # Full-text search over name, address and note, best matches first.
+    # Ranked results are paged by offset; browsing seeks by (name, id)
     if search_query:
-        safe_query = sanitize_search_query(search_query)
-        query = query.filter(Guest.name.ilike(f"%{safe_query}%"))
+        query = search.apply_search(query, sanitize_search_query(search_query))
+        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    else:
+        pagination = keyset_paginate(
+            query,
+            per_page,
+            cursor=request.args.get("cursor"),
+            page=page,
+            total=stats.status_count(status_filter),
+        )
 
-    # Add pagination
-    pagination = query.order_by(Guest.name).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
     guests = pagination.items
 
     # Get current settings for Ollama
     setting = Setting.query.first()
 
-    # Check if Ollama is available (quick test with 2-second timeout)
+    # Cached availability from the background monitor; never blocks the page
     ollama_available = False
     if setting and setting.ollama_base and setting.ollama_model:
-        from services.ollama import test_ollama_connection
+        ollama_available = ollama_monitor.is_available(setting.ollama_base)
+
+    # Prepare wedding details for personalization
+    wedding_details = get_wedding_details(setting)
+
+    # Get first name only
+    first_names = {
+        guest.id: get_first_name(guest.name) for guest in guests
+    }
 
-        ollama_available, _ = test_ollama_connection(setting.ollama_base, timeout=2)
+    # Reuse previously drafted messages so paging back and forth is instant
+    messages = {}
+    if setting and setting.ollama_model:
+        messages = draft_cache.get_cached_messages(
+            first_names,
+            setting.ollama_model,
+            wedding_details,
+            ttl_hours=app.config["DRAFT_CACHE_TTL_HOURS"],
+        )
+    missing = {
+        guest_id: first_name
+        for guest_id, first_name in first_names.items()
+        if guest_id not in messages
+    }
+
+    # Generate messages - use Ollama only if it's available and responsive
+    draft_stats = None
+    stream_guest_ids = []
+    if missing and ollama_available and app.config["REVIEW_STREAMING"]:
+        # Render the page straight away; drafts stream in via /review/stream
+        stream_guest_ids = list(missing)
+        for guest_id in missing:
+            messages[guest_id] = ""
+    elif missing and ollama_available and app.config["DRAFT_INLINE_ON_MISS"]:
+        drafted, draft_stats = draft_page_messages(
+            missing,
+            setting.ollama_base,
+            setting.ollama_model,
+            wedding_details,
+            fallback=lambda name: generate_funny_message(name, wedding_details),
+            timeout=5,
+            max_workers=app.config["DRAFT_MAX_WORKERS"],
+            deadline=app.config["DRAFT_PAGE_DEADLINE"],
+            batch_size=app.config["DRAFT_BATCH_SIZE"],
+        )
+        app.logger.info(
+            "Drafted %d messages in %.2fs (%d fell back, %d cached)",
+            draft_stats["count"],
+            draft_stats["seconds"],
+            draft_stats["fallbacks"],
+            len(messages),
+        )
+        messages.update(drafted)
+        draft_cache.store_messages(
+            {key: drafted[key] for key in draft_stats["drafted_keys"]},
+            missing,
+            setting.ollama_model,
+            wedding_details,
+            max_entries=app.config["DRAFT_CACHE_MAX_ENTRIES"],
+            ttl_hours=app.config["DRAFT_CACHE_TTL_HOURS"],
+        )
+    else:
+        # Generate a unique, funny message for each person
+        for guest_id, first_name in missing.items():
+            messages[guest_id] = generate_funny_message(first_name, wedding_details)
 
     # Prepare guest data with messenger links and messages
     guest_data = []
@@ -366,48 +774,120 @@ def review():
                 else "https://www.facebook.com/messages"
             )
 
-        # Get first name only
-        first_name = guest.name.split()[0] if guest.name else "there"
+        guest_data.append(
+            {"guest": guest, "messenger_link": msg_link, "message": messages[guest.id]}
+        )
 
-        # Prepare wedding details for personalization
-        wedding_details = (
-            {
-                "bride_name": setting.bride_name or "Jessica",
-                "groom_name": setting.groom_name or "Charles",
-                "wedding_date": setting.wedding_date or "",
-                "message_sender": setting.message_sender or "both",
-            }
-            if setting
-            else None
+    return render_template(
+        "review.html",
+        guest_data=guest_data,
+        current_filter=status_filter,
+        search_query=search_query,
+        pagination=pagination,
+        draft_stats=draft_stats,
+        stream_guest_ids=stream_guest_ids,
+    )
+
+
+@app.route("/review/stream")
+def review_stream():
+    """Stream drafted messages for review page guests as Server-Sent Events"""
+    guest_ids = [
+        int(guest_id)
+        for guest_id in request.args.get("ids", "").split(",")
+        if guest_id.strip().isdigit()
+    ][:100]
+    guests = Guest.query.filter(Guest.id.in_(guest_ids)).all() if guest_ids else []
+    setting = Setting.query.first()
+    wedding_details = get_wedding_details(setting)
+    first_names = {guest.id: get_first_name(guest.name) for guest in guests}
+
+    cached = {}
+    if setting and setting.ollama_model:
+        cached = draft_cache.get_cached_messages(
+            first_names,
+            setting.ollama_model,
+            wedding_details,
+            ttl_hours=app.config["DRAFT_CACHE_TTL_HOURS"],
         )
+    missing = {
+        guest_id: first_name
+        for guest_id, first_name in first_names.items()
+        if guest_id not in cached
+    }
 
-        # Generate message - use Ollama only if it's available and responsive
-        if ollama_available:
-            message = draft_message(
-                first_name,
+    def sse(event):
+        return f"data: {json.dumps(event)}\n\n"
+
+    def generate():
+        # Drafts finished since the page rendered (e.g. by pre-generation)
+        for guest_id, message in cached.items():
+            yield sse(
+                {
+                    "type": "done",
+                    "guest_id": guest_id,
+                    "message": message,
+                    "drafted": True,
+                }
+            )
+
+        if not missing:
+            yield "event: end\ndata: {}\n\n"
+            return
+
+        drafted = {}
+        if (
+            setting
+            and setting.ollama_base
+            and setting.ollama_model
+            and ollama_monitor.is_available(setting.ollama_base)
+        ):
+            events = stream_page_messages(
+                missing,
                 setting.ollama_base,
                 setting.ollama_model,
                 wedding_details,
-                timeout=5,
+                fallback=lambda name: generate_funny_message(name, wedding_details),
+                timeout=10,
+                max_workers=app.config["DRAFT_MAX_WORKERS"],
+                deadline=app.config["REVIEW_STREAM_DEADLINE"],
             )
         else:
-            # Generate a unique, funny message for each person
-            message = generate_funny_message(first_name, wedding_details)
+            events = (
+                {
+                    "type": "done",
+                    "guest_id": guest_id,
+                    "message": generate_funny_message(first_name, wedding_details),
+                    "drafted": False,
+                }
+                for guest_id, first_name in missing.items()
+            )
 
-        guest_data.append(
-            {"guest": guest, "messenger_link": msg_link, "message": message}
-        )
+        for event in events:
+            if event["type"] == "done" and event["drafted"]:
+                drafted[event["guest_id"]] = event["message"]
+            yield sse(event)
 
-    return render_template(
-        "review.html",
-        guest_data=guest_data,
-        current_filter=status_filter,
-        search_query=search_query,
-        pagination=pagination,
+        if drafted:
+            draft_cache.store_messages(
+                drafted,
+                missing,
+                setting.ollama_model,
+                wedding_details,
+                max_entries=app.config["DRAFT_CACHE_MAX_ENTRIES"],
+                ttl_hours=app.config["DRAFT_CACHE_TTL_HOURS"],
+            )
+        yield "event: end\ndata: {}\n\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
 @app.route("/mark/<int:guest_id>/<action>", methods=["POST"])
+@database.serialized_write
 def mark_guest(guest_id, action):
     """Mark guest with specific action (requested, not_on_fb)"""
     guest = Guest.query.get_or_404(guest_id)
@@ -427,10 +907,79 @@ def mark_guest(guest_id, action):
     )
     db.session.add(action_log)
     db.session.commit()
+    stats.adjust(old_status, action)
 
     return jsonify({"success": True, "new_status": action})
 
 
+@app.route("/regenerate-message/<int:guest_id>", methods=["POST"])
+def regenerate_message(guest_id):
+    """Discard a guest's cached draft and draft a fresh message"""
+    guest = Guest.query.get_or_404(guest_id)
+    setting = Setting.query.first()
+    wedding_details = get_wedding_details(setting)
+    first_name = get_first_name(guest.name)
+
+    draft_cache.invalidate_guest(guest.id)
+    pregenerate.reset_failures(guest.id)
+    db.session.commit()
+
+    message = None
+    if setting and setting.ollama_base and setting.ollama_model:
+        from services.ollama import generate_message
+
+        message = generate_message(
+            first_name,
+            setting.ollama_base,
+            setting.ollama_model,
+            wedding_details,
+            timeout=10,
+        )
+
+    if message:
+        draft_cache.store_messages(
+            {guest.id: message},
+            {guest.id: first_name},
+            setting.ollama_model,
+            wedding_details,
+            max_entries=app.config["DRAFT_CACHE_MAX_ENTRIES"],
+            ttl_hours=app.config["DRAFT_CACHE_TTL_HOURS"],
+        )
+    else:
+        message = generate_funny_message(first_name, wedding_details)
+
+    return jsonify({"success": True, "message": message})
+
+
+@app.route("/draft-progress")
+def draft_progress():
+    """Progress of background message pre-generation"""
+    setting = Setting.query.first()
+
+    if not setting or not setting.ollama_model:
+        return jsonify({"error": "No Ollama model configured"}), 400
+
+    progress = pregenerate.get_progress(
+        setting.ollama_model,
+        get_wedding_details(setting),
+        ttl_hours=app.config["DRAFT_CACHE_TTL_HOURS"],
+        max_attempts=app.config["PREGEN_MAX_ATTEMPTS"],
+    )
+    return jsonify(progress)
+
+
+@app.route("/database-stats")
+def database_stats():
+    """SQLite PRAGMAs in use and how often writers waited for each other"""
+    return jsonify(database.get_stats())
+
+
+@app.route("/connection-stats")
+def connection_stats():
+    """Connection reuse of the shared Ollama/Sheets HTTP session"""
+    return jsonify(http_client.connection_stats())
+
+
 @app.route("/manage-guests")
 def manage_guests():
     """Manage guests page with editable spreadsheet"""
@@ -446,14 +995,20 @@ def manage_guests():
     if status_filter and status_filter != "all":
         query = query.filter_by(status=status_filter)
 
+    # Full-text search over name, address and note, best matches first.
+    # Ranked results are paged by offset; browsing seeks by (name, id)
     if search_query:
-        safe_query = sanitize_search_query(search_query)
-        query = query.filter(Guest.name.ilike(f"%{safe_query}%"))
+        query = search.apply_search(query, sanitize_search_query(search_query))
+        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    else:
+        pagination = keyset_paginate(
+            query,
+            per_page,
+            cursor=request.args.get("cursor"),
+            page=page,
+            total=stats.status_count(status_filter),
+        )
 
-    # Add pagination
-    pagination = query.order_by(Guest.name).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
     guests = pagination.items
 
     return render_template(
@@ -465,23 +1020,30 @@ def manage_guests():
     )
 
 
-@app.route("/update-guest/<int:guest_id>", methods=["POST"])
-def update_guest(guest_id):
-    """Update guest information via AJAX"""
-    guest = Guest.query.get_or_404(guest_id)
+GUEST_FIELDS = ["name", "address", "note", "facebook_profile", "status"]
+GUEST_STATUSES = ["needs_address", "has_address", "requested", "not_on_fb"]
 
-    data = request.get_json()
-    field = data.get("field")
-    value = data.get("value", "").strip()
 
-    if field not in ["name", "address", "note", "facebook_profile", "status"]:
-        return jsonify({"success": False, "error": "Invalid field"})
+def apply_guest_update(guest, field, value):
+    """
+    Validate one field edit and apply it to a guest (not committed).
+
+    Changing the address also updates the status, as the edit page expects.
+
+    Returns:
+        (stored value, None) on success or (None, error message)
+    """
+    if field not in GUEST_FIELDS:
+        return None, "Invalid field"
+
+    value = (value or "").strip()
 
     # Validate and sanitize the value based on field type
-    if field in ["name", "address", "note", "facebook_profile"]:
+    if field == "status":
+        if value not in GUEST_STATUSES:
+            return None, "Invalid status value"
+    else:
         value = validate_settings_input(value, 500 if field == "address" else 255)
-    elif field == "status" and value not in ["needs_address", "has_address", "requested", "not_on_fb"]:
-        return jsonify({"success": False, "error": "Invalid status value"})
 
     # Update the field
     setattr(guest, field, value)
@@ -497,33 +1059,173 @@ def update_guest(guest_id):
 
             guest.status = determine_guest_status(guest.note, "")
 
+    return value, None
+
+
+@app.route("/update-guest/<int:guest_id>", methods=["POST"])
+@database.serialized_write
+def update_guest(guest_id):
+    """Update guest information via AJAX"""
+    guest = Guest.query.get_or_404(guest_id)
+
+    data = request.get_json()
+    field = data.get("field")
+    old_status = guest.status
+
+    value, error = apply_guest_update(guest, field, data.get("value", ""))
+    if error:
+        return jsonify({"success": False, "error": error})
+
     # Log the change
     action_log = ActionLog(
         guest_id=guest.id, action=f"update_{field}", meta=f"Updated {field} to: {value}"
     )
     db.session.add(action_log)
     db.session.commit()
+    stats.adjust(old_status, guest.status)
 
     return jsonify({"success": True, "new_value": value, "new_status": guest.status})
 
 
+@app.route("/bulk-update-guests", methods=["POST"])
+@database.serialized_write
+def bulk_update_guests():
+    """Apply many guest edits or status changes in one transaction"""
+    data = request.get_json(silent=True) or {}
+    operations = data.get("operations")
+
+    if not isinstance(operations, list) or not operations:
+        return jsonify({"success": False, "error": "No operations given"}), 400
+    if len(operations) > app.config["BULK_UPDATE_MAX_OPERATIONS"]:
+        return (
+            jsonify(
+                {
+                    "success": False,
+                    "error": "Too many operations (max "
+                    f"{app.config['BULK_UPDATE_MAX_OPERATIONS']})",
+                }
+            ),
+            400,
+        )
+
+    operations = [op if isinstance(op, dict) else {} for op in operations]
+    for op in operations:
+        if not isinstance(op.get("guest_id"), int):
+            op["guest_id"] = None
+
+    # Load every guest involved in one query
+    guest_ids = {op["guest_id"] for op in operations} - {None}
+    guests = {
+        guest.id: guest
+        for guest in Guest.query.filter(Guest.id.in_(guest_ids)).all()
+    }
+
+    old_statuses = {guest_id: guest.status for guest_id, guest in guests.items()}
+    results = []
+    logs = []
+    now = datetime.utcnow()
+
+    for op in operations:
+        guest = guests.get(op["guest_id"])
+        if guest is None:
+            results.append(
+                {
+                    "guest_id": op["guest_id"],
+                    "success": False,
+                    "error": "Guest not found",
+                }
+            )
+            continue
+
+        # {"guest_id", "status"} is shorthand for a status change, logged
+        # like /mark; {"guest_id", "field", "value"} edits like /update-guest
+        if "field" in op:
+            field, value = op.get("field"), op.get("value", "")
+        else:
+            field, value = "status", op.get("status")
+        previous_status = guest.status
+
+        if not isinstance(value, str):
+            error = "Invalid value"
+        else:
+            value, error = apply_guest_update(guest, field, value)
+        if error:
+            results.append({"guest_id": guest.id, "success": False, "error": error})
+            continue
+
+        if "field" in op:
+            logs.append(
+                {
+                    "guest_id": guest.id,
+                    "action": f"update_{field}",
+                    "meta": f"Updated {field} to: {value}",
+                    "ts": now,
+                }
+            )
+        else:
+            logs.append(
+                {
+                    "guest_id": guest.id,
+                    "action": f"mark_{value}",
+                    "meta": f"Changed from {previous_status} to {value}",
+                    "ts": now,
+                }
+            )
+        results.append(
+            {
+                "guest_id": guest.id,
+                "success": True,
+                "new_value": value,
+                "new_status": guest.status,
+            }
+        )
+
+    try:
+        if logs:
+            db.session.execute(insert(ActionLog), logs)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Bulk guest update failed: {e}")
+        return jsonify({"success": False, "error": "Could not save changes"}), 500
+
+    for guest_id, old_status in old_statuses.items():
+        stats.adjust(old_status, guests[guest_id].status)
+
+    applied = sum(1 for result in results if result["success"])
+    return jsonify(
+        {
+            "success": True,
+            "applied": applied,
+            "failed": len(results) - applied,
+            "results": results,
+        }
+    )
+
+
 @app.route("/delete-guest/<int:guest_id>", methods=["POST"])
+@database.serialized_write
 def delete_guest(guest_id):
     """Delete a guest"""
     guest = Guest.query.get_or_404(guest_id)
     guest_name = guest.name
+    guest_status = guest.status
 
-    # Delete related action logs
+    # Delete related action logs and cached drafts
     ActionLog.query.filter_by(guest_id=guest_id).delete()
+    draft_cache.invalidate_guest(guest_id)
+    pregenerate.reset_failures(guest_id)
 
     # Delete the guest
     db.session.delete(guest)
     db.session.commit()
+    stats.adjust(guest_status, None)
 
     return jsonify({"success": True, "message": f"Deleted {guest_name}"})
 
 
 @app.route("/add-guest", methods=["POST"])
+@database.serialized_write
 def add_guest():
     """Add a new guest"""
     data = request.get_json()
@@ -533,10 +1235,28 @@ def add_guest():
         return jsonify({"success": False, "error": "Name is required"})
 
     # Check if guest already exists
-    existing = Guest.query.filter_by(name=name).first()
+    existing = Guest.query.filter_by(name_normalized=normalize_name(name)).first()
     if existing:
         return jsonify({"success": False, "error": "Guest already exists"})
 
+    # Ask before adding someone who looks like an existing guest
+    if not data.get("allow_duplicates"):
+        matches = dedup.similar_guests(
+            name,
+            db.session.query(Guest.id, Guest.name),
+            threshold=app.config["DEDUP_THRESHOLD"],
+        )
+        if matches:
+            return jsonify(
+                {
+                    "success": False,
+                    "duplicate_warning": True,
+                    "possible_duplicates": matches,
+                    "error": "Possible duplicate of "
+                    + ", ".join(match["name"] for match in matches),
+                }
+            )
+
     # Create new guest
     guest = Guest(
         name=validate_settings_input(name, 255),
@@ -553,10 +1273,24 @@ def add_guest():
 
     db.session.add(guest)
     db.session.commit()
+    stats.adjust(None, guest.status)
 
     return jsonify({"success": True, "guest_id": guest.id, "message": f"Added {name}"})
 
 
+@app.route("/duplicate-guests")
+def duplicate_guests():
+    """Report pairs of guests that are likely the same person"""
+    threshold = request.args.get(
+        "threshold", app.config["DEDUP_THRESHOLD"], type=float
+    )
+    report = dedup.find_duplicates(
+        db.session.query(Guest.id, Guest.name), threshold=threshold
+    )
+    report["threshold"] = threshold
+    return jsonify(report)
+
+
 @app.route("/test-ollama-connection", methods=["POST"])
 def test_ollama_connection():
     """Test connection to Ollama server"""
@@ -585,7 +1319,9 @@ def get_ollama_models():
             {"success": False, "message": "No Ollama base URL provided", "models": []}
         )
 
-    success, models, message = get_available_models(ollama_base, timeout=10)
+    success, models, message = get_available_models(
+        ollama_base, timeout=10, max_age=app.config["OLLAMA_HEALTH_INTERVAL"]
+    )
     return jsonify({"success": success, "message": message, "models": models})
 
 
@@ -618,10 +1354,14 @@ def pull_ollama_model():
         return jsonify({"success": False, "message": "Missing base URL or model name"})
 
     success, message = pull_model(ollama_base, model_name, timeout=300)
+    if success:
+        # Pick up the new model instead of serving the cached list
+        ollama_monitor.probe(ollama_base)
     return jsonify({"success": success, "message": message})
 
 
 @app.route("/upload-csv", methods=["POST"])
+@database.serialized_write
 def upload_csv():
     """Handle CSV file upload and process guest data"""
     if "csv_file" not in request.files:
@@ -637,7 +1377,6 @@ def upload_csv():
 
     try:
         # Save the uploaded file
-        import pandas as pd
         from datetime import datetime
         import os
 
@@ -660,14 +1399,16 @@ def upload_csv():
         except ValueError:
             return jsonify({"success": False, "message": "Invalid file path"})
 
-        # Save the file
-        file.save(file_path)
-
-        # Process the CSV using existing function
-        df = pd.read_csv(file_path)
-        guests_data = process_guest_data(df)
+        # Save the file while streaming its rows into the guests table
+        import_stats = csv_import.import_guest_csv(
+            file.stream,
+            file_path,
+            detect_fields=columns.detect_columns,
+            classify=SHEET_RULES.classify,
+        )
 
-        if not guests_data:
+        if not import_stats["inserted"]:
+            db.session.rollback()
             return jsonify(
                 {"success": False, "message": "No valid guest data found in CSV"}
             )
@@ -679,26 +1420,18 @@ def upload_csv():
             db.session.add(setting)
 
         # Update setting with CSV file info
-        setting.csv_file_path = file_path
-        setting.csv_name_field = getattr(process_guest_data, "_name_field", "Name")
-        setting.csv_address_field = getattr(
-            process_guest_data, "_address_field", "Address"
-        )
-        setting.csv_notes_field = getattr(process_guest_data, "_notes_field", "Notes")
-        setting.csv_facebook_field = getattr(
-            process_guest_data, "_facebook_field", "facebook_profile"
+        setting.csv_file_path = str(file_path)
+        columns.store_mapping(
+            setting, import_stats["headers"], import_stats["field_mappings"]
         )
         setting.updated_at = datetime.utcnow()
 
-        # Clear existing guests and add new ones (replace mode)
-        Guest.query.delete()
-
-        for i, guest_data in enumerate(guests_data, 1):
-            guest_data["csv_row_number"] = i
-            guest = Guest(**guest_data)
-            db.session.add(guest)
+        # The upload replaced every guest, so the next sheet sync applies in full
+        clear_fetch_state(setting)
 
         db.session.commit()
+        stats.invalidate()
+        app.logger.info("Imported %(inserted)d guests in %(seconds).2fs", import_stats)
 
         # Return success with detected fields info
         detected_fields = {
@@ -711,9 +1444,10 @@ def upload_csv():
         return jsonify(
             {
                 "success": True,
-                "count": len(guests_data),
+                "count": import_stats["inserted"],
                 "detected_fields": detected_fields,
-                "message": f"Successfully processed {len(guests_data)} guests",
+                "import_seconds": import_stats["seconds"],
+                "message": f"Successfully processed {import_stats['inserted']} guests",
             }
         )
 
@@ -723,4 +1457,6 @@ def upload_csv():
 
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    # Development server; production runs gunicorn (see gunicorn.conf.py)
+    init_db()
+    create_app().run(host="0.0.0.0", port=5000, debug=True)
@@ -19,8 +19,22 @@ from services.ollama import (
     get_available_models,
     pull_model,
     test_model_generate,
-    draft_message,
+    generate_message,
 )
+from services.drafting import draft_page_messages
+from services import (
+    columns,
+    csv_writeback,
+    database,
+    draft_cache,
+    ollama_monitor,
+    search,
+    stats,
+)
+from services.classifier import SMART_RULES
+from services.csv_import import import_guest_csv
+from services.pagination import keyset_paginate
+from services.schema import upgrade_schema
 
 app = Flask(__name__)
 app.config["SECRET_KEY"] = os.environ.get(
@@ -31,8 +45,55 @@ app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get(
 )
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
-# File upload configuration
-app.config["MAX_CONTENT_LENGTH"] = 16 * 1024 * 1024  # 16MB max file size
+# SQLite connection settings (see services/database.py); an empty value keeps
+# SQLite's default
+app.config["SQLITE_JOURNAL_MODE"] = os.environ.get("SQLITE_JOURNAL_MODE", "wal")
+app.config["SQLITE_BUSY_TIMEOUT_MS"] = int(
+    os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 10000)
+)
+app.config["SQLITE_SYNCHRONOUS"] = os.environ.get("SQLITE_SYNCHRONOUS", "normal")
+app.config["SQLITE_CACHE_SIZE_MB"] = float(os.environ.get("SQLITE_CACHE_SIZE_MB", 64))
+app.config["SQLITE_MMAP_SIZE_MB"] = float(os.environ.get("SQLITE_MMAP_SIZE_MB", 256))
+database.configure(
+    journal_mode=app.config["SQLITE_JOURNAL_MODE"] or None,
+    busy_timeout_ms=app.config["SQLITE_BUSY_TIMEOUT_MS"],
+    synchronous=app.config["SQLITE_SYNCHRONOUS"] or None,
+    cache_size_mb=app.config["SQLITE_CACHE_SIZE_MB"],
+    mmap_size_mb=app.config["SQLITE_MMAP_SIZE_MB"],
+)
+
+# Concurrent drafting for the review page
+app.config["DRAFT_MAX_WORKERS"] = int(os.environ.get("DRAFT_MAX_WORKERS", 4))
+app.config["DRAFT_PAGE_DEADLINE"] = float(os.environ.get("DRAFT_PAGE_DEADLINE", 8))
+# Names per Ollama request; above 1 drafts several guests with one prompt
+app.config["DRAFT_BATCH_SIZE"] = int(os.environ.get("DRAFT_BATCH_SIZE", 1))
+app.config["DRAFT_CACHE_TTL_HOURS"] = float(
+    os.environ.get("DRAFT_CACHE_TTL_HOURS", 168)
+)
+app.config["DRAFT_CACHE_MAX_ENTRIES"] = int(
+    os.environ.get("DRAFT_CACHE_MAX_ENTRIES", 5000)
+)
+
+# Edits are written back to the uploaded CSV in the background, batched until
+# no new edit has arrived for CSV_WRITEBACK_DELAY seconds
+app.config["CSV_WRITEBACK_DELAY"] = float(os.environ.get("CSV_WRITEBACK_DELAY", 1.0))
+app.config["CSV_WRITEBACK_MAX_DELAY"] = float(
+    os.environ.get("CSV_WRITEBACK_MAX_DELAY", 5.0)
+)
+csv_writeback.configure(
+    delay=app.config["CSV_WRITEBACK_DELAY"],
+    max_delay=app.config["CSV_WRITEBACK_MAX_DELAY"],
+)
+
+# Dashboard counts are cached and kept current by edits made in any worker
+app.config["DASHBOARD_STATS_TTL"] = float(os.environ.get("DASHBOARD_STATS_TTL", 60))
+stats.configure(ttl=app.config["DASHBOARD_STATS_TTL"])
+
+# File upload configuration; uploads are streamed, so a larger limit doesn't
+# mean more memory
+app.config["MAX_CONTENT_LENGTH"] = (
+    int(os.environ.get("MAX_UPLOAD_MB", 16)) * 1024 * 1024
+)  # 16MB max file size by default
 app.config["UPLOAD_FOLDER"] = os.path.join(app.root_path, "uploads")
 
 # Create upload folder if it doesn't exist
@@ -42,8 +103,11 @@ db.init_app(app)
 
 
 def create_tables():
-    """Create tables and seed default setting if needed"""
+    """Create tables, upgrade older databases and seed default setting if needed"""
     db.create_all()
+    for change in upgrade_schema():
+        print(f"Schema upgrade: {change}")
+    search.ensure_search_index()
 
     # Create default setting if none exists
     if not Setting.query.first():
@@ -82,131 +146,8 @@ def to_csv_url(spreadsheet_id, gid="0"):
 
 def smart_detect_status(address, note):
     """Smart detection of guest status based on address and notes content"""
-    if address and address.strip():
-        return "has_address"
-
-    if not note:
-        return "needs_address"
-
-    note_clean = note.lower().strip()
-
-    # Facebook-related patterns (indicating not on Facebook)
-    facebook_patterns = [
-        # Direct statements
-        "no facebook",
-        "not on facebook",
-        "no fb",
-        "not on fb",
-        "not facebook",
-        "no face book",
-        "facebook not found",
-        "fb not found",
-        "cant find facebook",
-        "can't find facebook",
-        "cannot find.*?facebook",
-        "cannot find.*?fb",
-        "could not find.*?facebook",
-        "could not find.*?fb",
-        "not found on facebook",
-        "not found on fb",
-        "no facebook profile",
-        "no fb profile",
-        "no facebook account",
-        "no fb account",
-        "facebook account not found",
-        "fb account not found",
-        "doesnt have facebook",
-        "doesn't have facebook",
-        "does not have facebook",
-        "doesnt use facebook",
-        "doesn't use facebook",
-        "does not use facebook",
-        "no social media",
-        "not on social media",
-        "no social",
-        "not social",
-        "facebook inactive",
-        "fb inactive",
-        "inactive facebook",
-        "inactive fb",
-        "facebook deactivated",
-        "fb deactivated",
-        "deactivated facebook",
-        "deactivated fb",
-        # Match patterns
-        "facebook match",
-        "fb match",
-        "facebook found",
-        "fb found",
-        # Variations with dates/timestamps
-        "facebook.*?20[0-9][0-9]",
-        "fb.*?20[0-9][0-9]",
-        # Plus one variations
-        "plus one.*?not required",
-        "plus.*?one.*?not.*?required",
-        r"\+1.*?not.*?required",
-        # General finding patterns
-        "find.*?facebook",
-        "find.*?fb",
-        "locate.*?facebook",
-        "locate.*?fb",
-        "search.*?facebook",
-        "search.*?fb",
-    ]
-
-    # Address request patterns (indicating address was requested)
-    address_patterns = [
-        # Direct statements
-        "address requested",
-        "asked for address",
-        "request address",
-        "requested address",
-        "address asked",
-        "address needed",
-        "need address",
-        "needs address",
-        "invitation sent",
-        "invite sent",
-        "invited",
-        "invitation mailed",
-        "reached out",
-        "contacted",
-        "messaged",
-        "texted",
-        "called",
-        "emailed",
-        "waiting for address",
-        "pending address",
-        "address pending",
-        "follow up",
-        "following up",
-        "follow-up",
-        "will follow up",
-        "reminded",
-        "reminder sent",
-        "second request",
-        "2nd request",
-        # Status indicators
-        "in progress",
-        "working on",
-        "tracking",
-        "pursuing",
-    ]
-
-    # Check for Facebook-related patterns
-    import re
-
-    for pattern in facebook_patterns:
-        if re.search(pattern, note_clean):
-            return "not_on_fb"
-
-    # Check for address request patterns
-    for pattern in address_patterns:
-        if re.search(pattern, note_clean):
-            return "requested"
-
-    # Default to needs address
-    return "needs_address"
+    # An address always wins; "not on facebook" notes outrank "requested"
+    return SMART_RULES.classify_one(note, address)
 
 
 def messenger_link(facebook_profile, message=None, guest_name=None):
@@ -327,21 +268,13 @@ def favicon():
 @app.route("/")
 def dashboard():
     """Dashboard with guest counts"""
-    total_guests = Guest.query.count()
-    with_address = Guest.query.filter_by(status="has_address").count()
-    requested = Guest.query.filter_by(status="requested").count()
-    not_on_fb = Guest.query.filter_by(status="not_on_fb").count()
-    needs_address = Guest.query.filter_by(status="needs_address").count()
-
-    stats = {
-        "total": total_guests,
-        "with_address": with_address,
-        "requested": requested,
-        "not_on_fb": not_on_fb,
-        "needs_address": needs_address,
-    }
+    return render_template("index.html", stats=stats.guest_counts())
 
-    return render_template("index.html", stats=stats)
+
+@app.route("/dashboard-stats")
+def dashboard_stats():
+    """Guest counts per status, for refreshing the dashboard without a reload"""
+    return jsonify(stats.guest_counts())
 
 
 @app.route("/settings", methods=["GET", "POST"])
@@ -358,6 +291,10 @@ def settings():
             setting = Setting()
             db.session.add(setting)
 
+        # Drafts no longer match the model, drop them
+        if setting.ollama_model != ollama_model:
+            draft_cache.invalidate_all()
+
         setting.sheet_public_url = sheet_url
         setting.ollama_base = ollama_base
         setting.ollama_model = ollama_model
@@ -485,168 +422,18 @@ def allowed_file(filename):
     return "." in filename and filename.rsplit(".", 1)[1].lower() == "csv"
 
 
-def detect_csv_fields(headers):
-    """Automatically detect field mappings from CSV headers"""
-    headers_lower = [h.lower().strip() for h in headers]
-
-    # Name field detection (required)
-    name_candidates = [
-        "name",
-        "full name",
-        "fullname",
-        "guest name",
-        "guest",
-        "person",
-        "contact",
-    ]
-    name_field = None
-    for candidate in name_candidates:
-        for i, header in enumerate(headers_lower):
-            if candidate in header:
-                name_field = headers[i]
-                break
-        if name_field:
-            break
-
-    # Address field detection
-    address_candidates = [
-        "address",
-        "mailing address",
-        "street address",
-        "addr",
-        "location",
-        "home address",
-    ]
-    address_field = None
-    for candidate in address_candidates:
-        for i, header in enumerate(headers_lower):
-            if candidate in header:
-                address_field = headers[i]
-                break
-        if address_field:
-            break
-
-    # Notes field detection
-    notes_candidates = [
-        "notes",
-        "note",
-        "comments",
-        "comment",
-        "description",
-        "details",
-        "info",
-        "remarks",
-    ]
-    notes_field = None
-    for candidate in notes_candidates:
-        for i, header in enumerate(headers_lower):
-            if candidate in header:
-                notes_field = headers[i]
-                break
-        if notes_field:
-            break
-
-    # Facebook field detection
-    facebook_candidates = [
-        "facebook",
-        "fb",
-        "facebook profile",
-        "fb profile",
-        "social media",
-        "facebook_profile",
-    ]
-    facebook_field = None
-    for candidate in facebook_candidates:
-        for i, header in enumerate(headers_lower):
-            if candidate in header:
-                facebook_field = headers[i]
-                break
-        if facebook_field:
-            break
-
-    return {
-        "name": name_field,
-        "address": address_field,
-        "notes": notes_field,
-        "facebook": facebook_field,
-    }
-
-
 def update_csv_file(csv_file_path, guest_updates, field_mappings):
-    """Update the original CSV file with new data"""
-    try:
-        import csv
-        import os
-
-        if not os.path.exists(csv_file_path):
-            print(f"DEBUG: CSV file not found: {csv_file_path}")
-            return False
-
-        # Read current CSV
-        with open(csv_file_path, "r", newline="", encoding="utf-8") as file:
-            reader = csv.DictReader(file)
-            rows = list(reader)
-            headers = reader.fieldnames
-
-        # Apply updates
-        for guest_id, updates in guest_updates.items():
-            row_num = updates.get("csv_row_number")
-            if row_num is not None and 0 <= row_num - 1 < len(rows):
-                row = rows[row_num - 1]  # CSV rows are 1-indexed in our tracking
-
-                # Update fields based on mappings
-                if "address" in updates and field_mappings["address"]:
-                    row[field_mappings["address"]] = updates["address"]
-
-                # Add status information to notes field if it exists
-                if field_mappings["notes"] and "status" in updates:
-                    current_notes = row.get(field_mappings["notes"], "").strip()
-                    status = updates["status"]
-
-                    # Remove any existing status markers (case-insensitive) - broader patterns
-                    status_markers = [
-                        r"\s*\|\s*(Status:|Address Requested|No Facebook Match|Facebook.*?20[0-9][0-9]|FB.*?20[0-9][0-9]).*?(?=\s*\||$)",
-                        r"^(Address Requested|No Facebook Match|Facebook.*?20[0-9][0-9]|FB.*?20[0-9][0-9]).*?(?=\s*\||$)",
-                        r"\s*\|\s*$",
-                    ]
-                    for pattern in status_markers:
-                        current_notes = re.sub(
-                            pattern, "", current_notes, flags=re.IGNORECASE
-                        ).strip()
-
-                    # Add appropriate status marker
-                    if status == "requested":
-                        status_note = "Address Requested"
-                    elif status == "not_on_fb":
-                        status_note = "No Facebook Match"
-                    else:
-                        status_note = ""
-
-                    if status_note:
-                        if current_notes:
-                            row[field_mappings["notes"]] = (
-                                f"{current_notes} | {status_note}"
-                            )
-                        else:
-                            row[field_mappings["notes"]] = status_note
-                    else:
-                        row[field_mappings["notes"]] = current_notes
-
-        # Write back to file
-        with open(csv_file_path, "w", newline="", encoding="utf-8") as file:
-            writer = csv.DictWriter(file, fieldnames=headers)
-            writer.writeheader()
-            writer.writerows(rows)
-
-        print(f"DEBUG: Successfully updated CSV file: {csv_file_path}")
-        return True
-
-    except Exception as e:
-        print(f"DEBUG: Error updating CSV file: {str(e)}")
-        return False
+    """Queue guest edits for write-back to the original CSV file"""
+    queued = False
+    for updates in guest_updates.values():
+        queued |= csv_writeback.enqueue(
+            csv_file_path, updates.get("csv_row_number"), updates, field_mappings
+        )
+    return queued
 
 
 @app.route("/upload-csv", methods=["POST"])
+@database.serialized_write
 def upload_csv():
     """Upload and process CSV file with smart field detection"""
     try:
@@ -668,103 +455,48 @@ def upload_csv():
         saved_filename = f"{timestamp}_{filename}"
         file_path = os.path.join(app.config["UPLOAD_FOLDER"], saved_filename)
 
-        # Read file content and save it
-        file_content = file.read().decode("utf-8")
-        with open(file_path, "w", newline="", encoding="utf-8") as f:
-            f.write(file_content)
-
-        # Parse CSV data
-        import csv
-        from io import StringIO
-
-        csv_data = StringIO(file_content)
-        csv_reader = csv.DictReader(csv_data)
-        original_headers = csv_reader.fieldnames or []
-
-        print(f"DEBUG: Original headers: {original_headers}")
-
-        # Detect field mappings automatically
-        field_mappings = detect_csv_fields(original_headers)
-        print(f"DEBUG: Detected field mappings: {field_mappings}")
-
-        # Check if we found a name field
-        if not field_mappings["name"]:
-            return (
-                jsonify(
-                    {
-                        "error": f'Could not detect name field. Found columns: {original_headers}. Please ensure you have a column with "name" in the title.'
-                    }
-                ),
-                400,
+        # Save the file while streaming its rows into the guests table,
+        # detecting field mappings from the header row
+        try:
+            import_stats = import_guest_csv(
+                file.stream,
+                file_path,
+                detect_fields=columns.detect_columns,
+                classify=SMART_RULES.classify,
             )
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({"error": str(e)}), 400
+
+        field_mappings = import_stats["field_mappings"]
+        guests_added = import_stats["inserted"]
+        app.logger.debug(
+            "CSV headers %s mapped to %s", import_stats["headers"], field_mappings
+        )
+
+        if not guests_added:
+            db.session.rollback()
+            return jsonify({"error": "No valid guest data found in CSV"}), 400
 
         # Update settings with field mappings and file path
         setting = Setting.query.first()
         if not setting:
             setting = Setting()
             db.session.add(setting)
+        elif setting.csv_file_path and setting.csv_file_path != file_path:
+            # Finish pending edits to the previous upload and stop caching it
+            csv_writeback.forget(setting.csv_file_path)
 
         setting.csv_file_path = file_path
-        setting.csv_name_field = field_mappings["name"]
-        setting.csv_address_field = field_mappings["address"]
-        setting.csv_notes_field = field_mappings["notes"]
-        setting.csv_facebook_field = field_mappings["facebook"]
+        columns.store_mapping(setting, import_stats["headers"], field_mappings)
         setting.updated_at = datetime.utcnow()
 
-        # Clear existing guests
-        Guest.query.delete()
-
-        guests_added = 0
-
-        # Reset CSV reader
-        csv_data.seek(0)
-        csv_reader = csv.DictReader(csv_data)
-
-        # Process each row
-        for row_num, row in enumerate(csv_reader, 1):
-            name = (
-                row.get(field_mappings["name"], "").strip()
-                if field_mappings["name"]
-                else ""
-            )
-            if not name or name.lower() in ["nan", "none", ""]:
-                print(f"DEBUG: Skipping row {row_num} - empty name: '{name}'")
-                continue
-
-            address = (
-                row.get(field_mappings["address"], "").strip()
-                if field_mappings["address"]
-                else ""
-            )
-            note = (
-                row.get(field_mappings["notes"], "").strip()
-                if field_mappings["notes"]
-                else ""
-            )
-            facebook_profile = (
-                row.get(field_mappings["facebook"], "").strip()
-                if field_mappings["facebook"]
-                else ""
-            )
-
-            # Set status based on address presence and notes content using smart detection
-            status = smart_detect_status(address, note)
-
-            print(f"DEBUG: Adding guest {row_num}: {name} (status: {status})")
-
-            guest = Guest(
-                name=name,
-                address=address,
-                note=note,
-                facebook_profile=facebook_profile,
-                status=status,
-                csv_row_number=row_num,
-            )
-            db.session.add(guest)
-            guests_added += 1
-
         db.session.commit()
-        print(f"DEBUG: Successfully added {guests_added} guests")
+        stats.invalidate()
+        app.logger.info(
+            "Imported %(inserted)d guests (%(skipped)d skipped) in %(seconds).2fs",
+            import_stats,
+        )
 
         return jsonify(
             {
@@ -780,7 +512,7 @@ def upload_csv():
         )
 
     except Exception as e:
-        print(f"DEBUG: Error processing CSV: {str(e)}")
+        app.logger.exception("Error processing CSV upload")
         db.session.rollback()
         return jsonify({"error": f"Error processing CSV file: {str(e)}"}), 500
 
@@ -798,6 +530,12 @@ def refresh_sheet():
     )
 
 
+@app.route("/csv-writeback-stats")
+def csv_writeback_stats():
+    """How many guest edits were queued, coalesced and written to the CSV"""
+    return jsonify(csv_writeback.get_stats())
+
+
 @app.route("/review")
 def review():
     """Review page with guest filtering and messaging"""
@@ -813,33 +551,76 @@ def review():
     if status_filter and status_filter != "all":
         query = query.filter_by(status=status_filter)
 
+    # Full-text search over name, address and note, best matches first.
+    # Ranked results are paged by offset; browsing seeks by (name, id)
     if search_query:
-        query = query.filter(Guest.name.ilike(f"%{search_query}%"))
+        query = search.apply_search(query, search_query)
+        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    else:
+        pagination = keyset_paginate(
+            query,
+            per_page,
+            cursor=request.args.get("cursor"),
+            page=page,
+            total=stats.status_count(status_filter),
+        )
 
-    # Apply pagination
-    pagination = query.order_by(Guest.name).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
     guests = pagination.items
 
     # Get current settings for Ollama
     setting = Setting.query.first()
 
+    names = {guest.id: guest.name for guest in guests}
+
+    # Reuse previously drafted messages so refreshing doesn't hit Ollama again
+    messages = {}
+    if setting and setting.ollama_model:
+        messages = draft_cache.get_cached_messages(
+            names,
+            setting.ollama_model,
+            ttl_hours=app.config["DRAFT_CACHE_TTL_HOURS"],
+        )
+    missing = {
+        guest_id: name for guest_id, name in names.items() if guest_id not in messages
+    }
+
+    # Generate unique funny message for each person, drafting the page in parallel
+    draft_stats = None
+    if (
+        missing
+        and setting
+        and setting.ollama_base
+        and setting.ollama_model
+        and ollama_monitor.is_available(setting.ollama_base)
+    ):
+        drafted, draft_stats = draft_page_messages(
+            missing,
+            setting.ollama_base,
+            setting.ollama_model,
+            # Fallback to unique funny messages if Ollama fails
+            fallback=generate_funny_fallback_message,
+            timeout=10,
+            max_workers=app.config["DRAFT_MAX_WORKERS"],
+            deadline=app.config["DRAFT_PAGE_DEADLINE"],
+            batch_size=app.config["DRAFT_BATCH_SIZE"],
+        )
+        messages.update(drafted)
+        draft_cache.store_messages(
+            {key: drafted[key] for key in draft_stats["drafted_keys"]},
+            missing,
+            setting.ollama_model,
+            max_entries=app.config["DRAFT_CACHE_MAX_ENTRIES"],
+            ttl_hours=app.config["DRAFT_CACHE_TTL_HOURS"],
+        )
+    else:
+        # Generate unique funny fallback messages
+        for guest_id, name in missing.items():
+            messages[guest_id] = generate_funny_fallback_message(name)
+
     # Prepare guest data with messenger links and messages
     guest_data = []
     for guest in guests:
-        # Generate unique funny message for each person
-        if setting and setting.ollama_base and setting.ollama_model:
-            try:
-                message = draft_message(
-                    guest.name, setting.ollama_base, setting.ollama_model
-                )
-            except Exception as e:
-                # Fallback to unique funny messages if Ollama fails
-                message = generate_funny_fallback_message(guest.name)
-        else:
-            # Generate unique funny fallback messages
-            message = generate_funny_fallback_message(guest.name)
+        message = messages[guest.id]
 
         # Create messenger link with pre-filled message (works for all guests)
         msg_link = messenger_link(guest.facebook_profile, message, guest.name)
@@ -854,10 +635,41 @@ def review():
         current_filter=status_filter,
         search_query=search_query,
         pagination=pagination,
+        draft_stats=draft_stats,
     )
 
 
+@app.route("/regenerate-message/<int:guest_id>", methods=["POST"])
+def regenerate_message(guest_id):
+    """Discard a guest's cached draft and draft a fresh message"""
+    guest = Guest.query.get_or_404(guest_id)
+    setting = Setting.query.first()
+
+    draft_cache.invalidate_guest(guest.id)
+    db.session.commit()
+
+    message = None
+    if setting and setting.ollama_base and setting.ollama_model:
+        message = generate_message(
+            guest.name, setting.ollama_base, setting.ollama_model
+        )
+
+    if message:
+        draft_cache.store_messages(
+            {guest.id: message},
+            {guest.id: guest.name},
+            setting.ollama_model,
+            max_entries=app.config["DRAFT_CACHE_MAX_ENTRIES"],
+            ttl_hours=app.config["DRAFT_CACHE_TTL_HOURS"],
+        )
+    else:
+        message = generate_funny_fallback_message(guest.name)
+
+    return jsonify({"success": True, "message": message})
+
+
 @app.route("/update-guest-address/<int:guest_id>", methods=["POST"])
+@database.serialized_write
 def update_guest_address(guest_id):
     """Update guest address and sync to CSV"""
     try:
@@ -866,6 +678,7 @@ def update_guest_address(guest_id):
         new_address = data.get("address", "").strip()
 
         old_address = guest.address
+        old_status = guest.status
         guest.address = new_address
         guest.status = "has_address" if new_address else "needs_address"
         guest.last_action_at = datetime.utcnow()
@@ -878,6 +691,7 @@ def update_guest_address(guest_id):
         )
         db.session.add(action_log)
         db.session.commit()
+        stats.adjust(old_status, guest.status)
 
         # Update CSV file
         setting = Setting.query.first()
@@ -909,6 +723,7 @@ def update_guest_address(guest_id):
 
 
 @app.route("/mark/<int:guest_id>/<action>", methods=["POST"])
+@database.serialized_write
 def mark_guest(guest_id, action):
     """Mark guest with specific action (requested, not_on_fb) and sync to CSV"""
     guest = Guest.query.get_or_404(guest_id)
@@ -928,6 +743,7 @@ def mark_guest(guest_id, action):
     )
     db.session.add(action_log)
     db.session.commit()
+    stats.adjust(old_status, action)
 
     # Update CSV file
     setting = Setting.query.first()
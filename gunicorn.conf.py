@@ -0,0 +1,40 @@
+"""
+Gunicorn settings for running the app in production.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Every value can be overridden with the environment variable named next to
+it. Threaded workers keep /review/stream (server-sent events) and slow Ollama
+calls from tying up a whole process.
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", f"0.0.0.0:{os.environ.get('PORT', '5000')}")
+
+# WEB_CONCURRENCY is the name most platforms set. Page rendering is CPU
+# bound, so one process per core; threads cover requests waiting on I/O
+workers = int(os.environ.get("WEB_CONCURRENCY", max(multiprocessing.cpu_count(), 2)))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+# Drafting a page with Ollama can take a while
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+graceful_timeout = 30
+keepalive = 5
+
+# Set to recycle workers after this many requests (0 = never); a replacement
+# takes over the background scheduler if the recycled worker was running it
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 0))
+max_requests_jitter = 50
+
+# Each worker loads the app itself. Importing it is cheap (no database work,
+# no pandas), and the scheduler starts on a worker's first request in
+# whichever worker wins the scheduler lock; neither its threads nor the lock
+# would carry over from a preloaded master
+preload_app = False
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("LOG_LEVEL", "info").lower()
@@ -1,11 +1,26 @@
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Text,
+    DateTime,
+    ForeignKey,
+    Index,
+    UniqueConstraint,
+)
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import validates
 
 db = SQLAlchemy()
 
 
+def normalize_name(name: str) -> str:
+    """Case- and whitespace-insensitive key used to match guests by name."""
+    return " ".join((name or "").lower().split())
+
+
 class Setting(db.Model):
     __tablename__ = "settings"
 
@@ -19,6 +34,16 @@ class Setting(db.Model):
     csv_address_field = Column(String(100))  # Detected address column
     csv_notes_field = Column(String(100))  # Detected notes column
     csv_facebook_field = Column(String(100))  # Detected facebook column
+    # Hash of the header row the csv_*_field columns were detected from
+    csv_header_signature = Column(String(64))
+    # Shared by every web worker: validators of the last applied sheet export
+    # (JSON) and the draft pre-generation queue's pause and last run
+    sheet_fetch_state = Column(Text)
+    pregen_paused_until = Column(DateTime)
+    pregen_pause_reason = Column(Text)
+    pregen_last_run_at = Column(DateTime)
+    # Bumped on every guest edit so workers know their cached counts are stale
+    stats_generation = Column(Integer)
     ollama_base = Column(String(255))
     ollama_model = Column(String(100))
     # Wedding details for personalization
@@ -35,18 +60,31 @@ class Setting(db.Model):
 
 class Guest(db.Model):
     __tablename__ = "guests"
+    __table_args__ = (
+        # /review and /manage-guests filter by status and order by name
+        Index("ix_guests_status_name", "status", "name"),
+        Index("ix_guests_name", "name"),
+    )
 
     id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False)
+    # normalize_name(name), kept in sync by the validator below and set
+    # explicitly by Core inserts/updates
+    name_normalized = Column(String(255), index=True)
     address = Column(Text)
     note = Column(Text)
     facebook_profile = Column(String(500))
     status = Column(
         String(20), default="needs_address"
     )  # needs_address, has_address, requested, not_on_fb
-    csv_row_number = Column(Integer)  # Track original CSV row for updates
+    csv_row_number = Column(Integer, index=True)  # Original CSV row for updates
     last_action_at = Column(DateTime, default=datetime.utcnow)
 
+    @validates("name")
+    def _set_name_normalized(self, key, name):
+        self.name_normalized = normalize_name(name)
+        return name
+
     def __repr__(self):
         return f"<Guest {self.name}>"
 
@@ -55,10 +93,47 @@ class ActionLog(db.Model):
     __tablename__ = "action_logs"
 
     id = Column(Integer, primary_key=True)
-    guest_id = Column(Integer, ForeignKey("guests.id"))
+    guest_id = Column(Integer, ForeignKey("guests.id"), index=True)
     action = Column(String(100), nullable=False)
     meta = Column(Text)
     ts = Column(DateTime, default=datetime.utcnow)
 
     def __repr__(self):
         return f"<ActionLog {self.action} for guest {self.guest_id}>"
+
+
+class DraftMessage(db.Model):
+    __tablename__ = "draft_messages"
+    __table_args__ = (
+        UniqueConstraint(
+            "guest_id",
+            "first_name",
+            "ollama_model",
+            "settings_hash",
+            name="uq_draft_key",
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    guest_id = Column(Integer, ForeignKey("guests.id"), index=True)
+    first_name = Column(String(255), nullable=False)  # Name used in the prompt
+    ollama_model = Column(String(100), nullable=False)
+    settings_hash = Column(String(64), nullable=False)  # Hash of wedding details
+    message = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f"<DraftMessage for guest {self.guest_id}>"
+
+
+class DraftFailure(db.Model):
+    __tablename__ = "draft_failures"
+
+    guest_id = Column(Integer, ForeignKey("guests.id"), primary_key=True)
+    attempts = Column(Integer, default=0)
+    last_error = Column(Text)
+    failed_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<DraftFailure for guest {self.guest_id}>"
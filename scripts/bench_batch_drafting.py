@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark single-guest vs batched Ollama drafting against a local stub server.
+
+The stub mimics Ollama's cost model: a fixed per-request overhead plus time
+per prompt token and per generated token (tokens approximated as 4 chars).
+
+    python scripts/bench_batch_drafting.py --guests 300 --batch-size 20
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.ollama import generate_message, generate_messages_batch  # noqa: E402
+
+MESSAGE = "Hey {name}, our save the date is lost without your address. Where to?"
+
+
+def approx_tokens(text):
+    return max(1, len(text) // 4)
+
+
+class StubOllama(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    totals = {"requests": 0, "prompt_tokens": 0, "output_tokens": 0}
+    lock = threading.Lock()
+    costs = {}
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length))
+        prompt = request["prompt"]
+
+        names_match = re.search(r"Names: (\[.*?\])", prompt)
+        if request.get("format") == "json" and names_match:
+            names = json.loads(names_match.group(1))
+            text = json.dumps({name: MESSAGE.format(name=name) for name in names})
+        else:
+            text = MESSAGE.format(name="friend")
+
+        prompt_tokens = approx_tokens(prompt)
+        output_tokens = approx_tokens(text)
+        time.sleep(
+            self.costs["overhead"]
+            + prompt_tokens * self.costs["prompt"]
+            + output_tokens * self.costs["output"]
+        )
+        with self.lock:
+            self.totals["requests"] += 1
+            self.totals["prompt_tokens"] += prompt_tokens
+            self.totals["output_tokens"] += output_tokens
+
+        body = json.dumps(
+            {
+                "response": text,
+                "prompt_eval_count": prompt_tokens,
+                "eval_count": output_tokens,
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def run(label, fn):
+    for key in StubOllama.totals:
+        StubOllama.totals[key] = 0
+    started = time.perf_counter()
+    drafted = fn()
+    seconds = time.perf_counter() - started
+    totals = dict(StubOllama.totals)
+    print(
+        f"{label:<22} {seconds:>8.2f}s {totals['requests']:>9} "
+        f"{totals['prompt_tokens']:>14} {totals['output_tokens']:>14} {drafted:>8}"
+    )
+    return seconds, totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--guests", type=int, default=300)
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--overhead-ms", type=float, default=10)
+    parser.add_argument("--prompt-us-per-token", type=float, default=20)
+    parser.add_argument("--output-us-per-token", type=float, default=200)
+    args = parser.parse_args()
+
+    StubOllama.costs = {
+        "overhead": args.overhead_ms / 1000,
+        "prompt": args.prompt_us_per_token / 1e6,
+        "output": args.output_us_per_token / 1e6,
+    }
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    names = [f"Guest{i:04d}" for i in range(args.guests)]
+
+    def single():
+        return sum(
+            1 for name in names if generate_message(name, base_url, "stub", timeout=30)
+        )
+
+    def batched():
+        drafted = 0
+        for start in range(0, len(names), args.batch_size):
+            chunk = names[start : start + args.batch_size]
+            result = generate_messages_batch(chunk, base_url, "stub", timeout=60)
+            drafted += sum(1 for message in result.values() if message)
+        return drafted
+
+    print(
+        f"{'mode':<22} {'wall':>9} {'requests':>9} "
+        f"{'prompt tokens':>14} {'output tokens':>14} {'drafted':>8}"
+    )
+    single_seconds, single_totals = run("single-guest", single)
+    batch_seconds, batch_totals = run(f"batched ({args.batch_size}/request)", batched)
+    server.shutdown()
+
+    print()
+    print(f"wall-clock speedup:     {single_seconds / batch_seconds:.1f}x")
+    print(
+        "prompt token reduction: "
+        f"{single_totals['prompt_tokens'] / batch_totals['prompt_tokens']:.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
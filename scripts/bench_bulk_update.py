@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark marking guests one request at a time against one bulk request.
+
+Builds a SQLite database of synthetic guests and, through the Flask test
+client, marks --selected of them as requested with one POST /mark per guest
+(one commit each), then does the same with a single POST
+/bulk-update-guests, printing the time and commits for both.
+
+    python scripts/bench_bulk_update.py --guests 5000 --selected 500
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--guests", type=int, default=5000)
+    parser.add_argument("--selected", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # app reads DATABASE_URL on import
+        os.environ["DATABASE_URL"] = f"sqlite:///{tmp}/bench.db"
+        import app as guest_app
+        from models import db
+        from services.ingest import bulk_insert_guests
+
+        client = guest_app.app.test_client()
+        with guest_app.app.app_context():
+            db.create_all()
+            bulk_insert_guests(
+                {"name": f"Guest {i}", "status": "needs_address"}
+                for i in range(args.guests)
+            )
+            db.session.commit()
+
+        one_by_one = range(1, args.selected + 1)
+        started = time.perf_counter()
+        for guest_id in one_by_one:
+            client.post(f"/mark/{guest_id}/requested")
+        single_seconds = time.perf_counter() - started
+
+        bulk = range(args.selected + 1, 2 * args.selected + 1)
+        started = time.perf_counter()
+        response = client.post(
+            "/bulk-update-guests",
+            json={
+                "operations": [
+                    {"guest_id": guest_id, "status": "requested"} for guest_id in bulk
+                ]
+            },
+        )
+        bulk_seconds = time.perf_counter() - started
+        assert response.get_json()["applied"] == args.selected
+
+        print(f"{'mode':<12} {'requests':>9} {'seconds':>9}")
+        print(f"{'one by one':<12} {args.selected:>9} {single_seconds:>9.3f}")
+        print(f"{'bulk':<12} {1:>9} {bulk_seconds:>9.3f}")
+        print(f"speedup: {single_seconds / bulk_seconds:.1f}x")
+
+        with guest_app.app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark the compiled status classifier against per-pattern matching.
+
+Runs both rule sets (app.py's sheet rules and app_enhanced's smart rules) on
+synthetic notes, checks the results match the previous pattern-by-pattern
+implementations and counts regex scans per note.
+
+    python scripts/bench_classifier.py --notes 100000
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.classifier import (  # noqa: E402
+    NOT_ON_FB_PATTERNS,
+    REQUESTED_PATTERNS,
+    SHEET_RULES,
+    SMART_NOT_ON_FB_PATTERNS,
+    SMART_REQUESTED_PATTERNS,
+    SMART_RULES,
+)
+
+WORDS = (
+    "the a friend from college lives in texas vegetarian plus one maybe "
+    "later 2019 mom dad cousin work table kids"
+).split()
+
+
+def legacy_sheet_status(notes, address):
+    """Substring loop determine_guest_status used before the classifier."""
+    if not notes:
+        return "has_address" if address else "needs_address"
+    notes_lower = notes.lower()
+    for pattern in REQUESTED_PATTERNS:
+        if pattern in notes_lower:
+            return "requested"
+    for pattern in NOT_ON_FB_PATTERNS:
+        if pattern in notes_lower:
+            return "not_on_fb"
+    if address and address.strip():
+        return "has_address"
+    return "needs_address"
+
+
+def legacy_smart_status(address, note):
+    """re.search loop smart_detect_status used before the classifier."""
+    if address and address.strip():
+        return "has_address"
+    if not note:
+        return "needs_address"
+    note_clean = note.lower().strip()
+    for pattern in SMART_NOT_ON_FB_PATTERNS:
+        if re.search(pattern, note_clean):
+            return "not_on_fb"
+    for pattern in SMART_REQUESTED_PATTERNS:
+        if re.search(pattern, note_clean):
+            return "requested"
+    return "needs_address"
+
+
+def make_notes(count, seed=7):
+    rng = random.Random(seed)
+    phrases = (
+        REQUESTED_PATTERNS
+        + NOT_ON_FB_PATTERNS
+        + [
+            pattern.replace(".*?", " then ").replace("\\", "")
+            for pattern in SMART_NOT_ON_FB_PATTERNS + SMART_REQUESTED_PATTERNS
+        ]
+    )
+    notes, addresses = [], []
+    for _ in range(count):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(0, 12))]
+        for _ in range(rng.choice([0, 0, 1, 2])):
+            words.insert(rng.randint(0, len(words)), rng.choice(phrases))
+        note = " ".join(words)
+        notes.append(note.upper() if rng.random() < 0.2 else note)
+        addresses.append("12 Main St" if rng.random() < 0.3 else "")
+    return notes, addresses
+
+
+class CountingPattern:
+    """Wraps a compiled pattern to count search calls."""
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.searches = 0
+
+    def search(self, *args):
+        self.searches += 1
+        return self.pattern.search(*args)
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--notes", type=int, default=100_000)
+    args = parser.parse_args()
+
+    notes, addresses = make_notes(args.notes)
+    pairs = list(zip(notes, addresses))
+
+    cases = [
+        (
+            "sheet rules",
+            SHEET_RULES,
+            len(REQUESTED_PATTERNS) + len(NOT_ON_FB_PATTERNS),
+            lambda: [legacy_sheet_status(n, a) for n, a in pairs],
+        ),
+        (
+            "smart rules",
+            SMART_RULES,
+            len(SMART_NOT_ON_FB_PATTERNS) + len(SMART_REQUESTED_PATTERNS),
+            lambda: [legacy_smart_status(a, n) for n, a in pairs],
+        ),
+    ]
+
+    print(f"{args.notes} notes")
+    print(
+        f"{'rules':<12} {'patterns':>8} {'legacy':>9} {'classify':>9} "
+        f"{'speedup':>8} {'scans/note':>11}"
+    )
+    for label, rules, pattern_count, legacy in cases:
+        legacy_seconds, expected = timed(legacy)
+
+        counter = CountingPattern(rules._pattern)
+        rules._pattern = counter
+        try:
+            # Per-note API, so the scan count isn't flattered by batch reuse
+            _, single = timed(lambda: [rules.classify_one(n, a) for n, a in pairs])
+        finally:
+            rules._pattern = counter.pattern
+        batch_seconds, actual = timed(lambda: rules.classify(notes, addresses))
+
+        if actual != expected or single != expected:
+            sys.exit(f"{label}: classifier disagrees with the legacy implementation")
+
+        print(
+            f"{label:<12} {pattern_count:>8} {legacy_seconds:>8.3f}s "
+            f"{batch_seconds:>8.3f}s {legacy_seconds / batch_seconds:>7.1f}x "
+            f"{counter.searches / len(notes):>11.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark the csv and pandas parsers for sheet exports.
+
+For each --rows size a synthetic export is written to a temporary file, both
+parsers run through process_guest_data in this process and their guests are
+compared, then each parser runs in a fresh interpreter that reads the file,
+imports services.sheets, parses and processes it. Prints import and parse
+time and peak RSS (total, and growth over the interpreter with the file
+read).
+
+    python scripts/bench_csv_backends.py --rows 1000 10000 100000
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from services.classifier import NOT_ON_FB_PATTERNS, REQUESTED_PATTERNS  # noqa: E402
+
+FILLER_NOTES = ["plus one", "college friend", "vegetarian", "lives abroad", ""]
+PARSERS = ["csv", "pandas"]
+
+
+def make_csv(rows, seed=42):
+    rng = random.Random(seed)
+    notes_pool = FILLER_NOTES + REQUESTED_PATTERNS + NOT_ON_FB_PATTERNS + ["N/A"]
+    lines = ["Wedding Guest Name,Mailing Address,Notes,Facebook Profile"]
+    for i in range(rows):
+        name = "" if rng.random() < 0.01 else f" Guest {i} "
+        address = f'"{i} Main St, Springfield"' if rng.random() < 0.4 else ""
+        note = rng.choice(notes_pool).upper() if rng.random() < 0.6 else ""
+        profile = f"https://facebook.com/guest{i}" if rng.random() < 0.5 else ""
+        lines.append(f"{name},{address},{note},{profile}")
+    return "\n".join(lines) + "\n"
+
+
+def rss_mb(field):
+    """VmRSS (current) or VmHWM (peak) of this process, from /proc on Linux."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is in KiB on Linux, and survives exec, so less precise
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(parser, path, repeat):
+    """Measure one parser in this (fresh) interpreter and print JSON."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    baseline = rss_mb("VmRSS")
+
+    started = time.perf_counter()
+    from services import sheets
+
+    if parser == "pandas":
+        # Pay pandas' import where the sync would, not inside the parse timing
+        import pandas  # noqa: F401
+    import_seconds = time.perf_counter() - started
+
+    parse_seconds = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        guests = sheets.process_guest_data(sheets._parse_csv_text(text, parser))
+        parse_seconds = min(parse_seconds, time.perf_counter() - started)
+
+    print(
+        json.dumps(
+            {
+                "guests": len(guests),
+                "import_seconds": import_seconds,
+                "parse_seconds": parse_seconds,
+                "peak_rss_mb": rss_mb("VmHWM"),
+                "rss_growth_mb": rss_mb("VmHWM") - baseline,
+            }
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--child", nargs=2, metavar=("PARSER", "PATH"))
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child[0], args.child[1], args.repeat)
+        return
+
+    from services.sheets import _parse_csv_text, process_guest_data
+
+    print(
+        f"{'rows':>8} {'parser':<7} {'import':>9} {'parse':>9} "
+        f"{'peak RSS':>10} {'RSS growth':>11}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            text = make_csv(rows)
+            path = os.path.join(tmp, f"sheet_{rows}.csv")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+
+            expected = process_guest_data(_parse_csv_text(text, "pandas"))
+            actual = process_guest_data(_parse_csv_text(text, "csv"))
+            assert actual == expected, f"parsers disagree on {rows} rows"
+
+            for name in PARSERS:
+                output = subprocess.run(
+                    [
+                        sys.executable,
+                        __file__,
+                        "--repeat",
+                        str(args.repeat),
+                        "--child",
+                        name,
+                        path,
+                    ],
+                    cwd=ROOT,
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                ).stdout
+                result = json.loads(output)
+                print(
+                    f"{rows:>8} {name:<7} "
+                    f"{result['import_seconds'] * 1000:>7.0f}ms "
+                    f"{result['parse_seconds'] * 1000:>7.0f}ms "
+                    f"{result['peak_rss_mb']:>8.1f}MB "
+                    f"{result['rss_growth_mb']:>9.1f}MB"
+                )
+
+
+if __name__ == "__main__":
+    main()
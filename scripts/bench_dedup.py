@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark duplicate-guest detection on a synthetic guest list.
+
+Generates distinct guests plus injected duplicates (typos, nicknames, couples
+listed alongside one partner), runs the blocked cdist search and reports time,
+candidate comparisons against the all-pairs count and how many injected
+duplicates were found.
+
+    python scripts/bench_dedup.py --guests 20000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.dedup import NICKNAMES, find_duplicates, similar_guests  # noqa: E402
+
+FIRST = sorted(set(NICKNAMES.values())) + [
+    "ava",
+    "chloe",
+    "diego",
+    "fatima",
+    "hana",
+    "ines",
+    "kofi",
+    "leila",
+    "mei",
+    "omar",
+    "priya",
+    "sven",
+    "yuki",
+    "zara",
+]
+NICKNAME_OF = {formal: nick for nick, formal in NICKNAMES.items()}
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def make_surname(rng):
+    return "".join(rng.choice(LETTERS) for _ in range(rng.randint(4, 9)))
+
+
+def typo(rng, word):
+    index = rng.randrange(1, len(word))
+    return word[:index] + rng.choice(LETTERS) + word[index + 1 :]
+
+
+def make_guests(count, duplicate_rate, seed=5):
+    rng = random.Random(seed)
+    surnames = [make_surname(rng) for _ in range(count // 3)]
+    guests = []
+    people = []
+    for _ in range(count):
+        first, last = rng.choice(FIRST), rng.choice(surnames)
+        guests.append(f"{first.title()} {last.title()}")
+        people.append((first, last))
+
+    expected = set()
+    for index in rng.sample(range(count), int(count * duplicate_rate)):
+        first, last = people[index]
+        kind = rng.choice(["typo", "nickname", "couple"])
+        if kind == "typo":
+            name = f"{first.title()} {typo(rng, last).title()}"
+        elif kind == "nickname" and first in NICKNAME_OF:
+            name = f"{NICKNAME_OF[first].title()} {last.title()}"
+        else:
+            partner = rng.choice(FIRST)
+            name = f"{first.title()} & {partner.title()} {last.title()}"
+        guests.append(name)
+        expected.add((index + 1, len(guests)))
+
+    return list(enumerate(guests, 1)), expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--guests", type=int, default=20_000)
+    parser.add_argument("--duplicate-rate", type=float, default=0.02)
+    parser.add_argument("--threshold", type=float, default=88)
+    args = parser.parse_args()
+
+    guests, expected = make_guests(args.guests, args.duplicate_rate)
+    result = find_duplicates(guests, threshold=args.threshold)
+    found = {tuple(pair["guest_ids"]) for pair in result["pairs"]}
+    all_pairs = len(guests) * (len(guests) - 1) // 2
+
+    print(f"guests:            {len(guests)}")
+    print(f"seconds:           {result['seconds']:.2f}")
+    print(
+        f"comparisons:       {result['comparisons']:,} of {all_pairs:,} pairs "
+        f"({result['comparisons'] / all_pairs:.2%})"
+    )
+    print(f"pairs reported:    {len(found)}")
+    print(
+        f"injected found:    {len(expected & found)} of {len(expected)} "
+        f"({len(expected & found) / len(expected):.0%})"
+    )
+
+    name = guests[-1][1]
+    started = time.perf_counter()
+    matches = similar_guests(name, guests[:-1], threshold=args.threshold)
+    print(
+        f"add-guest check:   {(time.perf_counter() - started) * 1000:.1f}ms "
+        f"({len(matches)} matches for {name!r})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark guest import: one ORM object per row vs bulk Core executemany.
+
+Each mode imports into a fresh SQLite file and commits once, like the CSV
+upload routes.
+
+    python scripts/bench_ingest.py --rows 50000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from flask import Flask  # noqa: E402
+
+from models import db, Guest  # noqa: E402
+from services.ingest import bulk_insert_guests  # noqa: E402
+
+
+def make_rows(count):
+    return [
+        {
+            "name": f"Guest {i}",
+            "address": f"{i} Main St" if i % 3 else "",
+            "note": "messaged" if i % 5 == 0 else "",
+            "facebook_profile": "",
+            "status": "has_address" if i % 3 else "needs_address",
+            "csv_row_number": i + 1,
+        }
+        for i in range(count)
+    ]
+
+
+def orm_add(rows):
+    for row in rows:
+        db.session.add(Guest(**row))
+
+
+def run(label, import_rows, rows):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = Flask(__name__)
+        app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp}/bench.db"
+        db.init_app(app)
+        with app.app_context():
+            db.create_all()
+            started = time.perf_counter()
+            import_rows(rows)
+            db.session.commit()
+            seconds = time.perf_counter() - started
+            count = Guest.query.count()
+            db.session.remove()
+            db.engine.dispose()
+
+    print(f"{label:<10} {seconds:>8.2f}s {count:>8} {count / seconds:>12,.0f}")
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    print(f"{'mode':<10} {'seconds':>9} {'rows':>8} {'rows/second':>12}")
+    orm_seconds = run("orm add", orm_add, rows)
+    bulk_seconds = run(
+        "bulk",
+        lambda rows: bulk_insert_guests(rows, chunk_size=args.chunk_size),
+        rows,
+    )
+    print(f"\nspeedup: {orm_seconds / bulk_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark OFFSET pagination against keyset (cursor) pagination.
+
+Builds a SQLite database of synthetic guests and times fetching early and
+deep pages of /manage-guests both ways: Flask-SQLAlchemy paginate() (one
+COUNT plus LIMIT/OFFSET) and keyset_paginate() seeking from a cursor with
+the cached total, printing the best of --repeat runs for each.
+
+    python scripts/bench_pagination.py --guests 200000 --pages 1 50 500
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from flask import Flask  # noqa: E402
+
+from models import db, Guest  # noqa: E402
+from services import stats  # noqa: E402
+from services.ingest import bulk_insert_guests  # noqa: E402
+from services.pagination import encode_cursor, keyset_paginate  # noqa: E402
+
+STATUSES = ["needs_address", "has_address", "requested", "not_on_fb"]
+FIRST = "Ann Bob Cara Dev Eli Fay Gus Hal Ivy Jon Kim Lee Max Ned Ola Pat".split()
+LAST = "Smith Jones Brown Lee Patel Garcia Kim Nguyen Clark Lopez Hill".split()
+
+
+def populate(guests, seed=5):
+    rng = random.Random(seed)
+    bulk_insert_guests(
+        {
+            "name": f"{rng.choice(FIRST)} {rng.choice(LAST)} {i}",
+            "status": rng.choice(STATUSES),
+        }
+        for i in range(guests)
+    )
+    db.session.commit()
+
+
+def best_time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--guests", type=int, default=200_000)
+    parser.add_argument("--per-page", type=int, default=50)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 50, 500, 2000])
+    parser.add_argument("--status", default="all")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = Flask(__name__)
+        app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp}/bench.db"
+        db.init_app(app)
+        with app.app_context():
+            db.create_all()
+            populate(args.guests)
+
+            def base():
+                query = Guest.query
+                if args.status != "all":
+                    query = query.filter_by(status=args.status)
+                return query
+
+            print(f"{'page':>6} {'offset':>10} {'keyset':>10} {'speedup':>8}")
+            for page in args.pages:
+                offset_seconds, offset_page = best_time(
+                    lambda: base()
+                    .order_by(Guest.name, Guest.id)
+                    .paginate(page=page, per_page=args.per_page, error_out=False),
+                    args.repeat,
+                )
+                if not offset_page.items:
+                    print(f"{page:>6} past the last page")
+                    continue
+
+                # The cursor the previous page's Next link would carry
+                cursor = None
+                if page > 1:
+                    last = (
+                        base()
+                        .order_by(Guest.name, Guest.id)
+                        .offset((page - 1) * args.per_page - 1)
+                        .first()
+                    )
+                    cursor = encode_cursor(last, "next", page)
+
+                keyset_seconds, keyset_page = best_time(
+                    lambda: keyset_paginate(
+                        base(),
+                        args.per_page,
+                        cursor=cursor,
+                        total=stats.status_count(args.status),
+                    ),
+                    args.repeat,
+                )
+                assert [guest.id for guest in keyset_page.items] == [
+                    guest.id for guest in offset_page.items
+                ]
+                print(
+                    f"{page:>6} {offset_seconds * 1000:>8.2f}ms "
+                    f"{keyset_seconds * 1000:>8.2f}ms "
+                    f"{offset_seconds / keyset_seconds:>7.1f}x"
+                )
+
+            db.session.remove()
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark vectorized process_guest_data against the previous iterrows loop.
+
+Both implementations run on the same synthetic sheet and their outputs are
+compared before timing is reported.
+
+    python scripts/bench_process_guest_data.py --rows 10000 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.classifier import NOT_ON_FB_PATTERNS, REQUESTED_PATTERNS  # noqa: E402
+from services.sheets import determine_guest_status, process_guest_data  # noqa: E402
+
+FILLER_NOTES = ["plus one", "college friend", "vegetarian", "lives abroad", ""]
+
+
+def make_sheet(rows, seed=42):
+    rng = random.Random(seed)
+    notes_pool = FILLER_NOTES + REQUESTED_PATTERNS + NOT_ON_FB_PATTERNS
+    data = {
+        "Wedding Guest Name": [],
+        "Mailing Address": [],
+        "Notes": [],
+        "Facebook Profile": [],
+    }
+    for i in range(rows):
+        blank_name = rng.random() < 0.01
+        data["Wedding Guest Name"].append(np.nan if blank_name else f" Guest {i} ")
+        data["Mailing Address"].append(
+            f"{i} Main St, Springfield" if rng.random() < 0.4 else np.nan
+        )
+        data["Notes"].append(
+            rng.choice(notes_pool).upper() if rng.random() < 0.6 else np.nan
+        )
+        data["Facebook Profile"].append(
+            f"https://facebook.com/guest{i}" if rng.random() < 0.5 else np.nan
+        )
+    return pd.DataFrame(data)
+
+
+def legacy_process_guest_data(df):
+    """The iterrows implementation process_guest_data replaced."""
+    df.columns = df.columns.str.lower()
+    name_col = "wedding guest name"
+    address_col = "mailing address"
+    notes_col = "notes"
+    facebook_col = "facebook profile"
+
+    guests = []
+    for row_number, (_, row) in enumerate(df.iterrows(), 1):
+        name = str(row[name_col]).strip()
+        if not name or name.lower() == "nan":
+            continue
+
+        notes = (
+            str(row.get(notes_col, "")).strip()
+            if notes_col and pd.notna(row.get(notes_col))
+            else ""
+        )
+        address = (
+            str(row.get(address_col, "")).strip()
+            if address_col and pd.notna(row.get(address_col))
+            else ""
+        )
+
+        guest = {
+            "name": name,
+            "address": address,
+            "note": notes,
+            "facebook_profile": (
+                str(row.get(facebook_col, "")).strip()
+                if facebook_col and pd.notna(row.get(facebook_col))
+                else ""
+            ),
+            "csv_row_number": row_number,
+        }
+        guest["status"] = determine_guest_status(notes, address)
+        guests.append(guest)
+
+    return guests
+
+
+def best_of(fn, df, repeat):
+    times = []
+    for _ in range(repeat):
+        frame = df.copy()
+        started = time.perf_counter()
+        result = fn(frame)
+        times.append(time.perf_counter() - started)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'loop':>10} {'vectorized':>11} {'speedup':>8}")
+    for rows in args.rows:
+        df = make_sheet(rows)
+        loop_seconds, expected = best_of(legacy_process_guest_data, df, args.repeat)
+        fast_seconds, actual = best_of(process_guest_data, df, args.repeat)
+
+        if actual != expected:
+            sys.exit(f"Outputs differ for {rows} rows")
+
+        print(
+            f"{rows:>8} {loop_seconds:>9.3f}s {fast_seconds:>10.3f}s "
+            f"{loop_seconds / fast_seconds:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
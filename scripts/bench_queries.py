@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Show query plans and timings for the guest queries behind each route.
+
+Builds a SQLite database of synthetic guests and action logs, then runs the
+queries /review, /manage-guests, /add-guest, /delete-guest and the dashboard
+issue, first without the secondary indexes and then with them, printing
+EXPLAIN QUERY PLAN and the best time of --repeat runs for each.
+
+    python scripts/bench_queries.py --guests 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from flask import Flask  # noqa: E402
+from sqlalchemy import func, insert, text  # noqa: E402
+
+from models import db, ActionLog, Guest, normalize_name  # noqa: E402
+from services.ingest import bulk_insert_guests  # noqa: E402
+
+STATUSES = ["needs_address", "has_address", "requested", "not_on_fb"]
+FIRST = "Ann Bob Cara Dev Eli Fay Gus Hal Ivy Jon Kim Lee Max Ned Ola Pat".split()
+LAST = "Smith Jones Brown Lee Patel Garcia Kim Nguyen Clark Lopez Hill".split()
+PAGE_SIZE = 20
+
+
+def populate(guests, logs_per_guest, seed=3):
+    rng = random.Random(seed)
+    bulk_insert_guests(
+        {
+            "name": f"{rng.choice(FIRST)} {rng.choice(LAST)} {i}",
+            "status": rng.choice(STATUSES),
+            "csv_row_number": i + 1,
+        }
+        for i in range(guests)
+    )
+    db.session.execute(
+        insert(ActionLog.__table__),
+        [
+            {"guest_id": rng.randint(1, guests), "action": "mark_requested"}
+            for _ in range(guests * logs_per_guest)
+        ],
+    )
+    db.session.commit()
+
+
+def route_queries(guests):
+    """(route, query) pairs mirroring what each route runs."""
+    name = f"{FIRST[0]} {LAST[0]} {guests // 2}"
+    middle = guests // 2
+    return [
+        (
+            "/review page",
+            Guest.query.filter_by(status="needs_address")
+            .order_by(Guest.name)
+            .limit(PAGE_SIZE)
+            .offset(PAGE_SIZE * 10),
+        ),
+        (
+            "/review count",
+            db.session.query(func.count(Guest.id)).filter_by(status="needs_address"),
+        ),
+        (
+            "/manage-guests all",
+            Guest.query.order_by(Guest.name).limit(PAGE_SIZE).offset(PAGE_SIZE * 10),
+        ),
+        (
+            "/add-guest exists",
+            Guest.query.filter_by(name_normalized=normalize_name(name)).limit(1),
+        ),
+        (
+            "/delete-guest logs",
+            db.session.query(ActionLog.id).filter_by(guest_id=middle),
+        ),
+        (
+            "csv write-back row",
+            Guest.query.filter_by(csv_row_number=middle),
+        ),
+        (
+            "dashboard",
+            db.session.query(Guest.status, func.count(Guest.id)).group_by(Guest.status),
+        ),
+    ]
+
+
+def compiled(query):
+    return str(
+        query.statement.compile(
+            dialect=db.engine.dialect, compile_kwargs={"literal_binds": True}
+        )
+    )
+
+
+def best_time(sql, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        db.session.execute(text(sql)).all()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def run_all(label, guests, repeat):
+    print(f"\n== {label} ==")
+    timings = {}
+    for route, query in route_queries(guests):
+        sql = compiled(query)
+        plan = db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+        timings[route] = best_time(sql, repeat)
+        print(f"\n{route}: {timings[route] * 1000:.2f}ms")
+        for row in plan:
+            print(f"    {row[-1]}")
+    return timings
+
+
+def set_indexes(create):
+    for table in (Guest.__table__, ActionLog.__table__):
+        for index in table.indexes:
+            if create:
+                index.create(bind=db.engine, checkfirst=True)
+            else:
+                index.drop(bind=db.engine, checkfirst=True)
+    db.session.execute(text("ANALYZE"))
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--guests", type=int, default=100_000)
+    parser.add_argument("--logs-per-guest", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = Flask(__name__)
+        app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp}/bench.db"
+        db.init_app(app)
+        with app.app_context():
+            db.create_all()
+            populate(args.guests, args.logs_per_guest)
+
+            set_indexes(create=False)
+            before = run_all("without indexes", args.guests, args.repeat)
+            set_indexes(create=True)
+            after = run_all("with indexes", args.guests, args.repeat)
+
+            print(f"\n{'route':<20} {'before':>10} {'after':>10} {'speedup':>8}")
+            for route, seconds in before.items():
+                print(
+                    f"{route:<20} {seconds * 1000:>8.2f}ms "
+                    f"{after[route] * 1000:>8.2f}ms {seconds / after[route]:>7.1f}x"
+                )
+
+            db.session.remove()
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
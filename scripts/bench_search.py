@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark guest search: LIKE '%q%' scans against the FTS5 index.
+
+Builds a SQLite database of synthetic guests, creates the search index and
+times the paged /review and /manage-guests search queries for a few typical
+inputs, printing the best of --repeat runs for each.
+
+    python scripts/bench_search.py --guests 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from flask import Flask  # noqa: E402
+
+from models import db, Guest  # noqa: E402
+from services import search  # noqa: E402
+from services.ingest import bulk_insert_guests  # noqa: E402
+
+FIRST = "Ann Bob Cara Dev Eli Fay Gus Hal Ivy Jon Kim Lee Max Ned Ola Pat".split()
+LAST = "Smith Jones Brown Lee Patel Garcia Kim Nguyen Clark Lopez Hill".split()
+STREETS = "Oak Maple Pine Cedar Elm Birch Willow Lake Hill Park".split()
+NOTES = ["college friend", "messaged", "no fb", "plus one", "work", ""]
+SEARCHES = ["smith", "ann sm", "maple", "college", "zzz"]
+PAGE_SIZE = 20
+
+
+def populate(guests, seed=11):
+    rng = random.Random(seed)
+    bulk_insert_guests(
+        {
+            "name": f"{rng.choice(FIRST)} {rng.choice(LAST)}{i}",
+            "address": (f"{i} {rng.choice(STREETS)} St" if rng.random() < 0.5 else ""),
+            "note": rng.choice(NOTES),
+        }
+        for i in range(guests)
+    )
+    db.session.commit()
+
+
+def best_time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+    return min(times), result
+
+
+def page(query):
+    """Same work as paginate(): one page plus the total count."""
+    return query.limit(PAGE_SIZE).all(), query.count()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--guests", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = Flask(__name__)
+        app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp}/bench.db"
+        db.init_app(app)
+        with app.app_context():
+            db.create_all()
+            populate(args.guests)
+
+            started = time.perf_counter()
+            if not search.ensure_search_index():
+                sys.exit("SQLite was built without FTS5")
+            print(f"index build: {time.perf_counter() - started:.2f}s\n")
+
+            print(f"{'search':<10} {'like':>9} {'fts':>9} {'speedup':>8} {'hits':>7}")
+            for text in SEARCHES:
+                pattern = f"%{text}%"
+                like_seconds, (_, like_hits) = best_time(
+                    lambda: page(
+                        Guest.query.filter(
+                            Guest.name.ilike(pattern)
+                            | Guest.address.ilike(pattern)
+                            | Guest.note.ilike(pattern)
+                        ).order_by(Guest.name)
+                    ),
+                    args.repeat,
+                )
+                fts_seconds, (_, fts_hits) = best_time(
+                    lambda: page(search.apply_search(Guest.query, text)),
+                    args.repeat,
+                )
+                print(
+                    f"{text!r:<10} {like_seconds * 1000:>7.2f}ms "
+                    f"{fts_seconds * 1000:>7.2f}ms "
+                    f"{like_seconds / fts_seconds:>7.1f}x {fts_hits:>7}"
+                )
+
+            db.session.remove()
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
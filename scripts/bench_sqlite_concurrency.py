@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Benchmark reads and clicks during a full sheet sync, with and without the
+SQLite tuning in services/database.py.
+
+For each mode a fresh SQLite file is filled with synthetic guests, then a
+sheet sync that changes every guest runs while reader threads load /review
+pages and a clicker thread marks guests one commit at a time (like
+/mark). Prints read and click latencies and "database is locked" errors.
+
+    default  SQLite defaults: rollback journal, Python's 5 s busy timeout
+    tuned    WAL, busy_timeout, synchronous=NORMAL, cache and mmap sizes,
+             clicks queued with database.writer() like the routes
+
+    python scripts/bench_sqlite_concurrency.py --guests 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from contextlib import nullcontext
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from flask import Flask  # noqa: E402
+from sqlalchemy import func, update  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+from models import db, Guest  # noqa: E402
+from services import database, sync  # noqa: E402
+from services.ingest import bulk_insert_guests  # noqa: E402
+
+STATUSES = ["needs_address", "has_address", "requested", "not_on_fb"]
+FIRST = "Ann Bob Cara Dev Eli Fay Gus Hal Ivy Jon Kim Lee Max Ned Ola Pat".split()
+LAST = "Smith Jones Brown Lee Patel Garcia Kim Nguyen Clark Lopez Hill".split()
+PAGE_SIZE = 20
+
+
+def sheet_rows(guests, round_number, seed=13):
+    """Sheet rows for every guest; each round gives everyone a new address."""
+    rng = random.Random(seed)
+    return [
+        {
+            "name": f"{rng.choice(FIRST)} {rng.choice(LAST)} {i}",
+            "address": f"{i} Round {round_number} St",
+            "note": "",
+            "facebook_profile": "",
+            "csv_row_number": i + 1,
+        }
+        for i in range(guests)
+    ]
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * p), len(values) - 1)] * 1000
+
+
+def run_mode(mode, guests, readers, think, tmp):
+    if mode == "default":
+        database.configure(
+            journal_mode=None,
+            busy_timeout_ms=None,
+            synchronous=None,
+            cache_size_mb=None,
+            mmap_size_mb=None,
+        )
+    else:
+        database.configure()
+
+    app = Flask(f"bench_{mode}")
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp}/{mode}.db"
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        bulk_insert_guests(
+            {**row, "status": "needs_address"} for row in sheet_rows(guests, 0)
+        )
+        db.session.commit()
+        rows = sheet_rows(guests, 1)
+
+    syncing = threading.Event()
+    done = threading.Event()
+    results = {"reads": [], "read_errors": 0, "clicks": [], "click_errors": 0}
+    results_lock = threading.Lock()
+
+    def reader():
+        with app.app_context():
+            syncing.wait()
+            while not done.is_set():
+                started = time.perf_counter()
+                try:
+                    Guest.query.filter_by(status="needs_address").order_by(
+                        Guest.name, Guest.id
+                    ).limit(PAGE_SIZE).all()
+                    db.session.query(func.count(Guest.id)).scalar()
+                    db.session.rollback()
+                    with results_lock:
+                        results["reads"].append(time.perf_counter() - started)
+                except OperationalError:
+                    db.session.rollback()
+                    with results_lock:
+                        results["read_errors"] += 1
+                time.sleep(think)
+            db.session.remove()
+
+    def clicker():
+        rng = random.Random(1)
+        with app.app_context():
+            syncing.wait()
+            while not done.is_set():
+                started = time.perf_counter()
+                try:
+                    with database.writer() if mode == "tuned" else nullcontext():
+                        db.session.execute(
+                            update(Guest)
+                            .where(Guest.id == rng.randint(1, guests))
+                            .values(status="requested")
+                        )
+                        db.session.commit()
+                    results["clicks"].append(time.perf_counter() - started)
+                except OperationalError:
+                    db.session.rollback()
+                    results["click_errors"] += 1
+                time.sleep(0.01)
+            db.session.remove()
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads.append(threading.Thread(target=clicker))
+    for thread in threads:
+        thread.start()
+
+    with app.app_context():
+        syncing.set()
+        started = time.perf_counter()
+        try:
+            summary = sync.sync_guests(rows)
+            db.session.commit()
+            sync_result = f"{summary['updated']} updated"
+        except OperationalError as e:
+            db.session.rollback()
+            sync_result = f"failed: {e.orig}"
+        sync_seconds = time.perf_counter() - started
+        # Keep measuring briefly after the commit
+        time.sleep(0.5)
+        done.set()
+        for thread in threads:
+            thread.join()
+        db.session.remove()
+        db.engine.dispose()
+
+    print(f"\n== {mode} ==")
+    print(f"sync: {sync_seconds:.2f}s ({sync_result})")
+    for kind in ("reads", "clicks"):
+        values = results[kind]
+        errors = results[f"{kind[:-1]}_errors"]
+        print(
+            f"{kind:<7} {len(values):>6} done  p50 {percentile(values, 0.5):>8.1f}ms  "
+            f"p95 {percentile(values, 0.95):>8.1f}ms  "
+            f"max {percentile(values, 1.0):>8.1f}ms  locked errors {errors}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--guests", type=int, default=100_000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument(
+        "--think-ms", type=float, default=50, help="pause between page loads"
+    )
+    parser.add_argument("--modes", nargs="+", default=["default", "tuned"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in args.modes:
+            run_mode(mode, args.guests, args.readers, args.think_ms / 1000, tmp)
+
+
+if __name__ == "__main__":
+    main()
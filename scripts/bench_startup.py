@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Measure how long `import app` takes and which modules it pulls in.
+
+Runs `python -X importtime -c "import app"` in a fresh interpreter --runs
+times against a throwaway database, prints the fastest total and the slowest
+top-level imports, and exits non-zero if importing the app loaded one of the
+heavy libraries that should only load when a sheet is parsed or duplicates
+are searched (pandas, numpy, rapidfuzz).
+
+    python scripts/bench_startup.py --runs 5 --top 15
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+HEAVY = ("pandas", "numpy", "rapidfuzz")
+# import time: self [us] | cumulative | imported package
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_once(env):
+    """Top-level imports as {module: cumulative microseconds}, and all modules."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(result.stderr)
+
+    top_level = {}
+    modules = set()
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, module = match.groups()
+        modules.add(module)
+        # `import app` is indented one space, the modules it imports three
+        if len(indent) == 3 or module == "app":
+            top_level[module] = int(cumulative)
+    return top_level, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{tmp}/startup.db",
+            SCHEDULER_LOCK_FILE=os.path.join(tmp, "scheduler.lock"),
+        )
+        runs = [import_once(env) for _ in range(args.runs)]
+
+    fastest, modules = min(runs, key=lambda run: run[0].get("app", 0))
+    print(f"import app: {fastest.get('app', 0) / 1000:.0f}ms (best of {args.runs})")
+    print(f"\n{'module':<40} {'cumulative':>12}")
+    slowest = sorted(
+        ((module, us) for module, us in fastest.items() if module != "app"),
+        key=lambda item: -item[1],
+    )
+    for module, us in slowest[: args.top]:
+        print(f"{module:<40} {us / 1000:>10.1f}ms")
+
+    loaded = sorted(
+        name for name in HEAVY if any(m.split(".")[0] == name for m in modules)
+    )
+    if loaded:
+        print(f"\nheavy modules imported at startup: {', '.join(loaded)}")
+        sys.exit(1)
+    print(f"\nnone of {', '.join(HEAVY)} imported at startup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Load test the dashboard, /review and /manage-guests under each server setup.
+
+Seeds a SQLite database with synthetic guests, then for each --servers entry
+starts the app, drives every path with --concurrency keep-alive clients for
+--seconds and prints requests/sec and latency percentiles:
+
+    dev       python app.py's server (Werkzeug, debug on, one process)
+    gunicorn  gunicorn -c gunicorn.conf.py wsgi:app (--workers x --threads)
+
+    python scripts/load_test.py --guests 5000 --concurrency 16 --seconds 10
+"""
+
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from flask import Flask  # noqa: E402
+
+from models import db  # noqa: E402
+from services.ingest import bulk_insert_guests  # noqa: E402
+
+PATHS = ["/", "/review", "/manage-guests"]
+STATUSES = ["needs_address", "has_address", "requested", "not_on_fb"]
+FIRST = "Ann Bob Cara Dev Eli Fay Gus Hal Ivy Jon Kim Lee Max Ned Ola Pat".split()
+LAST = "Smith Jones Brown Lee Patel Garcia Kim Nguyen Clark Lopez Hill".split()
+
+
+def seed(database_url, guests, seed=9):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_url
+    db.init_app(app)
+    rng = random.Random(seed)
+    with app.app_context():
+        db.create_all()
+        bulk_insert_guests(
+            {
+                "name": f"{rng.choice(FIRST)} {rng.choice(LAST)} {i}",
+                "status": rng.choice(STATUSES),
+            }
+            for i in range(guests)
+        )
+        db.session.commit()
+        db.engine.dispose()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(kind, port, env, workers, threads):
+    if kind == "dev":
+        command = [
+            sys.executable,
+            "-c",
+            "from app import create_app; "
+            f"create_app().run(host='127.0.0.1', port={port}, debug=True, use_reloader=False)",
+        ]
+    else:
+        env = dict(
+            env,
+            GUNICORN_BIND=f"127.0.0.1:{port}",
+            WEB_CONCURRENCY=str(workers),
+            GUNICORN_THREADS=str(threads),
+        )
+        command = [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "-c",
+            "gunicorn.conf.py",
+            "--access-logfile",
+            "/dev/null",
+            "wsgi:app",
+        ]
+    process = subprocess.Popen(
+        command,
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/", timeout=5).ok:
+                return process
+        except requests.RequestException:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"{kind} server did not start")
+
+
+def hammer(url, concurrency, seconds):
+    """Requests/sec and latency percentiles from concurrent keep-alive clients."""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + seconds
+
+    def client():
+        session = requests.Session()
+        mine = []
+        failed = 0
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            try:
+                response = session.get(url, timeout=30)
+                response.content
+                if not response.ok:
+                    failed += 1
+            except requests.RequestException:
+                failed += 1
+            mine.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(mine)
+            errors[0] += failed
+
+    started = time.perf_counter()
+    clients = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000
+
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": percentile(0.50),
+        "p95": percentile(0.95),
+        "errors": errors[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--guests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--servers", nargs="+", default=["dev", "gunicorn"])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{tmp}/load.db"
+        seed(database_url, args.guests)
+        env = dict(
+            os.environ,
+            DATABASE_URL=database_url,
+            SCHEDULER_LOCK_FILE=os.path.join(tmp, "scheduler.lock"),
+            # Keep Ollama out of the measurement
+            PREGENERATE_DRAFTS="false",
+        )
+
+        print(
+            f"{'server':<10} {'path':<15} {'req/s':>8} {'p50':>9} {'p95':>9} "
+            f"{'errors':>7}"
+        )
+        for kind in args.servers:
+            port = free_port()
+            process = start_server(kind, port, env, args.workers, args.threads)
+            try:
+                for path in PATHS:
+                    result = hammer(
+                        f"http://127.0.0.1:{port}{path}",
+                        args.concurrency,
+                        args.seconds,
+                    )
+                    print(
+                        f"{kind:<10} {path:<15} {result['rps']:>8.1f} "
+                        f"{result['p50']:>7.1f}ms {result['p95']:>7.1f}ms "
+                        f"{result['errors']:>7}"
+                    )
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
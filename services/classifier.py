@@ -0,0 +1,293 @@
+import re
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+# Notes that mean we already asked for the address (checked first)
+REQUESTED_PATTERNS = [
+    "address requested",
+    "requested address",
+    "messaged",
+    "sent message",
+    "contacted",
+    "reached out",
+    "asked for address",
+    "request sent",
+    "waiting for address",
+    "pending address",
+    "awaiting response",
+    "message sent",
+    "facebook messaged",
+    "fb messaged",
+    "dm sent",
+    "direct message sent",
+    "sent dm",
+]
+
+# Notes that mean the guest can't be messaged on Facebook
+NOT_ON_FB_PATTERNS = [
+    "no facebook",
+    "not on facebook",
+    "not on fb",
+    "no fb",
+    "facebook not found",
+    "fb not found",
+    "no social media",
+    "not found on facebook",
+    "no facebook match",
+    "no facebook account",
+    "doesnt have facebook",
+    "doesn't have facebook",
+    "not active on facebook",
+    "deactivated facebook",
+    "deleted facebook",
+]
+
+# Regex patterns used by app_enhanced's smart status detection
+SMART_NOT_ON_FB_PATTERNS = [
+    # Direct statements
+    "no facebook",
+    "not on facebook",
+    "no fb",
+    "not on fb",
+    "not facebook",
+    "no face book",
+    "facebook not found",
+    "fb not found",
+    "cant find facebook",
+    "can't find facebook",
+    "cannot find.*?facebook",
+    "cannot find.*?fb",
+    "could not find.*?facebook",
+    "could not find.*?fb",
+    "not found on facebook",
+    "not found on fb",
+    "no facebook profile",
+    "no fb profile",
+    "no facebook account",
+    "no fb account",
+    "facebook account not found",
+    "fb account not found",
+    "doesnt have facebook",
+    "doesn't have facebook",
+    "does not have facebook",
+    "doesnt use facebook",
+    "doesn't use facebook",
+    "does not use facebook",
+    "no social media",
+    "not on social media",
+    "no social",
+    "not social",
+    "facebook inactive",
+    "fb inactive",
+    "inactive facebook",
+    "inactive fb",
+    "facebook deactivated",
+    "fb deactivated",
+    "deactivated facebook",
+    "deactivated fb",
+    # Match patterns
+    "facebook match",
+    "fb match",
+    "facebook found",
+    "fb found",
+    # Variations with dates/timestamps
+    "facebook.*?20[0-9][0-9]",
+    "fb.*?20[0-9][0-9]",
+    # Plus one variations
+    "plus one.*?not required",
+    "plus.*?one.*?not.*?required",
+    r"\+1.*?not.*?required",
+    # General finding patterns
+    "find.*?facebook",
+    "find.*?fb",
+    "locate.*?facebook",
+    "locate.*?fb",
+    "search.*?facebook",
+    "search.*?fb",
+]
+
+SMART_REQUESTED_PATTERNS = [
+    # Direct statements
+    "address requested",
+    "asked for address",
+    "request address",
+    "requested address",
+    "address asked",
+    "address needed",
+    "need address",
+    "needs address",
+    "invitation sent",
+    "invite sent",
+    "invited",
+    "invitation mailed",
+    "reached out",
+    "contacted",
+    "messaged",
+    "texted",
+    "called",
+    "emailed",
+    "waiting for address",
+    "pending address",
+    "address pending",
+    "follow up",
+    "following up",
+    "follow-up",
+    "will follow up",
+    "reminded",
+    "reminder sent",
+    "second request",
+    "2nd request",
+    # Status indicators
+    "in progress",
+    "working on",
+    "tracking",
+    "pursuing",
+]
+
+
+def _literal_regex(words: Iterable[str]) -> str:
+    """
+    Regex matching any of the words, factored into a trie.
+
+    "no fb", "no facebook" becomes "no\\ f(?:acebook|b)", so the engine
+    never re-reads a shared prefix for each alternative.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node):
+        branches = [
+            re.escape(char) + build(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class StatusClassifier:
+    """
+    Classify guest notes into statuses with one compiled regex.
+
+    All patterns are compiled into a single alternation, one named group per
+    status in priority order, so a note is scanned by one regex instead of a
+    search per pattern. At each position the highest-priority status that
+    matches there wins, and scanning stops as soon as the top status is seen.
+    """
+
+    def __init__(
+        self,
+        categories: Sequence[Tuple[str, Iterable[str]]],
+        literal: bool = True,
+        address_first: bool = False,
+    ):
+        """
+        Args:
+            categories: (status, patterns) pairs, highest priority first
+            literal: Treat patterns as plain substrings rather than regexes
+            address_first: Return "has_address" for any guest with an address
+                before looking at notes
+        """
+        self.statuses = [status for status, _ in categories]
+        self.address_first = address_first
+
+        alternatives = []
+        for index, (_, patterns) in enumerate(categories):
+            regex = _literal_regex(patterns) if literal else "|".join(patterns)
+            alternatives.append(f"(?P<c{index}>{regex})")
+        self._groups = [f"c{index}" for index in range(len(self.statuses))]
+        # No leading lookahead, so sre can skip ahead on the possible first
+        # characters instead of trying every alternative at every position
+        self._pattern = re.compile("|".join(alternatives))
+
+    def match(self, note: str) -> Optional[str]:
+        """Highest-priority status whose patterns occur in the note, if any."""
+        if not note:
+            return None
+
+        text = note.lower()
+        search = self._pattern.search
+        best = None
+        found = search(text)
+        while found:
+            for index, group in enumerate(self._groups):
+                if found.group(group) is not None:
+                    break
+            if best is None or index < best:
+                best = index
+                if best == 0:
+                    break
+            # A higher-priority pattern may start inside this match
+            found = search(text, found.start() + 1)
+
+        return None if best is None else self.statuses[best]
+
+    def classify_one(self, note: str, address: str) -> str:
+        """
+        Status for a single guest.
+
+        Returns: 'has_address', 'needs_address' or one of the category statuses
+        """
+        has_address = bool(address and address.strip())
+        if has_address and self.address_first:
+            return "has_address"
+
+        status = self.match(note)
+        if status:
+            return status
+
+        return "has_address" if has_address else "needs_address"
+
+    def classify(self, notes: Iterable[str], addresses: Iterable[str]) -> List[str]:
+        """
+        Statuses for many guests at once.
+
+        Notes repeated within the batch ("messaged", "no fb") are only
+        matched once.
+
+        Args:
+            notes: Notes per guest ("" or None where missing)
+            addresses: Addresses per guest, aligned with notes
+
+        Returns:
+            List of statuses in input order
+        """
+        matches = {}
+        statuses = []
+        for note, address in zip(notes, addresses):
+            has_address = bool(address and address.strip())
+            if has_address and self.address_first:
+                statuses.append("has_address")
+                continue
+
+            if note not in matches:
+                matches[note] = self.match(note)
+            status = matches[note]
+
+            if not status:
+                status = "has_address" if has_address else "needs_address"
+            statuses.append(status)
+
+        return statuses
+
+
+# Rules used by sheet sync, CSV upload and manual edits in app.py; a
+# "requested" note outranks "not on facebook"
+SHEET_RULES = StatusClassifier(
+    [("requested", REQUESTED_PATTERNS), ("not_on_fb", NOT_ON_FB_PATTERNS)]
+)
+
+# app_enhanced's rules: an address always wins, then "not on facebook"
+# outranks "requested"
+SMART_RULES = StatusClassifier(
+    [("not_on_fb", SMART_NOT_ON_FB_PATTERNS), ("requested", SMART_REQUESTED_PATTERNS)],
+    literal=False,
+    address_first=True,
+)
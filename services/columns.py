@@ -0,0 +1,177 @@
+import hashlib
+import json
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Guest fields detected from a header row, in tie-break order
+FIELDS = ("name", "address", "notes", "facebook")
+
+# Patterns found in headers, per field, with how strongly they indicate the
+# field: specific phrases outrank generic words. Negative weights veto a
+# header that would otherwise match ("Email Address" is not an address).
+FIELD_PATTERNS = {
+    "name": [
+        ("wedding guest name", 100),
+        ("guest name", 90),
+        ("full name", 80),
+        ("fullname", 80),
+        ("name", 60),
+        ("guest", 40),
+    ],
+    "address": [
+        ("mailing address", 90),
+        ("street address", 90),
+        ("home address", 90),
+        ("address", 70),
+        ("street", 50),
+        ("addr", 40),
+        ("location", 30),
+        ("email", -100),
+    ],
+    "notes": [
+        ("notes", 80),
+        ("note", 70),
+        ("comments", 60),
+        ("comment", 60),
+        ("remarks", 50),
+        ("description", 40),
+        ("details", 40),
+        ("info", 20),
+    ],
+    "facebook": [
+        ("facebook_profile", 100),
+        ("facebook profile", 100),
+        ("fb profile", 90),
+        ("facebook", 80),
+        ("social media", 60),
+        ("fb", 50),
+        ("social", 40),
+        ("profile", 30),
+    ],
+}
+
+# A header that is exactly the pattern beats one that merely contains it
+EXACT_MATCH_BONUS = 10
+
+# Lowest score a header needs to be taken as the guest name, above a bare
+# "Guest"/"Guests" even with the exact match bonus (a count or a tag column
+# as often as a name); anything weaker leaves the name undetected so imports
+# fail loudly instead of guessing
+MIN_NAME_SCORE = 55
+
+# Flattened once: (pattern, field index, weight)
+_PATTERN_TABLE = [
+    (pattern, FIELDS.index(field), weight)
+    for field, patterns in FIELD_PATTERNS.items()
+    for pattern, weight in patterns
+]
+
+_NAME = FIELDS.index("name")
+
+_stats = {"detections": 0, "cache_hits": 0}
+_lock = threading.Lock()
+
+
+def _score(header: str) -> List[int]:
+    """Score of one header for each field in FIELDS (0 = no match)."""
+    text = str(header).lower().strip()
+    best = [0] * len(FIELDS)
+    penalty = [0] * len(FIELDS)
+    for pattern, field, weight in _PATTERN_TABLE:
+        if pattern not in text:
+            continue
+        if weight < 0:
+            penalty[field] += weight
+            continue
+        if text == pattern:
+            weight += EXACT_MATCH_BONUS
+        best[field] = max(best[field], weight)
+    return [score + penalty[i] if score else 0 for i, score in enumerate(best)]
+
+
+def detect_columns(headers: Sequence[str]) -> Dict[str, Optional[str]]:
+    """
+    Detect which headers hold guest name, address, notes and Facebook profile.
+
+    Every header is scored against every field; the best scoring pairs are
+    assigned first, so each field gets its strongest header and a header
+    feeds at most one field. Ties go to the field listed first in FIELDS,
+    then to the leftmost header.
+
+    Args:
+        headers: Header row, in sheet order
+
+    Returns:
+        Dict with "name", "address", "notes" and "facebook" keys mapping to
+        the matching header as given, or None when no header matches
+    """
+    candidates = [
+        (-score, field, position)
+        for position, header in enumerate(headers)
+        for field, score in enumerate(_score(header))
+        if score >= (MIN_NAME_SCORE if field == _NAME else 1)
+    ]
+    candidates.sort()
+
+    mapping = dict.fromkeys(FIELDS)
+    used = set()
+    for _, field, position in candidates:
+        if mapping[FIELDS[field]] is None and position not in used:
+            mapping[FIELDS[field]] = headers[position]
+            used.add(position)
+
+    with _lock:
+        _stats["detections"] += 1
+    return mapping
+
+
+def header_signature(headers: Sequence[str]) -> str:
+    """SHA-256 of a header row, identifying it across syncs."""
+    return hashlib.sha256(
+        json.dumps([str(header) for header in headers]).encode("utf-8")
+    ).hexdigest()
+
+
+def mapping_for(headers: Sequence[str], setting) -> Tuple[Dict, bool]:
+    """
+    Column mapping for a header row, reusing the one stored on setting.
+
+    Args:
+        headers: Header row, in sheet order
+        setting: Setting holding the last mapping (csv_*_field columns and
+            csv_header_signature), or None
+
+    Returns:
+        Tuple of (mapping as from detect_columns, True if it came from
+        setting rather than a fresh detection)
+    """
+    if (
+        setting is not None
+        and setting.csv_name_field
+        and setting.csv_header_signature == header_signature(headers)
+    ):
+        with _lock:
+            _stats["cache_hits"] += 1
+        return {
+            "name": setting.csv_name_field,
+            "address": setting.csv_address_field,
+            "notes": setting.csv_notes_field,
+            "facebook": setting.csv_facebook_field,
+        }, True
+
+    return detect_columns(headers), False
+
+
+def store_mapping(setting, headers: Sequence[str], mapping: Dict) -> None:
+    """Remember mapping for headers on setting; the caller commits."""
+    setting.csv_name_field = mapping["name"]
+    setting.csv_address_field = mapping["address"]
+    setting.csv_notes_field = mapping["notes"]
+    setting.csv_facebook_field = mapping["facebook"]
+    setting.csv_header_signature = header_signature(headers)
+
+
+def get_stats() -> dict:
+    """Header rows detected vs mappings reused from Setting."""
+    with _lock:
+        return dict(_stats)
@@ -0,0 +1,149 @@
+import csv
+import io
+import time
+from typing import BinaryIO, Callable, Dict, List, Optional
+
+from sqlalchemy import delete
+
+from models import db, Guest, DraftFailure
+from services import draft_cache, search
+from services.ingest import bulk_insert_guests
+
+# Bytes read from the upload per chunk
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class _TeeReader(io.RawIOBase):
+    """Raw stream that copies every chunk read from source into archive."""
+
+    def __init__(self, source: BinaryIO, archive: BinaryIO):
+        self.source = source
+        self.archive = archive
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.source.read(len(buffer))
+        if not data:
+            return 0
+        size = len(data)
+        buffer[:size] = data
+        self.archive.write(data)
+        self.bytes_read += size
+        return size
+
+
+def _cell(row: List[str], index: Optional[int]) -> str:
+    if index is None or index >= len(row):
+        return ""
+    return (row[index] or "").strip()
+
+
+def import_guest_csv(
+    stream: BinaryIO,
+    archive_path: str,
+    detect_fields: Callable[[List[str]], Dict[str, Optional[str]]],
+    classify: Callable[[List[str], List[str]], List[str]],
+    batch_size: int = 1000,
+) -> dict:
+    """
+    Replace all guests with the rows of an uploaded CSV in a single pass.
+
+    The upload is read in READ_CHUNK_SIZE chunks; every chunk is written to
+    archive_path as it is read, rows are classified and bulk-inserted
+    batch_size at a time, so memory stays bounded whatever the file size.
+    Existing guests, their cached drafts and draft failures are deleted in
+    the same transaction. The caller commits, or rolls back if nothing was imported.
+
+    Args:
+        stream: Binary upload stream (e.g. FileStorage.stream)
+        archive_path: Where to keep a copy of the uploaded file
+        detect_fields: Maps the header row to {"name", "address", "notes",
+            "facebook"} column names (None when not found)
+        classify: Batch status classifier taking (notes, addresses)
+        batch_size: Rows per classify/insert batch
+
+    Returns:
+        Dict with the detected field mappings, headers, inserted and skipped
+        row counts, bytes read and seconds taken
+
+    Raises:
+        ValueError if no name column is detected
+    """
+    started = time.perf_counter()
+    inserted = 0
+    skipped = 0
+
+    with open(archive_path, "wb") as archive:
+        raw = _TeeReader(stream, archive)
+        text = io.TextIOWrapper(
+            io.BufferedReader(raw, READ_CHUNK_SIZE), encoding="utf-8-sig", newline=""
+        )
+        reader = csv.reader(text)
+
+        headers = next(reader, None) or []
+        field_mappings = detect_fields(headers)
+        if not field_mappings.get("name"):
+            # Keep the archive complete even though nothing is imported
+            while raw.readinto(bytearray(READ_CHUNK_SIZE)):
+                pass
+            raise ValueError(
+                "Could not detect name field. "
+                f"Found columns: {headers}. "
+                'Please ensure you have a column with "name" in the title.'
+            )
+
+        columns = {
+            key: headers.index(column) if column else None
+            for key, column in field_mappings.items()
+        }
+
+        # Cached drafts and failure counts belong to the old guests; SQLite
+        # hands their ids to the new ones, which would inherit them
+        draft_cache.invalidate_all()
+        db.session.execute(delete(DraftFailure))
+        with search.replacing_all_guests():
+            db.session.execute(delete(Guest))
+
+        batch = []
+
+        def flush():
+            statuses = classify(
+                [row["note"] for row in batch], [row["address"] for row in batch]
+            )
+            for row, status in zip(batch, statuses):
+                row["status"] = status
+            return bulk_insert_guests(batch, chunk_size=batch_size)["inserted"]
+
+        for row_number, row in enumerate(reader, 1):
+            name = _cell(row, columns["name"])
+            if not name or name.lower() in ("nan", "none"):
+                skipped += 1
+                continue
+
+            batch.append(
+                {
+                    "name": name,
+                    "address": _cell(row, columns.get("address")),
+                    "note": _cell(row, columns.get("notes")),
+                    "facebook_profile": _cell(row, columns.get("facebook")),
+                    "csv_row_number": row_number,
+                }
+            )
+            if len(batch) >= batch_size:
+                inserted += flush()
+                batch = []
+
+        if batch:
+            inserted += flush()
+
+    return {
+        "field_mappings": field_mappings,
+        "headers": headers,
+        "inserted": inserted,
+        "skipped": skipped,
+        "bytes": raw.bytes_read,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
@@ -0,0 +1,275 @@
+import atexit
+import csv
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_config = {
+    # Seconds without new edits before pending rows are written
+    "delay": 1.0,
+    # Upper bound on how long an edit can wait while clicks keep coming
+    "max_delay": 5.0,
+}
+# CSV path -> {csv_row_number: {column: ("address" | "status", value)}}
+_pending = {}
+# CSV path -> {"signature", "headers", "rows"}; rows[csv_row_number - 1]
+_files = {}
+_stats = {
+    "queued": 0,
+    "coalesced": 0,
+    "flushes": 0,
+    "file_writes": 0,
+    "rows_written": 0,
+    "errors": 0,
+    "last_error": "",
+    "last_flush_seconds": 0.0,
+}
+_lock = threading.Condition()
+# Serializes flushes between the worker and explicit flush() calls
+_flush_lock = threading.Lock()
+_worker = None
+
+# Status markers update_csv_file has always appended to the notes column
+STATUS_NOTES = {
+    "requested": "Address Requested",
+    "not_on_fb": "No Facebook Match",
+}
+_STATUS_MARKERS = [
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r"\s*\|\s*(Status:|Address Requested|No Facebook Match|Facebook.*?20[0-9][0-9]|FB.*?20[0-9][0-9]).*?(?=\s*\||$)",
+        r"^(Address Requested|No Facebook Match|Facebook.*?20[0-9][0-9]|FB.*?20[0-9][0-9]).*?(?=\s*\||$)",
+        r"\s*\|\s*$",
+    )
+]
+
+
+def configure(delay: float = 1.0, max_delay: float = 5.0) -> None:
+    """
+    Set how long edits are batched before being written.
+
+    Args:
+        delay: Seconds without new edits before pending rows are flushed
+        max_delay: Longest an edit waits while new edits keep arriving
+    """
+    with _lock:
+        _config.update(delay=delay, max_delay=max(delay, max_delay))
+
+
+def enqueue(
+    csv_file_path: str,
+    csv_row_number: Optional[int],
+    updates: dict,
+    field_mappings: Dict[str, Optional[str]],
+) -> bool:
+    """
+    Queue an edit to one CSV row for the background writer.
+
+    Edits to the same row are merged, latest value per field winning, so a
+    burst of clicks on one guest becomes a single row update.
+
+    Args:
+        csv_file_path: Uploaded CSV to write back to
+        csv_row_number: 1-based data row of the guest (None skips the edit)
+        updates: Any of "address" and "status"
+        field_mappings: Detected CSV columns ("address", "notes", ...)
+
+    Returns:
+        True if the edit was queued
+    """
+    if csv_row_number is None or csv_row_number < 1:
+        return False
+
+    values = {}
+    if "address" in updates and field_mappings.get("address"):
+        values[field_mappings["address"]] = ("address", updates["address"])
+    if "status" in updates and field_mappings.get("notes"):
+        values[field_mappings["notes"]] = ("status", updates["status"])
+    if not values:
+        return False
+
+    with _lock:
+        rows = _pending.setdefault(csv_file_path, {})
+        if csv_row_number in rows:
+            _stats["coalesced"] += 1
+        rows.setdefault(csv_row_number, {}).update(values)
+        _stats["queued"] += 1
+        _ensure_worker()
+        _lock.notify()
+    return True
+
+
+def forget(csv_file_path: str) -> None:
+    """Write queued edits for a file now, then drop its cached rows."""
+    with _flush_lock:
+        with _lock:
+            rows = _pending.pop(csv_file_path, None)
+        try:
+            if rows:
+                _write_rows(csv_file_path, rows)
+        except Exception as e:
+            logger.error("Error updating CSV file %s: %s", csv_file_path, e)
+        with _lock:
+            _files.pop(csv_file_path, None)
+
+
+def flush() -> int:
+    """
+    Write all queued edits now.
+
+    Returns:
+        Number of files written
+    """
+    with _flush_lock:
+        with _lock:
+            batch = dict(_pending)
+            _pending.clear()
+        if not batch:
+            return 0
+
+        started = time.perf_counter()
+        written = 0
+        for path, rows in batch.items():
+            try:
+                _write_rows(path, rows)
+                written += 1
+            except Exception as e:
+                logger.error("Error updating CSV file %s: %s", path, e)
+                with _lock:
+                    _files.pop(path, None)
+                    _stats["errors"] += 1
+                    _stats["last_error"] = str(e)
+
+        with _lock:
+            _stats["flushes"] += 1
+            _stats["file_writes"] += written
+            _stats["rows_written"] += sum(len(rows) for rows in batch.values())
+            _stats["last_flush_seconds"] = round(time.perf_counter() - started, 4)
+        return written
+
+
+def get_stats() -> dict:
+    """Counters for queued, coalesced and written edits."""
+    with _lock:
+        stats = dict(_stats)
+        stats["pending_rows"] = sum(len(rows) for rows in _pending.values())
+        stats["cached_files"] = len(_files)
+    return stats
+
+
+def _signature(path: str) -> tuple:
+    info = os.stat(path)
+    return (info.st_mtime_ns, info.st_size)
+
+
+def _load(path: str) -> dict:
+    """Rows of path, from the cache unless the file changed on disk."""
+    signature = _signature(path)
+    cached = _files.get(path)
+    if cached and cached["signature"] == signature:
+        return cached
+
+    # Same record numbering as csv_import: blank lines count as rows
+    with open(path, "r", newline="", encoding="utf-8-sig") as file:
+        reader = csv.reader(file)
+        headers = next(reader, [])
+        rows = list(reader)
+
+    cached = {"signature": signature, "headers": headers, "rows": rows}
+    _files[path] = cached
+    return cached
+
+
+def _status_note(current_notes: str, status: str) -> str:
+    notes = current_notes.strip()
+    for pattern in _STATUS_MARKERS:
+        notes = pattern.sub("", notes).strip()
+
+    status_note = STATUS_NOTES.get(status, "")
+    if not status_note:
+        return notes
+    return f"{notes} | {status_note}" if notes else status_note
+
+
+def _write_rows(path: str, updates: Dict[int, dict]) -> None:
+    if not os.path.exists(path):
+        logger.warning("CSV file not found, edits not written back: %s", path)
+        return
+
+    cached = _load(path)
+    headers = cached["headers"]
+    rows = cached["rows"]
+    columns = {header: index for index, header in enumerate(headers)}
+
+    for row_number, values in updates.items():
+        if row_number > len(rows):
+            continue
+        row = rows[row_number - 1]
+        for column, (kind, value) in values.items():
+            index = columns.get(column)
+            if index is None:
+                continue
+            if len(row) <= index:
+                row.extend([""] * (index + 1 - len(row)))
+            if kind == "address":
+                row[index] = value
+            else:
+                row[index] = _status_note(row[index], value)
+
+    _atomic_write(path, headers, rows)
+    cached["signature"] = _signature(path)
+
+
+def _atomic_write(path: str, headers: List[str], rows: List[List[str]]) -> None:
+    """Write to a temp file beside path and rename it over the original."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(
+        dir=directory, prefix=".", suffix=".csv.tmp", text=True
+    )
+    try:
+        with os.fdopen(fd, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(headers)
+            writer.writerows(rows)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def _run() -> None:
+    while True:
+        with _lock:
+            while not _pending:
+                _lock.wait()
+            # Debounce: keep collecting until edits stop for `delay` seconds
+            first_seen = time.monotonic()
+            queued = _stats["queued"]
+            while True:
+                _lock.wait(_config["delay"])
+                if _stats["queued"] == queued:
+                    break
+                if time.monotonic() - first_seen >= _config["max_delay"]:
+                    break
+                queued = _stats["queued"]
+        flush()
+
+
+def _ensure_worker() -> None:
+    """Start the writer thread on first use. Call with _lock held."""
+    global _worker
+    if _worker is None or not _worker.is_alive():
+        _worker = threading.Thread(target=_run, name="csv-writeback", daemon=True)
+        _worker.start()
+
+
+# Don't lose edits still waiting for the debounce when the app stops
+atexit.register(flush)
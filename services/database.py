@@ -0,0 +1,169 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# PRAGMAs applied to every new SQLite connection; None leaves SQLite's default
+_config = {
+    # Readers see the last committed state while a sync rewrites guests
+    "journal_mode": "wal",
+    # Wait this long for another connection's write lock before "database
+    # is locked"
+    "busy_timeout_ms": 10000,
+    # With WAL, fsync at checkpoints only; a power cut can lose the last
+    # commits but never corrupts the database
+    "synchronous": "normal",
+    "cache_size_mb": 64,
+    "mmap_size_mb": 256,
+}
+_stats = {
+    "connections": 0,
+    "pragma_failures": 0,
+    "writes": 0,
+    "contended_writes": 0,
+    "write_wait_seconds": 0.0,
+    "max_write_wait_seconds": 0.0,
+}
+_lock = threading.Lock()
+# Held for each write transaction, so this process's writers queue up here
+# instead of in SQLite's busy handler
+_write_lock = threading.RLock()
+_writer = threading.local()
+
+
+def configure(
+    journal_mode: Optional[str] = "wal",
+    busy_timeout_ms: Optional[int] = 10000,
+    synchronous: Optional[str] = "normal",
+    cache_size_mb: Optional[float] = 64,
+    mmap_size_mb: Optional[float] = 256,
+) -> None:
+    """
+    Set the PRAGMAs applied to SQLite connections opened from now on.
+
+    Call before the first query (connections already in the pool keep their
+    settings). journal_mode is stored in the database file, so switching
+    back from WAL needs journal_mode="delete" rather than None.
+
+    Args:
+        journal_mode: "wal", "delete", ... or None for the default
+        busy_timeout_ms: Milliseconds to wait for another writer
+        synchronous: "normal", "full", ... or None for the default
+        cache_size_mb: Page cache per connection
+        mmap_size_mb: Bytes of the file read through memory mapping (0 = off)
+    """
+    with _lock:
+        _config.update(
+            journal_mode=journal_mode,
+            busy_timeout_ms=busy_timeout_ms,
+            synchronous=synchronous,
+            cache_size_mb=cache_size_mb,
+            mmap_size_mb=mmap_size_mb,
+        )
+
+
+def _pragmas() -> list:
+    with _lock:
+        config = dict(_config)
+    pragmas = []
+    # busy_timeout first, so switching to WAL waits for other connections
+    if config["busy_timeout_ms"] is not None:
+        pragmas.append(f"busy_timeout = {int(config['busy_timeout_ms'])}")
+    if config["journal_mode"]:
+        pragmas.append(f"journal_mode = {config['journal_mode']}")
+    if config["synchronous"]:
+        pragmas.append(f"synchronous = {config['synchronous']}")
+    if config["cache_size_mb"] is not None:
+        # Negative cache_size is in KiB rather than pages
+        pragmas.append(f"cache_size = {-int(config['cache_size_mb'] * 1024)}")
+    if config["mmap_size_mb"] is not None:
+        pragmas.append(f"mmap_size = {int(config['mmap_size_mb'] * 1024 * 1024)}")
+    return pragmas
+
+
+@event.listens_for(Engine, "connect")
+def _apply_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+
+    cursor = dbapi_connection.cursor()
+    failed = 0
+    for pragma in _pragmas():
+        try:
+            cursor.execute(f"PRAGMA {pragma}")
+        except sqlite3.OperationalError as e:
+            # e.g. WAL on a read-only directory; the connection still works
+            failed += 1
+            print(f"SQLite PRAGMA {pragma} failed: {e}")
+    cursor.close()
+
+    with _lock:
+        _stats["connections"] += 1
+        _stats["pragma_failures"] += failed
+
+
+@contextmanager
+def writer():
+    """
+    Run a write transaction after this process's other writers finish.
+
+    Threads that write at the same moment otherwise all hit SQLite's write
+    lock and retry in its busy handler, which is unfair and gives up with
+    "database is locked" after busy_timeout. Re-entrant, so a route holding
+    it can call helpers that take it too. Writers in other processes are
+    still serialized by SQLite itself (with busy_timeout).
+    """
+    if getattr(_writer, "depth", 0):
+        _writer.depth += 1
+        try:
+            yield
+        finally:
+            _writer.depth -= 1
+        return
+
+    started = time.perf_counter()
+    contended = not _write_lock.acquire(blocking=False)
+    if contended:
+        _write_lock.acquire()
+    waited = time.perf_counter() - started
+
+    _writer.depth = 1
+    try:
+        yield
+    finally:
+        _writer.depth = 0
+        _write_lock.release()
+        with _lock:
+            _stats["writes"] += 1
+            if contended:
+                _stats["contended_writes"] += 1
+                _stats["write_wait_seconds"] += waited
+                _stats["max_write_wait_seconds"] = max(
+                    _stats["max_write_wait_seconds"], waited
+                )
+
+
+def serialized_write(view):
+    """Decorator running a whole route inside writer()."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with writer():
+            return view(*args, **kwargs)
+
+    return wrapper
+
+
+def get_stats() -> dict:
+    """Connections configured, PRAGMA failures and write lock contention."""
+    with _lock:
+        stats = dict(_stats)
+        stats["pragmas"] = dict(_config)
+    stats["write_wait_seconds"] = round(stats["write_wait_seconds"], 3)
+    stats["max_write_wait_seconds"] = round(stats["max_write_wait_seconds"], 3)
+    return stats
@@ -0,0 +1,282 @@
+import re
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+from models import normalize_name
+
+# numpy and rapidfuzz are imported where names are scored, so they load on
+# the first duplicate check rather than at app startup
+
+# Minimum token_sort_ratio (0-100) for two names to count as likely duplicates
+DEFAULT_THRESHOLD = 88
+
+# Nickname -> the formal first name it is compared as
+NICKNAMES = {
+    "abby": "abigail",
+    "al": "albert",
+    "alex": "alexander",
+    "andy": "andrew",
+    "becky": "rebecca",
+    "ben": "benjamin",
+    "beth": "elizabeth",
+    "bill": "william",
+    "billy": "william",
+    "bob": "robert",
+    "bobby": "robert",
+    "cathy": "catherine",
+    "charlie": "charles",
+    "chris": "christopher",
+    "chuck": "charles",
+    "dan": "daniel",
+    "danny": "daniel",
+    "dave": "david",
+    "deb": "deborah",
+    "debbie": "deborah",
+    "dick": "richard",
+    "don": "donald",
+    "ed": "edward",
+    "eddie": "edward",
+    "ellie": "eleanor",
+    "greg": "gregory",
+    "jen": "jennifer",
+    "jenny": "jennifer",
+    "jim": "james",
+    "jimmy": "james",
+    "joe": "joseph",
+    "joey": "joseph",
+    "johnny": "john",
+    "jon": "john",
+    "kate": "katherine",
+    "katie": "katherine",
+    "kathy": "katherine",
+    "ken": "kenneth",
+    "kim": "kimberly",
+    "larry": "lawrence",
+    "liz": "elizabeth",
+    "lizzie": "elizabeth",
+    "maggie": "margaret",
+    "matt": "matthew",
+    "meg": "margaret",
+    "mike": "michael",
+    "mikey": "michael",
+    "nate": "nathan",
+    "nick": "nicholas",
+    "pam": "pamela",
+    "pat": "patricia",
+    "peggy": "margaret",
+    "pete": "peter",
+    "phil": "philip",
+    "rich": "richard",
+    "rick": "richard",
+    "rob": "robert",
+    "ron": "ronald",
+    "sam": "samuel",
+    "sandy": "sandra",
+    "steve": "steven",
+    "sue": "susan",
+    "susie": "susan",
+    "ted": "edward",
+    "tim": "timothy",
+    "tom": "thomas",
+    "tommy": "thomas",
+    "tony": "anthony",
+    "vicky": "victoria",
+    "will": "william",
+}
+
+# Honorifics dropped before comparing
+TITLES = {"mr", "mrs", "ms", "miss", "mx", "dr", "prof", "rev", "sir"}
+
+# "Bob & Jane Smith", "Bob and Jane Smith", "Bob + Jane", "Bob / Jane"
+_COUPLE_SPLIT = re.compile(r"\s*(?:&|\+|/|\band\b)\s*")
+_NON_WORD = re.compile(r"[^\w\s'-]")
+
+
+def _clean(name: str) -> List[str]:
+    tokens = _NON_WORD.sub(" ", normalize_name(name)).split()
+    return [token for token in tokens if token.strip("'-") not in TITLES]
+
+
+def people(name: str) -> List[str]:
+    """
+    Comparable names for everyone a guest entry names.
+
+    Couples are split, with the shared surname carried over to a lone first
+    name ("Bob & Jane Smith" -> "robert smith", "jane smith"); case,
+    punctuation and titles are dropped and nicknames map to formal names.
+    """
+    parts = [_clean(part) for part in _COUPLE_SPLIT.split(normalize_name(name))]
+    parts = [part for part in parts if part]
+    if not parts:
+        return []
+
+    surname = parts[-1][-1] if len(parts[-1]) > 1 else None
+    names = []
+    for tokens in parts:
+        if len(tokens) == 1 and surname and tokens[0] != surname:
+            tokens = tokens + [surname]
+        tokens = [NICKNAMES.get(tokens[0], tokens[0])] + tokens[1:]
+        names.append(" ".join(tokens))
+    return names
+
+
+def _block_keys(person: str) -> Tuple[str, ...]:
+    """
+    Blocks a name is compared within; two names are only scored if they
+    share one. Initials catch typos anywhere but the first letters, the
+    surname prefix catches first names the nickname table doesn't know.
+    """
+    tokens = person.split()
+    first, last = tokens[0], tokens[-1]
+    return (f"i:{first[0]}{last[0]}", f"s:{last[:4]}")
+
+
+def _reason(name_a: str, name_b: str, person_a: str, person_b: str) -> str:
+    if len(people(name_a)) > 1 or len(people(name_b)) > 1:
+        return "couple"
+    if person_a == person_b:
+        return (
+            "nickname" if normalize_name(name_a) != normalize_name(name_b) else "same"
+        )
+    return "similar"
+
+
+def find_duplicates(
+    guests: Iterable[Tuple[int, str]], threshold: float = DEFAULT_THRESHOLD
+) -> dict:
+    """
+    Likely duplicate pairs among all guests.
+
+    Each person is placed in a few blocks (see _block_keys) and every block
+    is scored in one rapidfuzz cdist call, so the work grows with block
+    sizes rather than with the square of the guest count.
+
+    Args:
+        guests: (guest_id, name) pairs
+        threshold: Minimum token_sort_ratio (0-100) to report a pair
+
+    Returns:
+        Dict with "pairs" (best score per guest pair, highest first), number
+        of guests, candidate comparisons made and seconds taken
+    """
+    import numpy as np
+    from rapidfuzz import fuzz, process
+
+    started = time.perf_counter()
+    names = {}
+    person_names = []
+    person_guests = []
+    blocks = defaultdict(list)
+
+    for guest_id, name in guests:
+        names[guest_id] = name
+        for person in people(name):
+            index = len(person_names)
+            person_names.append(person)
+            person_guests.append(guest_id)
+            for key in _block_keys(person):
+                blocks[key].append(index)
+
+    person_guests = np.asarray(person_guests)
+    best = {}
+    comparisons = 0
+    for members in blocks.values():
+        if len(members) < 2:
+            continue
+        members = np.asarray(members)
+        choices = [person_names[index] for index in members]
+        scores = process.cdist(
+            choices,
+            choices,
+            scorer=fuzz.token_sort_ratio,
+            score_cutoff=threshold,
+            dtype=np.uint8,
+            workers=-1,
+        )
+        comparisons += len(members) * (len(members) - 1) // 2
+
+        rows, cols = np.nonzero(np.triu(scores, k=1))
+        for row, col, score in zip(rows, cols, scores[rows, cols]):
+            a, b = members[row], members[col]
+            guest_a, guest_b = int(person_guests[a]), int(person_guests[b])
+            if guest_a == guest_b:
+                continue
+            key = (guest_a, guest_b) if guest_a < guest_b else (guest_b, guest_a)
+            if key not in best or score > best[key][0]:
+                best[key] = (int(score), a, b)
+
+    pairs = []
+    for (guest_a, guest_b), (score, a, b) in best.items():
+        pairs.append(
+            {
+                "guest_ids": [guest_a, guest_b],
+                "names": [names[guest_a], names[guest_b]],
+                "score": score,
+                "reason": _reason(
+                    names[guest_a], names[guest_b], person_names[a], person_names[b]
+                ),
+            }
+        )
+    pairs.sort(key=lambda pair: (-pair["score"], pair["names"]))
+
+    return {
+        "pairs": pairs,
+        "guests": len(names),
+        "comparisons": comparisons,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def similar_guests(
+    name: str,
+    guests: Iterable[Tuple[int, str]],
+    threshold: float = DEFAULT_THRESHOLD,
+    limit: int = 5,
+) -> List[Dict[str, object]]:
+    """
+    Existing guests that look like the same person(s) as name.
+
+    Args:
+        name: Name about to be added
+        guests: (guest_id, name) pairs of existing guests
+        threshold: Minimum token_sort_ratio (0-100) to report a guest
+        limit: Most matches to return
+
+    Returns:
+        Matches as {"guest_id", "name", "score"}, best first
+    """
+    import numpy as np
+    from rapidfuzz import fuzz, process
+
+    targets = people(name)
+    if not targets:
+        return []
+    keys = {key for person in targets for key in _block_keys(person)}
+
+    candidates = []
+    candidate_guests = []
+    for guest_id, guest_name in guests:
+        for person in people(guest_name):
+            if keys.intersection(_block_keys(person)):
+                candidates.append(person)
+                candidate_guests.append((guest_id, guest_name))
+    if not candidates:
+        return []
+
+    scores = process.cdist(
+        targets,
+        candidates,
+        scorer=fuzz.token_sort_ratio,
+        score_cutoff=threshold,
+        dtype=np.uint8,
+    ).max(axis=0)
+
+    best = {}
+    for index in np.nonzero(scores)[0]:
+        guest_id, guest_name = candidate_guests[index]
+        score = int(scores[index])
+        if guest_id not in best or score > best[guest_id]["score"]:
+            best[guest_id] = {"guest_id": guest_id, "name": guest_name, "score": score}
+
+    return sorted(best.values(), key=lambda match: -match["score"])[:limit]
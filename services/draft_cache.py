@@ -0,0 +1,163 @@
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import delete, select, update
+
+from models import db, DraftMessage
+
+# Cache hits refresh last_used_at at most this often, so reading /review
+# doesn't turn every page load into a write
+TOUCH_INTERVAL = timedelta(minutes=10)
+
+
+def wedding_details_hash(wedding_details: Optional[dict]) -> str:
+    """Stable hash of the wedding details that shape a drafted message."""
+    details = wedding_details or {}
+    payload = json.dumps(
+        {
+            "bride_name": details.get("bride_name", ""),
+            "groom_name": details.get("groom_name", ""),
+            "wedding_date": details.get("wedding_date", ""),
+            "message_sender": details.get("message_sender", ""),
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def get_cached_messages(
+    first_names: Dict[int, str],
+    ollama_model: str,
+    wedding_details: dict = None,
+    ttl_hours: float = 168,
+) -> Dict[int, str]:
+    """
+    Look up cached drafts for a page of guests.
+
+    Args:
+        first_names: Mapping of guest id to the name used in the prompt
+        ollama_model: Model the drafts were generated with
+        wedding_details: Wedding details the drafts were generated with
+        ttl_hours: Entries older than this are treated as missing
+
+    Returns:
+        Mapping of guest id to cached message for every cache hit
+    """
+    if not first_names or not ollama_model:
+        return {}
+
+    settings_hash = wedding_details_hash(wedding_details)
+    cutoff = datetime.utcnow() - timedelta(hours=ttl_hours)
+
+    rows = db.session.execute(
+        select(
+            DraftMessage.id,
+            DraftMessage.guest_id,
+            DraftMessage.first_name,
+            DraftMessage.message,
+            DraftMessage.last_used_at,
+        ).where(
+            DraftMessage.guest_id.in_(list(first_names)),
+            DraftMessage.ollama_model == ollama_model,
+            DraftMessage.settings_hash == settings_hash,
+            DraftMessage.created_at >= cutoff,
+        )
+    ).all()
+
+    now = datetime.utcnow()
+    hits = {}
+    stale_ids = []
+    for row in rows:
+        if first_names.get(row.guest_id) == row.first_name:
+            hits[row.guest_id] = row.message
+            if row.last_used_at is None or row.last_used_at < now - TOUCH_INTERVAL:
+                stale_ids.append(row.id)
+
+    if stale_ids:
+        # Touch hits so LRU eviction keeps the pages people are actually reading
+        db.session.execute(
+            update(DraftMessage)
+            .where(DraftMessage.id.in_(stale_ids))
+            .values(last_used_at=now)
+        )
+        db.session.commit()
+
+    return hits
+
+
+def store_messages(
+    messages: Dict[int, str],
+    first_names: Dict[int, str],
+    ollama_model: str,
+    wedding_details: dict = None,
+    max_entries: int = 5000,
+    ttl_hours: float = 168,
+) -> None:
+    """
+    Store freshly drafted messages and evict expired or least recently used ones.
+
+    Args:
+        messages: Mapping of guest id to drafted message
+        first_names: Mapping of guest id to the name used in the prompt
+        ollama_model: Model the drafts were generated with
+        wedding_details: Wedding details the drafts were generated with
+        max_entries: Maximum number of cached drafts to keep
+        ttl_hours: Entries older than this are purged
+    """
+    if not messages or not ollama_model:
+        return
+
+    settings_hash = wedding_details_hash(wedding_details)
+    now = datetime.utcnow()
+
+    # Replace any previous draft for these guests under the same model/settings
+    db.session.execute(
+        delete(DraftMessage).where(
+            DraftMessage.guest_id.in_(list(messages)),
+            DraftMessage.ollama_model == ollama_model,
+            DraftMessage.settings_hash == settings_hash,
+        )
+    )
+    db.session.add_all(
+        DraftMessage(
+            guest_id=guest_id,
+            first_name=first_names[guest_id],
+            ollama_model=ollama_model,
+            settings_hash=settings_hash,
+            message=message,
+            created_at=now,
+            last_used_at=now,
+        )
+        for guest_id, message in messages.items()
+    )
+    db.session.flush()
+
+    _evict(max_entries, ttl_hours)
+    db.session.commit()
+
+
+def _evict(max_entries: int, ttl_hours: float) -> None:
+    """Drop expired drafts, then the least recently used beyond max_entries."""
+    cutoff = datetime.utcnow() - timedelta(hours=ttl_hours)
+    db.session.execute(delete(DraftMessage).where(DraftMessage.created_at < cutoff))
+
+    overflow = db.session.scalar(select(db.func.count(DraftMessage.id))) - max_entries
+    if overflow > 0:
+        oldest = (
+            select(DraftMessage.id)
+            .order_by(DraftMessage.last_used_at, DraftMessage.id)
+            .limit(overflow)
+        )
+        db.session.execute(delete(DraftMessage).where(DraftMessage.id.in_(oldest)))
+
+
+def invalidate_guest(guest_id: int) -> None:
+    """Forget every cached draft for a guest (caller commits)."""
+    db.session.execute(delete(DraftMessage).where(DraftMessage.guest_id == guest_id))
+
+
+def invalidate_all() -> None:
+    """Forget every cached draft, e.g. after wedding settings change (caller commits)."""
+    db.session.execute(delete(DraftMessage))
@@ -0,0 +1,230 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Dict, Hashable, Iterator, Tuple
+
+import requests
+
+from services.ollama import (
+    clean_generated_text,
+    fallback_message,
+    generate_message,
+    generate_messages_batch,
+    stream_message,
+)
+
+
+def draft_page_messages(
+    first_names: Dict[Hashable, str],
+    ollama_base_url: str,
+    ollama_model: str,
+    wedding_details: dict = None,
+    fallback: Callable[[str], str] = None,
+    timeout: float = 5,
+    max_workers: int = 4,
+    deadline: float = 8,
+    batch_size: int = 1,
+) -> Tuple[Dict[Hashable, str], dict]:
+    """
+    Draft messages for a whole page of guests in parallel.
+
+    Every name is submitted to a bounded thread pool and the page waits at most
+    `deadline` seconds in total. Guests whose draft is not ready by then get the
+    deterministic fallback message instead of holding up the page.
+
+    Args:
+        first_names: Mapping of guest key (usually guest id) to first name
+        ollama_base_url: Ollama server base URL
+        ollama_model: Model name to use
+        wedding_details: Wedding details passed through to generate_message
+        fallback: Callable returning the fallback message for a first name
+        timeout: Per-request timeout in seconds
+        max_workers: Maximum number of concurrent Ollama requests
+        deadline: Maximum seconds to wait for the whole page
+        batch_size: Names per Ollama request; above 1 uses batched prompts
+
+    Returns:
+        Tuple of (messages: Dict[key, str], stats: dict) where stats holds the
+        page latency, how many guests were drafted or fell back, and the keys
+        whose message actually came from Ollama ("drafted_keys")
+    """
+    started = time.perf_counter()
+    messages = {}
+    stats = {
+        "count": len(first_names),
+        "drafted": 0,
+        "fallbacks": 0,
+        "seconds": 0.0,
+        "drafted_keys": [],
+    }
+
+    if not first_names:
+        return messages, stats
+
+    fallback = fallback or fallback_message
+
+    # A single request can never outlive the page deadline
+    request_timeout = min(timeout, deadline)
+    keys = list(first_names)
+    if batch_size > 1:
+        chunks = [keys[i : i + batch_size] for i in range(0, len(keys), batch_size)]
+    else:
+        chunks = [[key] for key in keys]
+    workers = max(1, min(max_workers, len(chunks)))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="draft")
+
+    def draft_chunk(chunk):
+        if batch_size > 1:
+            generated = generate_messages_batch(
+                [first_names[key] for key in chunk],
+                ollama_base_url,
+                ollama_model,
+                wedding_details,
+                request_timeout,
+            )
+            return {key: generated.get(first_names[key]) for key in chunk}
+
+        key = chunk[0]
+        return {
+            key: generate_message(
+                first_names[key],
+                ollama_base_url,
+                ollama_model,
+                wedding_details,
+                request_timeout,
+            )
+        }
+
+    futures = []
+    try:
+        futures = [executor.submit(draft_chunk, chunk) for chunk in chunks]
+        done, _ = wait(futures, timeout=deadline)
+
+        for future, chunk in zip(futures, chunks):
+            generated = {}
+            if future in done and future.exception() is None:
+                generated = future.result()
+
+            for key in chunk:
+                message = generated.get(key)
+                if message:
+                    messages[key] = message
+                    stats["drafted"] += 1
+                    stats["drafted_keys"].append(key)
+                else:
+                    messages[key] = fallback(first_names[key])
+                    stats["fallbacks"] += 1
+    finally:
+        # Don't block the page on stragglers; they end with their own timeout.
+        # Queued chunks are cancelled by hand (cancel_futures needs 3.9)
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    return messages, stats
+
+
+def stream_page_messages(
+    first_names: Dict[Hashable, str],
+    ollama_base_url: str,
+    ollama_model: str,
+    wedding_details: dict = None,
+    fallback: Callable[[str], str] = None,
+    timeout: float = 10,
+    max_workers: int = 4,
+    deadline: float = 30,
+) -> Iterator[dict]:
+    """
+    Stream drafts for a page of guests as Ollama produces them.
+
+    Guests are streamed in parallel on a bounded thread pool and their chunks
+    are interleaved in arrival order.
+
+    Args:
+        first_names: Mapping of guest key (usually guest id) to first name
+        ollama_base_url: Ollama server base URL
+        ollama_model: Model name to use
+        wedding_details: Wedding details passed through to stream_message
+        fallback: Callable returning the fallback message for a first name
+        timeout: Seconds to wait for Ollama to connect or send the next chunk
+        max_workers: Maximum number of concurrent Ollama streams
+        deadline: Maximum seconds to stream for the whole page
+
+    Yields:
+        {"type": "token", "guest_id": key, "text": chunk} while drafting, then
+        exactly one {"type": "done", "guest_id": key, "message": str,
+        "drafted": bool} per guest; guests still drafting at the deadline get
+        the fallback message
+    """
+    if not first_names:
+        return
+
+    fallback = fallback or fallback_message
+    events = queue.Queue()
+    stop = threading.Event()
+
+    def worker(key, first_name):
+        parts = []
+        message = None
+        try:
+            for chunk in stream_message(
+                first_name, ollama_base_url, ollama_model, wedding_details, timeout
+            ):
+                if stop.is_set():
+                    return
+                parts.append(chunk)
+                events.put({"type": "token", "guest_id": key, "text": chunk})
+            message = clean_generated_text("".join(parts))
+        except (requests.RequestException, ValueError):
+            pass
+        events.put({"type": "done", "guest_id": key, "message": message})
+
+    workers = max(1, min(max_workers, len(first_names)))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stream")
+    pending = set(first_names)
+    ends_at = time.monotonic() + deadline
+
+    futures = []
+    try:
+        for key, first_name in first_names.items():
+            futures.append(executor.submit(worker, key, first_name))
+
+        while pending:
+            remaining = ends_at - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                event = events.get(timeout=remaining)
+            except queue.Empty:
+                break
+
+            key = event["guest_id"]
+            if key not in pending:
+                continue
+
+            if event["type"] == "done":
+                pending.discard(key)
+                message = event["message"]
+                event = {
+                    "type": "done",
+                    "guest_id": key,
+                    "message": message or fallback(first_names[key]),
+                    "drafted": bool(message),
+                }
+            yield event
+
+        for key in list(pending):
+            yield {
+                "type": "done",
+                "guest_id": key,
+                "message": fallback(first_names[key]),
+                "drafted": False,
+            }
+    finally:
+        # Stop streams the client no longer waits for
+        stop.set()
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
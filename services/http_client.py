@@ -0,0 +1,192 @@
+import threading
+from typing import Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) timeouts in seconds for each kind of outbound call
+TIMEOUT_PROFILES = {
+    "health": (2, 2),
+    "models": (3, 10),
+    "generate": (3, 30),
+    "pull": (5, 300),
+    "sheet": (5, 30),
+}
+
+_config = {
+    "pool_connections": 4,
+    "pool_maxsize": 10,
+    "max_retries": 2,
+    "backoff_factor": 0.3,
+}
+_session = None
+_lock = threading.Lock()
+_profile_counts = {}
+
+
+def configure(
+    pool_connections: int = 4,
+    pool_maxsize: int = 10,
+    max_retries: int = 2,
+    backoff_factor: float = 0.3,
+) -> None:
+    """
+    Set the connection pool and retry policy for the shared session.
+
+    Args:
+        pool_connections: Number of hosts to keep connection pools for
+        pool_maxsize: Keep-alive connections kept per host; should cover the
+            number of threads calling the same host at once
+        max_retries: Retries for requests that could not connect
+        backoff_factor: Exponential backoff between retries, in seconds
+    """
+    global _session
+
+    with _lock:
+        _config.update(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=max_retries,
+            backoff_factor=backoff_factor,
+        )
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def _build_session() -> requests.Session:
+    # Only connection failures are retried: the request never reached the
+    # server, so even a POST to /api/generate is safe to send again
+    retry = Retry(
+        total=_config["max_retries"],
+        connect=_config["max_retries"],
+        read=0,
+        status=0,
+        other=0,
+        allowed_methods=None,
+        backoff_factor=_config["backoff_factor"],
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=_config["pool_connections"],
+        pool_maxsize=_config["pool_maxsize"],
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide session, creating it on first use."""
+    global _session
+
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def timeout_for(profile: str, timeout: Optional[float] = None) -> Tuple[float, float]:
+    """
+    Build a (connect, read) timeout for a profile.
+
+    Args:
+        profile: Key of TIMEOUT_PROFILES
+        timeout: Caller's timeout in seconds; replaces the read timeout and
+            caps the connect timeout
+
+    Returns:
+        Tuple of (connect_timeout, read_timeout)
+    """
+    connect, read = TIMEOUT_PROFILES[profile]
+    if timeout is not None:
+        connect, read = min(connect, timeout), timeout
+    return connect, read
+
+
+def request(
+    method: str,
+    url: str,
+    profile: str,
+    timeout: Optional[Union[float, Tuple[float, float]]] = None,
+    **kwargs,
+) -> requests.Response:
+    """
+    Send a request through the shared keep-alive session.
+
+    Args:
+        method: HTTP method
+        url: Request URL
+        profile: Timeout profile name (see TIMEOUT_PROFILES)
+        timeout: Optional override for the profile's read timeout
+        **kwargs: Passed through to requests.Session.request
+
+    Returns:
+        The requests.Response; use it as a context manager when stream=True
+    """
+    with _lock:
+        _profile_counts[profile] = _profile_counts.get(profile, 0) + 1
+
+    return get_session().request(
+        method, url, timeout=timeout_for(profile, timeout), **kwargs
+    )
+
+
+def get(url: str, profile: str, timeout: Optional[float] = None, **kwargs):
+    """GET through the shared session."""
+    return request("GET", url, profile, timeout, **kwargs)
+
+
+def post(url: str, profile: str, timeout: Optional[float] = None, **kwargs):
+    """POST through the shared session."""
+    return request("POST", url, profile, timeout, **kwargs)
+
+
+def connection_stats() -> dict:
+    """
+    Report how well connections are being reused.
+
+    Counts come from the live urllib3 pools, so hosts whose pool was evicted
+    (more hosts than pool_connections) drop out of the totals.
+
+    Returns:
+        Dict with total requests, new connections opened, reuse rate and a
+        per-host breakdown
+    """
+    hosts = []
+    with _lock:
+        session = _session
+        by_profile = dict(_profile_counts)
+
+    if session is not None:
+        adapter = session.get_adapter("http://")
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            hosts.append(
+                {
+                    "host": f"{pool.scheme}://{pool.host}:{pool.port}",
+                    "requests": pool.num_requests,
+                    "connections": pool.num_connections,
+                }
+            )
+
+    total_requests = sum(host["requests"] for host in hosts)
+    total_connections = sum(host["connections"] for host in hosts)
+    reused = max(0, total_requests - total_connections)
+
+    return {
+        "requests": total_requests,
+        "connections_opened": total_connections,
+        "reused": reused,
+        "reuse_rate": round(reused / total_requests, 3) if total_requests else 0.0,
+        "pool_maxsize": _config["pool_maxsize"],
+        "by_profile": by_profile,
+        "hosts": hosts,
+    }
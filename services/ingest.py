@@ -0,0 +1,64 @@
+import time
+from typing import Iterable
+
+from sqlalchemy import insert
+
+from models import db, Guest, normalize_name
+
+# Columns a guest row may set; anything else in the row dicts is ignored
+GUEST_COLUMNS = (
+    "name",
+    "address",
+    "note",
+    "facebook_profile",
+    "status",
+    "csv_row_number",
+)
+
+
+def bulk_insert_guests(rows: Iterable[dict], chunk_size: int = 1000) -> dict:
+    """
+    Insert many guests with Core executemany, chunk_size rows per statement.
+
+    Rows skip the ORM unit of work entirely, so no Guest objects are built
+    or tracked. Everything runs in the caller's transaction; commit once
+    afterwards so the import is all-or-nothing.
+
+    Args:
+        rows: Guest dicts (e.g. from process_guest_data)
+        chunk_size: Rows per executemany call
+
+    Returns:
+        Stats dict with inserted count, number of chunks and seconds taken
+    """
+    started = time.perf_counter()
+    statement = insert(Guest.__table__)
+    inserted = 0
+    chunks = 0
+
+    chunk = []
+    for row in rows:
+        values = {column: row.get(column) for column in GUEST_COLUMNS}
+        # executemany needs the same keys in every row, so column defaults
+        # for explicit None values have to be applied here
+        values["status"] = values["status"] or "needs_address"
+        values["name_normalized"] = normalize_name(values["name"])
+        chunk.append(values)
+        if len(chunk) >= chunk_size:
+            db.session.execute(statement, chunk)
+            inserted += len(chunk)
+            chunks += 1
+            chunk = []
+
+    if chunk:
+        db.session.execute(statement, chunk)
+        inserted += len(chunk)
+        chunks += 1
+
+    seconds = time.perf_counter() - started
+    return {
+        "inserted": inserted,
+        "chunks": chunks,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(inserted / seconds) if seconds > 0 else inserted,
+    }
@@ -1,50 +1,20 @@
 import requests
 import json
-from typing import Optional, Dict, List, Tuple
+from typing import Optional, Dict, Iterator, List, Tuple
 
+from services import http_client
 
-def draft_message(
-    friend_name: str,
-    ollama_base_url: str,
-    ollama_model: str,
-    wedding_details: dict = None,
-    timeout: int = 10,
-) -> str:
+
+def fallback_message(friend_name: str) -> str:
     """
-    Draft a friendly message using Ollama API.
+    Pick a deterministic fallback message for a friend.
 
     Args:
         friend_name: Name of the friend to message
-        ollama_base_url: Ollama server base URL
-        ollama_model: Model name to use
-        timeout: Request timeout in seconds
 
     Returns:
-        Generated message or fallback text if API fails
+        Fallback text that is unique per name but stable across calls
     """
-    # Get wedding details or use defaults
-    if wedding_details:
-        bride_name = wedding_details.get("bride_name", "Jessica")
-        groom_name = wedding_details.get("groom_name", "Charles")
-        wedding_date = wedding_details.get("wedding_date", "")
-        message_sender = wedding_details.get("message_sender", "both")
-    else:
-        bride_name = "Jessica"
-        groom_name = "Charles"
-        wedding_date = ""
-        message_sender = "both"
-
-    # Determine couple name and sender
-    if message_sender == "bride":
-        couple_name = bride_name
-        sender_sig = bride_name
-    elif message_sender == "groom":
-        couple_name = groom_name
-        sender_sig = groom_name
-    else:  # both
-        couple_name = f"{groom_name} & {bride_name}"
-        sender_sig = f"{groom_name} & {bride_name}"
-
     # Create unique fallback messages for each person (no dates, no signatures)
     import random
     import hashlib
@@ -76,116 +46,393 @@ def draft_message(
         f"Emergency broadcast {friend_name}: Save the date requires immediate address extraction!",
     ]
 
-    fallback_message = name_rng.choice(fallback_options)
+    return name_rng.choice(fallback_options)
+
+
+def draft_message(
+    friend_name: str,
+    ollama_base_url: str,
+    ollama_model: str,
+    wedding_details: dict = None,
+    timeout: int = 10,
+) -> str:
+    """
+    Draft a friendly message using Ollama API.
+
+    Args:
+        friend_name: Name of the friend to message
+        ollama_base_url: Ollama server base URL
+        ollama_model: Model name to use
+        timeout: Request timeout in seconds
+
+    Returns:
+        Generated message or fallback text if API fails
+    """
+    message = generate_message(
+        friend_name, ollama_base_url, ollama_model, wedding_details, timeout
+    )
+    return message if message else fallback_message(friend_name)
+
+
+def _wedding_context(wedding_details: dict = None) -> str:
+    """
+    Prompt line telling the model whose save the date it writes for.
+
+    Args:
+        wedding_details: Bride, groom, date and sender from Settings
+
+    Returns:
+        Sentence for the prompt; the message itself still names nobody
+    """
+    # Get wedding details or use defaults
+    if wedding_details:
+        bride_name = wedding_details.get("bride_name") or "Jessica"
+        groom_name = wedding_details.get("groom_name") or "Charles"
+        wedding_date = wedding_details.get("wedding_date") or ""
+        message_sender = wedding_details.get("message_sender") or "both"
+    else:
+        bride_name = "Jessica"
+        groom_name = "Charles"
+        wedding_date = ""
+        message_sender = "both"
+
+    # Determine sender
+    if message_sender == "bride":
+        sender = bride_name
+    elif message_sender == "groom":
+        sender = groom_name
+    else:  # both
+        sender = f"{groom_name} & {bride_name}"
+
+    date_info = f" on {wedding_date}" if wedding_date else ""
+    return (
+        f"Context (do not repeat it in the message): you are {sender}, "
+        f"collecting addresses for the save the date of {groom_name} & "
+        f"{bride_name}'s wedding{date_info}."
+    )
+
+
+def build_draft_payload(
+    friend_name: str,
+    ollama_model: str,
+    wedding_details: dict = None,
+    stream: bool = False,
+) -> dict:
+    """
+    Build the /api/generate payload for drafting a single friend's message.
+
+    Args:
+        friend_name: Name of the friend to message
+        ollama_model: Model name to use
+        wedding_details: Bride, groom, date and sender from Settings
+        stream: Whether Ollama should stream the response
+
+    Returns:
+        JSON payload for Ollama's generate endpoint
+    """
+    context = _wedding_context(wedding_details)
+
+    # Add randomization to ensure unique messages
+    import random
+    import time
+
+    random.seed(int(time.time() * 1000) + hash(friend_name))
+
+    styles = [
+        "super casual and funny",
+        "playfully dramatic",
+        "hilariously over-the-top",
+        "charmingly silly",
+        "witty and clever",
+        "goofily enthusiastic",
+        "sarcastically sweet",
+    ]
+
+    scenarios = [
+        "save the date emergency",
+        "address collection mission",
+        "fancy save the date delivery quest",
+        "mailbox invasion plan",
+        "save the date distribution operation",
+    ]
+
+    chosen_style = random.choice(styles)
+    chosen_scenario = random.choice(scenarios)
+    randomizer = random.randint(1000, 9999)
+
+    prompt = f"""You are writing message #{randomizer} for {friend_name}. Be {chosen_style} about this {chosen_scenario}.
+
+    {context}
+
+    CRITICAL: This message must be COMPLETELY DIFFERENT from any previous message. Be creative and original!
+    
+    Write a unique, funny message to {friend_name} asking for their address for a save the date card.
+    
+    Requirements:
+    - Make it {chosen_style} and totally unique 
+    - Use ONLY {friend_name}'s FIRST NAME
+    - Keep under 30 words
+    - Be playful about the {chosen_scenario}
+    - Try wordplay or puns with "{friend_name}" if possible
+    - NO emojis (text only)
+    - NO signatures or names at the end
+    - NO mention of specific dates or couple names
+    - NO quotation marks anywhere in the message
+    - Make it sound like YOU are asking for the address
+    - Mention it's for a save the date card in a funny way
+    
+    Different approaches to try:
+    - Rhyming messages with {friend_name}
+    - Alliteration with their name
+    - Funny analogies 
+    - Silly threats (like carrier pigeons)
+    - Over-dramatic pleas
+    - Clever wordplay with {friend_name}
+    - Random humor styles
+    
+    Make this message #{randomizer} completely unique and personal for {friend_name}:"""
+
+    payload = {
+        "model": ollama_model,
+        "prompt": prompt,
+        "stream": stream,
+        "options": {
+            "temperature": 1.2,  # Higher temperature for more creativity
+            "top_p": 0.95,
+            "top_k": 50,
+            "repeat_penalty": 1.3,  # Prevent repetitive responses
+            "seed": randomizer,  # Use random seed for each person
+        },
+    }
+
+    return payload
+
+
+def _generate_url(ollama_base_url: str) -> str:
+    """Ensure URL ends with /api/generate"""
+    base_url = ollama_base_url.rstrip("/")
+    if not base_url.endswith("/api/generate"):
+        base_url += "/api/generate"
+    return base_url
+
+
+def generate_message(
+    friend_name: str,
+    ollama_base_url: str,
+    ollama_model: str,
+    wedding_details: dict = None,
+    timeout: int = 10,
+) -> Optional[str]:
+    """
+    Generate a friendly message using Ollama API without falling back.
 
+    Args:
+        friend_name: Name of the friend to message
+        ollama_base_url: Ollama server base URL
+        ollama_model: Model name to use
+        timeout: Request timeout in seconds
+
+    Returns:
+        Generated message, or None if Ollama is not configured or fails
+    """
     if not ollama_base_url or not ollama_model:
-        return fallback_message
+        return None
 
     try:
-        # Ensure URL ends with /api/generate
-        base_url = ollama_base_url.rstrip("/")
-        if not base_url.endswith("/api/generate"):
-            base_url += "/api/generate"
+        response = http_client.post(
+            _generate_url(ollama_base_url),
+            "generate",
+            json=build_draft_payload(friend_name, ollama_model, wedding_details),
+            timeout=timeout,
+            headers={"Content-Type": "application/json"},
+        )
+
+        if response.status_code == 200:
+            result = response.json()
+            return clean_generated_text(result.get("response", ""))
+
+        return None
+
+    except (requests.RequestException, json.JSONDecodeError, KeyError):
+        return None
+
+
+def stream_message(
+    friend_name: str,
+    ollama_base_url: str,
+    ollama_model: str,
+    wedding_details: dict = None,
+    timeout: int = 10,
+) -> Iterator[str]:
+    """
+    Stream a friendly message from Ollama chunk by chunk.
+
+    Args:
+        friend_name: Name of the friend to message
+        ollama_base_url: Ollama server base URL
+        ollama_model: Model name to use
+        timeout: Timeout in seconds for connecting and between chunks
+
+    Yields:
+        Raw text chunks as the model produces them; run the joined text
+        through clean_generated_text before using it
+
+    Raises:
+        requests.RequestException or ValueError if Ollama fails mid-stream
+    """
+    if not ollama_base_url or not ollama_model:
+        return
+
+    payload = build_draft_payload(
+        friend_name, ollama_model, wedding_details, stream=True
+    )
+    with http_client.post(
+        _generate_url(ollama_base_url),
+        "generate",
+        json=payload,
+        timeout=timeout,
+        stream=True,
+        headers={"Content-Type": "application/json"},
+    ) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if not line:
+                continue
+            chunk = json.loads(line)
+            if chunk.get("response"):
+                yield chunk["response"]
+            if chunk.get("done"):
+                break
+
+
+def clean_generated_text(generated_text) -> Optional[str]:
+    """
+    Clean up a generated message and check it is usable.
+
+    Args:
+        generated_text: Raw text returned by the model
+
+    Returns:
+        ASCII-only message under 200 characters, or None if it isn't usable
+    """
+    if not isinstance(generated_text, str):
+        return None
+
+    # Clean up the text - remove emojis and problematic unicode characters
+    import re
+
+    # Remove emoji and other unicode symbols, keep only basic text
+    generated_text = re.sub(r"[^\x00-\x7F]+", "", generated_text)
+    generated_text = generated_text.strip()
+
+    # Basic validation - ensure message isn't too long or empty
+    if generated_text and len(generated_text) < 200:
+        return generated_text
+
+    return None
+
+
+def generate_messages_batch(
+    friend_names: List[str],
+    ollama_base_url: str,
+    ollama_model: str,
+    wedding_details: dict = None,
+    timeout: int = 60,
+) -> Dict[str, Optional[str]]:
+    """
+    Generate messages for several friends with a single Ollama request.
+
+    The shared instructions are sent once and the model is asked for a JSON
+    object mapping each name to its message. Every entry goes through the same
+    cleanup as single-guest drafts.
+
+    Args:
+        friend_names: Names of the friends to message
+        ollama_base_url: Ollama server base URL
+        ollama_model: Model name to use
+        wedding_details: Bride, groom, date and sender from Settings
+        timeout: Request timeout in seconds
+
+    Returns:
+        Mapping of every requested name to its message, or None for names the
+        model skipped or answered with something unusable
+    """
+    names = list(dict.fromkeys(friend_names))
+    messages = {name: None for name in names}
 
-        # Add randomization to ensure unique messages
+    if not names or not ollama_base_url or not ollama_model:
+        return messages
+
+    try:
         import random
         import time
 
-        random.seed(int(time.time() * 1000) + hash(friend_name))
-
-        styles = [
-            "super casual and funny",
-            "playfully dramatic",
-            "hilariously over-the-top",
-            "charmingly silly",
-            "witty and clever",
-            "goofily enthusiastic",
-            "sarcastically sweet",
-        ]
-
-        scenarios = [
-            "save the date emergency",
-            "address collection mission",
-            "fancy save the date delivery quest",
-            "mailbox invasion plan",
-            "save the date distribution operation",
-        ]
-
-        chosen_style = random.choice(styles)
-        chosen_scenario = random.choice(scenarios)
+        random.seed(int(time.time() * 1000) + hash(tuple(names)))
         randomizer = random.randint(1000, 9999)
 
-        date_info = f" on {wedding_date}" if wedding_date else ""
+        prompt = f"""Write a unique, funny message to each person below asking for their address for a save the date card.
 
-        prompt = f"""You are writing message #{randomizer} for {friend_name}. Be {chosen_style} about this {chosen_scenario}.
+        {_wedding_context(wedding_details)}
 
-        CRITICAL: This message must be COMPLETELY DIFFERENT from any previous message. Be creative and original!
-        
-        Write a unique, funny message to {friend_name} asking for their address for a save the date card.
-        
-        Requirements:
-        - Make it {chosen_style} and totally unique 
-        - Use ONLY {friend_name}'s FIRST NAME
+        Requirements for every message:
+        - Use ONLY the person's first name, try wordplay, puns or rhymes with it
         - Keep under 30 words
-        - Be playful about the {chosen_scenario}
-        - Try wordplay or puns with "{friend_name}" if possible
-        - NO emojis (text only)
-        - NO signatures or names at the end
-        - NO mention of specific dates or couple names
-        - NO quotation marks anywhere in the message
+        - NO emojis, NO quotation marks, NO signatures, NO dates or couple names
         - Make it sound like YOU are asking for the address
-        - Mention it's for a save the date card in a funny way
-        
-        Different approaches to try:
-        - Rhyming messages with {friend_name}
-        - Alliteration with their name
-        - Funny analogies 
-        - Silly threats (like carrier pigeons)
-        - Over-dramatic pleas
-        - Clever wordplay with {friend_name}
-        - Random humor styles
-        
-        Make this message #{randomizer} completely unique and personal for {friend_name}:"""
+        - Every message must use a different style (rhymes, alliteration, silly threats like carrier pigeons, over-dramatic pleas)
+
+        Names: {json.dumps(names)}
+
+        Answer with a JSON object whose keys are exactly these names and whose values are the messages."""
 
         payload = {
             "model": ollama_model,
             "prompt": prompt,
             "stream": False,
+            "format": "json",
             "options": {
                 "temperature": 1.2,  # Higher temperature for more creativity
                 "top_p": 0.95,
                 "top_k": 50,
                 "repeat_penalty": 1.3,  # Prevent repetitive responses
-                "seed": randomizer,  # Use random seed for each person
+                "seed": randomizer,
             },
         }
 
-        response = requests.post(
-            base_url,
+        response = http_client.post(
+            _generate_url(ollama_base_url),
+            "generate",
             json=payload,
             timeout=timeout,
             headers={"Content-Type": "application/json"},
         )
 
-        if response.status_code == 200:
-            result = response.json()
-            generated_text = result.get("response", "").strip()
-
-            # Clean up the text - remove emojis and problematic unicode characters
-            import re
-
-            # Remove emoji and other unicode symbols, keep only basic text
-            generated_text = re.sub(r"[^\x00-\x7F]+", "", generated_text)
-            generated_text = generated_text.strip()
-
-            # Basic validation - ensure message isn't too long or empty
-            if generated_text and len(generated_text) < 200:
-                return generated_text
+        if response.status_code != 200:
+            return messages
+
+        parsed = json.loads(response.json().get("response", ""))
+    except (requests.RequestException, json.JSONDecodeError, KeyError, ValueError):
+        return messages
+
+    # Accept {"name": "message"}, {"messages": {...}} or a list of {name, message}
+    if isinstance(parsed, dict) and len(parsed) == 1:
+        inner = next(iter(parsed.values()))
+        if isinstance(inner, (dict, list)):
+            parsed = inner
+    if isinstance(parsed, list):
+        parsed = {
+            item.get("name"): item.get("message")
+            for item in parsed
+            if isinstance(item, dict)
+        }
+    if not isinstance(parsed, dict):
+        return messages
 
-        return fallback_message
+    by_lower_name = {str(key).strip().lower(): value for key, value in parsed.items()}
+    for name in names:
+        messages[name] = clean_generated_text(by_lower_name.get(name.lower()))
 
-    except (requests.RequestException, json.JSONDecodeError, KeyError):
-        return fallback_message
+    return messages
 
 
 def test_ollama_connection(ollama_base_url: str, timeout: int = 5) -> Tuple[bool, str]:
@@ -206,7 +453,7 @@ def test_ollama_connection(ollama_base_url: str, timeout: int = 5) -> Tuple[bool
         base_url = ollama_base_url.rstrip("/")
         health_url = f"{base_url}/api/tags"
 
-        response = requests.get(health_url, timeout=timeout)
+        response = http_client.get(health_url, "health", timeout=timeout)
 
         if response.status_code == 200:
             return True, "Connection successful"
@@ -225,7 +472,7 @@ def test_ollama_connection(ollama_base_url: str, timeout: int = 5) -> Tuple[bool
 
 
 def get_available_models(
-    ollama_base_url: str, timeout: int = 10
+    ollama_base_url: str, timeout: int = 10, max_age: float = None
 ) -> Tuple[bool, List[str], str]:
     """
     Get list of available models from Ollama server.
@@ -233,6 +480,8 @@ def get_available_models(
     Args:
         ollama_base_url: Ollama server base URL
         timeout: Request timeout in seconds
+        max_age: If set, reuse the availability monitor's model list when its
+            last successful probe is at most this many seconds old
 
     Returns:
         Tuple of (success: bool, models: List[str], error_message: str)
@@ -240,11 +489,18 @@ def get_available_models(
     if not ollama_base_url:
         return False, [], "No Ollama base URL provided"
 
+    if max_age is not None:
+        from services.ollama_monitor import cached_models
+
+        models = cached_models(ollama_base_url, max_age)
+        if models is not None:
+            return True, models, ""
+
     try:
         base_url = ollama_base_url.rstrip("/")
         models_url = f"{base_url}/api/tags"
 
-        response = requests.get(models_url, timeout=timeout)
+        response = http_client.get(models_url, "models", timeout=timeout)
 
         if response.status_code == 200:
             data = response.json()
@@ -297,8 +553,9 @@ def pull_model(
 
         payload = {"name": model_name, "stream": False}
 
-        response = requests.post(
+        response = http_client.post(
             pull_url,
+            "pull",
             json=payload,
             timeout=timeout,
             headers={"Content-Type": "application/json"},
@@ -349,8 +606,9 @@ def test_model_generate(
             "options": {"temperature": 0.1},
         }
 
-        response = requests.post(
+        response = http_client.post(
             base_url,
+            "generate",
             json=payload,
             timeout=timeout,
             headers={"Content-Type": "application/json"},
@@ -0,0 +1,174 @@
+import threading
+import time
+from typing import List, Optional
+
+from services.ollama import get_available_models
+
+_config = {
+    "interval": 30,
+    "failure_threshold": 3,
+    "open_seconds": 120,
+    "timeout": 2,
+}
+# Ollama base URL -> availability state
+_states = {}
+_lock = threading.Lock()
+
+
+def configure(
+    interval: float = 30,
+    failure_threshold: int = 3,
+    open_seconds: float = 120,
+    timeout: float = 2,
+) -> None:
+    """
+    Set how often Ollama is probed and when the circuit opens.
+
+    Args:
+        interval: Seconds before a cached result is considered stale
+        failure_threshold: Consecutive failed probes that open the circuit
+        open_seconds: Seconds to report Ollama down without probing once the
+            circuit is open
+        timeout: Timeout in seconds for each probe of /api/tags
+    """
+    with _lock:
+        _config.update(
+            interval=interval,
+            failure_threshold=failure_threshold,
+            open_seconds=open_seconds,
+            timeout=timeout,
+        )
+
+
+def _key(ollama_base_url: str) -> str:
+    return ollama_base_url.rstrip("/")
+
+
+def _new_state() -> dict:
+    return {
+        "available": None,  # None until the first probe finishes
+        "models": [],
+        "error": "",
+        "checked_at": None,
+        "consecutive_failures": 0,
+        "circuit_open_until": None,
+        "probing": False,
+    }
+
+
+def probe(ollama_base_url: str) -> dict:
+    """
+    Probe /api/tags now and record the result.
+
+    Args:
+        ollama_base_url: Ollama server base URL
+
+    Returns:
+        The updated availability state
+    """
+    key = _key(ollama_base_url)
+    success, models, error = get_available_models(key, timeout=_config["timeout"])
+    now = time.time()
+
+    with _lock:
+        state = _states.setdefault(key, _new_state())
+        state["checked_at"] = now
+        state["probing"] = False
+        state["available"] = success
+        state["error"] = error
+        if success:
+            state["models"] = models
+            state["consecutive_failures"] = 0
+            state["circuit_open_until"] = None
+        else:
+            state["consecutive_failures"] += 1
+            if state["consecutive_failures"] >= _config["failure_threshold"]:
+                state["circuit_open_until"] = now + _config["open_seconds"]
+        return dict(state)
+
+
+def _probe_in_background(ollama_base_url: str) -> None:
+    try:
+        probe(ollama_base_url)
+    except Exception as e:
+        with _lock:
+            state = _states[_key(ollama_base_url)]
+            state["probing"] = False
+            state["error"] = str(e)
+
+
+def get_status(ollama_base_url: str) -> dict:
+    """
+    Read the cached availability state without waiting on the network.
+
+    A stale state (older than the interval) starts one background probe and
+    is returned as is; the next read sees the fresh result. While the circuit
+    is open no probes are started.
+
+    Args:
+        ollama_base_url: Ollama server base URL
+
+    Returns:
+        Copy of the state: available (True/False, None if never probed),
+        models, error, checked_at, consecutive_failures, circuit_open_until
+    """
+    key = _key(ollama_base_url)
+    now = time.time()
+
+    with _lock:
+        state = _states.setdefault(key, _new_state())
+        circuit_open = bool(
+            state["circuit_open_until"] and now < state["circuit_open_until"]
+        )
+        stale = (
+            state["checked_at"] is None
+            or now - state["checked_at"] >= _config["interval"]
+        )
+        start_probe = stale and not circuit_open and not state["probing"]
+        if start_probe:
+            state["probing"] = True
+        status = dict(state)
+
+    if start_probe:
+        threading.Thread(
+            target=_probe_in_background,
+            args=(key,),
+            name="ollama-monitor",
+            daemon=True,
+        ).start()
+
+    status["circuit_open"] = circuit_open
+    return status
+
+
+def is_available(ollama_base_url: str) -> bool:
+    """
+    Whether request handlers should try Ollama.
+
+    Unknown state (no probe finished yet) counts as available so the first
+    page after startup still drafts; the draft deadline bounds the cost if
+    Ollama turns out to be down.
+    """
+    if not ollama_base_url:
+        return False
+
+    status = get_status(ollama_base_url)
+    if status["circuit_open"]:
+        return False
+    return status["available"] is not False
+
+
+def cached_models(ollama_base_url: str, max_age: float) -> Optional[List[str]]:
+    """
+    Model list from the last successful probe if it is recent enough.
+
+    Returns:
+        List of model names, or None when there is no fresh successful probe
+    """
+    with _lock:
+        state = _states.get(_key(ollama_base_url))
+        if not state or not state["available"] or state["checked_at"] is None:
+            return None
+        if time.time() - state["checked_at"] > max_age:
+            return None
+        return list(state["models"])
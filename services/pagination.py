@@ -0,0 +1,179 @@
+import base64
+import binascii
+import json
+import math
+from typing import List, Optional
+
+from sqlalchemy import tuple_
+
+from models import Guest
+
+
+class KeysetPagination:
+    """
+    One page of guests in (name, id) order, found by seeking from a cursor.
+
+    Mirrors the attributes of Flask-SQLAlchemy's Pagination that the
+    templates use (items, page, pages, total, has_prev, has_next), plus
+    prev_cursor and next_cursor for the links. page and pages are estimates
+    from the cached total; the rows themselves are always exact.
+    """
+
+    keyset = True
+
+    def __init__(
+        self,
+        items: List[Guest],
+        page: int,
+        per_page: int,
+        total: Optional[int],
+        has_prev: bool,
+        has_next: bool,
+    ):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+        self.has_prev = has_prev
+        self.has_next = has_next
+        self.prev_cursor = (
+            encode_cursor(items[0], "prev", page - 1) if has_prev and items else None
+        )
+        self.next_cursor = (
+            encode_cursor(items[-1], "next", page + 1) if has_next and items else None
+        )
+
+    @property
+    def pages(self) -> int:
+        pages = math.ceil((self.total or 0) / self.per_page) if self.per_page else 0
+        # The cached total can lag behind; never claim fewer pages than seen
+        return max(pages, self.page + (1 if self.has_next else 0))
+
+
+def encode_cursor(guest: Guest, direction: str, page: int) -> str:
+    """
+    Opaque cursor for the page before or after guest.
+
+    Args:
+        guest: First (direction "prev") or last ("next") guest on a page
+        direction: "prev" or "next"
+        page: Number of the page the cursor leads to, for display only
+
+    Returns:
+        URL-safe string for the cursor query parameter
+    """
+    payload = json.dumps(
+        {"k": [guest.name, guest.id], "d": direction, "p": page},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[dict]:
+    """
+    Parse a cursor from encode_cursor.
+
+    Returns:
+        Dict with name, id, direction and page, or None if the cursor is
+        missing or malformed (callers then start from the first page)
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        name, guest_id = payload["k"]
+        direction = payload["d"]
+        page = int(payload["p"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        return None
+    if (
+        direction not in ("prev", "next")
+        or not isinstance(name, str)
+        or not isinstance(guest_id, int)
+    ):
+        return None
+    return {"name": name, "id": guest_id, "direction": direction, "page": max(page, 1)}
+
+
+def keyset_paginate(
+    query,
+    per_page: int,
+    cursor: Optional[str] = None,
+    page: int = 1,
+    total: Optional[int] = None,
+) -> KeysetPagination:
+    """
+    Page through a Guest query in (name, id) order without OFFSET or COUNT.
+
+    Each page seeks to the row after (or before) the cursor with a
+    (name, id) row-value comparison, which the name and status/name indexes
+    answer directly, so any page costs about the same as the first. Without
+    a cursor, page > 1 (old ?page= links) falls back to OFFSET once; the
+    links on that page are cursors again.
+
+    Args:
+        query: Unordered Guest query, possibly filtered (e.g. by status)
+        per_page: Guests per page
+        cursor: Cursor from a previous page's prev_cursor or next_cursor
+        page: Page number to use when there is no cursor
+        total: Approximate number of matching guests (e.g. cached counts);
+            only used to show the page count
+
+    Returns:
+        KeysetPagination for the page
+    """
+    position = decode_cursor(cursor)
+    key = tuple_(Guest.name, Guest.id)
+
+    if position is None:
+        page = max(page, 1)
+        rows = (
+            query.order_by(Guest.name, Guest.id)
+            .offset((page - 1) * per_page)
+            .limit(per_page + 1)
+            .all()
+        )
+        return KeysetPagination(
+            rows[:per_page], page, per_page, total, page > 1, len(rows) > per_page
+        )
+
+    after = (position["name"], position["id"])
+    if position["direction"] == "next":
+        rows = (
+            query.filter(key > after)
+            .order_by(Guest.name, Guest.id)
+            .limit(per_page + 1)
+            .all()
+        )
+        if not rows:
+            # Nothing after the cursor any more (guests deleted); start over
+            return keyset_paginate(query, per_page, total=total)
+        return KeysetPagination(
+            rows[:per_page],
+            position["page"],
+            per_page,
+            total,
+            True,
+            len(rows) > per_page,
+        )
+
+    # Walk backwards from the cursor, then put the page back in order
+    rows = (
+        query.filter(key < after)
+        .order_by(Guest.name.desc(), Guest.id.desc())
+        .limit(per_page + 1)
+        .all()
+    )
+    if not rows:
+        return keyset_paginate(query, per_page, total=total)
+    has_prev = len(rows) > per_page
+    items = list(reversed(rows[:per_page]))
+    return KeysetPagination(
+        items,
+        position["page"] if has_prev else 1,
+        per_page,
+        total,
+        has_prev,
+        True,
+    )
@@ -0,0 +1,256 @@
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import delete, func, or_, select
+
+from models import db, Guest, DraftMessage, DraftFailure, Setting
+from services import draft_cache
+from services.ollama import generate_message, generate_messages_batch
+
+# Pause and last-run state live on the Setting row, so every web worker
+# reports what the worker running the scheduler is doing
+
+
+def is_paused() -> bool:
+    """Whether pre-generation is backing off from a saturated Ollama server."""
+    setting = Setting.query.first()
+    paused_until = setting.pregen_paused_until if setting else None
+    return paused_until is not None and paused_until > datetime.utcnow()
+
+
+def pause(seconds: float, reason: str) -> None:
+    """Stop drafting for a while so interactive requests get the server."""
+    setting = Setting.query.first()
+    if setting:
+        setting.pregen_paused_until = datetime.utcnow() + timedelta(seconds=seconds)
+        setting.pregen_pause_reason = reason
+        db.session.commit()
+
+
+def _cached_guest_ids(ollama_model: str, wedding_details: dict, ttl_hours: float):
+    cutoff = datetime.utcnow() - timedelta(hours=ttl_hours)
+    return select(DraftMessage.guest_id).where(
+        DraftMessage.ollama_model == ollama_model,
+        DraftMessage.settings_hash == draft_cache.wedding_details_hash(wedding_details),
+        DraftMessage.created_at >= cutoff,
+    )
+
+
+def next_guests(
+    ollama_model: str,
+    wedding_details: dict = None,
+    limit: int = 10,
+    ttl_hours: float = 168,
+    max_attempts: int = 3,
+    retry_minutes: float = 30,
+) -> list:
+    """
+    Guests that still need a draft, in the order the review page shows them.
+
+    Guests with a cached draft are done; guests that failed recently or too
+    often are skipped until they become eligible for a retry.
+    """
+    retry_cutoff = datetime.utcnow() - timedelta(minutes=retry_minutes)
+    backing_off = select(DraftFailure.guest_id).where(
+        or_(
+            DraftFailure.attempts >= max_attempts,
+            DraftFailure.failed_at > retry_cutoff,
+        )
+    )
+
+    return db.session.execute(
+        select(Guest.id, Guest.name)
+        .where(
+            Guest.status == "needs_address",
+            Guest.id.not_in(
+                _cached_guest_ids(ollama_model, wedding_details, ttl_hours)
+            ),
+            Guest.id.not_in(backing_off),
+        )
+        .order_by(Guest.name, Guest.id)
+        .limit(limit)
+    ).all()
+
+
+def _record_failure(guest_id: int, error: str) -> None:
+    failure = db.session.get(DraftFailure, guest_id)
+    if not failure:
+        failure = DraftFailure(guest_id=guest_id, attempts=0)
+        db.session.add(failure)
+    failure.attempts += 1
+    failure.last_error = error
+    failure.failed_at = datetime.utcnow()
+
+
+def run_batch(
+    ollama_base_url: str,
+    ollama_model: str,
+    wedding_details: dict = None,
+    first_name: Callable[[str], str] = None,
+    time_budget: float = 50,
+    batch_size: int = 10,
+    timeout: float = 30,
+    saturation_seconds: float = 20,
+    pause_seconds: float = 300,
+    max_attempts: int = 3,
+    retry_minutes: float = 30,
+    cache_max_entries: int = 5000,
+    cache_ttl_hours: float = 168,
+    prompt_batch_size: int = 1,
+) -> dict:
+    """
+    Draft messages for guests needing an address until the time budget runs out.
+
+    Progress is kept in the draft cache itself, so an interrupted run simply
+    continues where it left off. A draft that takes longer than
+    `saturation_seconds`, or two failures in a row, pause the queue for
+    `pause_seconds`. With `prompt_batch_size` above 1 several guests share one
+    Ollama request and the saturation check uses the time per guest.
+
+    Returns:
+        Dict with the number of drafts stored and failures in this run
+    """
+    result = {"drafted": 0, "failed": 0, "paused": False}
+    setting = Setting.query.first()
+    if setting:
+        setting.pregen_last_run_at = datetime.utcnow()
+        db.session.commit()
+
+    if is_paused():
+        result["paused"] = True
+        return result
+
+    first_name = first_name or (lambda name: name)
+    deadline = time.monotonic() + time_budget
+    consecutive_failures = 0
+
+    while time.monotonic() < deadline:
+        guests = next_guests(
+            ollama_model,
+            wedding_details,
+            limit=batch_size,
+            ttl_hours=cache_ttl_hours,
+            max_attempts=max_attempts,
+            retry_minutes=retry_minutes,
+        )
+        if not guests:
+            break
+
+        step = max(1, prompt_batch_size)
+        for start in range(0, len(guests), step):
+            if time.monotonic() >= deadline:
+                break
+
+            chunk = guests[start : start + step]
+            names = {guest.id: first_name(guest.name) for guest in chunk}
+            started = time.monotonic()
+            if step > 1:
+                generated = generate_messages_batch(
+                    list(names.values()),
+                    ollama_base_url,
+                    ollama_model,
+                    wedding_details,
+                    timeout,
+                )
+                drafted = {
+                    guest_id: generated.get(name) for guest_id, name in names.items()
+                }
+            else:
+                guest_id, name = next(iter(names.items()))
+                drafted = {
+                    guest_id: generate_message(
+                        name, ollama_base_url, ollama_model, wedding_details, timeout
+                    )
+                }
+            elapsed = (time.monotonic() - started) / len(chunk)
+
+            stored = {guest_id: msg for guest_id, msg in drafted.items() if msg}
+            if stored:
+                consecutive_failures = 0
+                db.session.execute(
+                    delete(DraftFailure).where(DraftFailure.guest_id.in_(list(stored)))
+                )
+                draft_cache.store_messages(
+                    stored,
+                    names,
+                    ollama_model,
+                    wedding_details,
+                    max_entries=cache_max_entries,
+                    ttl_hours=cache_ttl_hours,
+                )
+                result["drafted"] += len(stored)
+            else:
+                consecutive_failures += 1
+
+            missed = [guest_id for guest_id in drafted if guest_id not in stored]
+            for guest_id in missed:
+                _record_failure(guest_id, f"No draft after {elapsed:.1f}s")
+            if missed:
+                db.session.commit()
+                result["failed"] += len(missed)
+
+            if elapsed > saturation_seconds or consecutive_failures >= 2:
+                pause(pause_seconds, f"Ollama took {elapsed:.1f}s per draft")
+                result["paused"] = True
+                return result
+
+    return result
+
+
+def get_progress(
+    ollama_model: str,
+    wedding_details: dict = None,
+    ttl_hours: float = 168,
+    max_attempts: int = 3,
+    window_minutes: int = 10,
+) -> dict:
+    """
+    Report how far pre-generation has come for guests needing an address.
+
+    Returns:
+        Dict with done/pending/failed counts, recent throughput in drafts per
+        minute and whether the queue is currently paused
+    """
+    needs_address = Guest.status == "needs_address"
+    cached = Guest.id.in_(_cached_guest_ids(ollama_model, wedding_details, ttl_hours))
+
+    total = db.session.scalar(select(func.count(Guest.id)).where(needs_address))
+    done = db.session.scalar(select(func.count(Guest.id)).where(needs_address, cached))
+    failed = db.session.scalar(
+        select(func.count(Guest.id))
+        .join(DraftFailure, DraftFailure.guest_id == Guest.id)
+        .where(needs_address, ~cached, DraftFailure.attempts >= max_attempts)
+    )
+    recent = db.session.scalar(
+        select(func.count(DraftMessage.id)).where(
+            DraftMessage.created_at
+            >= datetime.utcnow() - timedelta(minutes=window_minutes)
+        )
+    )
+
+    setting = Setting.query.first()
+    paused_until = setting.pregen_paused_until if setting else None
+    pause_reason = setting.pregen_pause_reason if setting else None
+    last_run_at = setting.pregen_last_run_at if setting else None
+    paused = paused_until is not None and paused_until > datetime.utcnow()
+
+    return {
+        "total": total,
+        "done": done,
+        "failed": failed,
+        "pending": total - done - failed,
+        "drafts_per_minute": round(recent / window_minutes, 2),
+        "paused": paused,
+        "paused_until": paused_until.isoformat() if paused else None,
+        "pause_reason": pause_reason if paused else None,
+        "last_run_at": last_run_at.isoformat() if last_run_at else None,
+    }
+
+
+def reset_failures(guest_id: Optional[int] = None) -> None:
+    """Make failed guests eligible again (caller commits)."""
+    query = delete(DraftFailure)
+    if guest_id is not None:
+        query = query.where(DraftFailure.guest_id == guest_id)
+    db.session.execute(query)
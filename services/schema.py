@@ -0,0 +1,76 @@
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import inspect, select, text, update
+
+from models import db, Guest, normalize_name
+
+# Rows per UPDATE when backfilling a new column
+BACKFILL_CHUNK_SIZE = 1000
+
+
+def _backfill_name_normalized() -> int:
+    rows = db.session.execute(select(Guest.id, Guest.name)).all()
+    for start in range(0, len(rows), BACKFILL_CHUNK_SIZE):
+        db.session.execute(
+            update(Guest),
+            [
+                {"id": guest_id, "name_normalized": normalize_name(name)}
+                for guest_id, name in rows[start : start + BACKFILL_CHUNK_SIZE]
+            ],
+        )
+    return len(rows)
+
+
+# (table, column) -> function filling the column for existing rows
+BACKFILLS: Dict[Tuple[str, str], Callable[[], int]] = {
+    ("guests", "name_normalized"): _backfill_name_normalized,
+}
+
+
+def upgrade_schema() -> List[str]:
+    """
+    Bring an existing database up to date with the models.
+
+    db.create_all() only creates missing tables, so databases created by an
+    older version miss newer columns and indexes. Missing nullable columns
+    are added with ALTER TABLE and backfilled, then every index declared on
+    the models is created if it doesn't exist yet. Safe to run on every
+    start; call after db.create_all() inside an app context.
+
+    Returns:
+        Descriptions of the changes made (empty when already up to date)
+    """
+    engine = db.engine
+    inspector = inspect(engine)
+    changes = []
+
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            column_type = column.type.compile(dialect=engine.dialect)
+            db.session.execute(
+                text(
+                    f'ALTER TABLE "{table.name}" '
+                    f'ADD COLUMN "{column.name}" {column_type}'
+                )
+            )
+            changes.append(f"added column {table.name}.{column.name}")
+
+            backfill = BACKFILLS.get((table.name, column.name))
+            if backfill:
+                count = backfill()
+                changes.append(f"backfilled {count} {table.name}.{column.name}")
+        db.session.commit()
+
+        indexes = {index["name"] for index in inspect(engine).get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in indexes:
+                index.create(bind=engine)
+                changes.append(f"created index {index.name}")
+
+    return changes
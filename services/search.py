@@ -0,0 +1,201 @@
+import re
+from contextlib import contextmanager
+from typing import List, Optional
+
+from sqlalchemy import Float, Integer, or_, text
+from sqlalchemy.exc import OperationalError
+
+from models import db, Guest
+
+FTS_TABLE = "guests_fts"
+
+# Column weights for bm25(): a hit in the name outranks one in the notes,
+# which outranks one in the address. Set as the table's default rank function,
+# which FTS5 evaluates much faster than calling bm25() in the query.
+RANK_WEIGHTS = (10.0, 1.0, 2.0)  # name, address, note
+
+# External-content table: the index stores only terms, guests holds the text
+_CREATE_TABLE = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+    name, address, note,
+    content='guests', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+)
+"""
+
+# Triggers keep the index in step with every write path, ORM or Core
+_INSERT_TRIGGER, _DELETE_TRIGGER, _UPDATE_TRIGGER = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON guests BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, address, note)
+        VALUES (new.id, new.name, new.address, new.note);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON guests BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, address, note)
+        VALUES ('delete', old.id, old.name, old.address, old.note);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+    AFTER UPDATE OF name, address, note ON guests BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, address, note)
+        VALUES ('delete', old.id, old.name, old.address, old.note);
+        INSERT INTO {FTS_TABLE}(rowid, name, address, note)
+        VALUES (new.id, new.name, new.address, new.note);
+    END
+    """,
+]
+
+# None until this process has checked for the index (see is_available)
+_state = {"fts": None}
+
+
+def ensure_search_index() -> bool:
+    """
+    Create the FTS5 guest index and its triggers if they don't exist.
+
+    The index is rebuilt from the guests table when it is first created, so
+    existing databases are searchable straight away. Call after
+    db.create_all() inside an app context.
+
+    Returns:
+        True if full-text search is available; False on databases other than
+        SQLite or SQLite builds without FTS5, where search falls back to LIKE
+    """
+    _state["fts"] = False
+    if db.engine.dialect.name != "sqlite":
+        return False
+
+    try:
+        exists = db.session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FTS_TABLE},
+        ).first()
+        db.session.execute(text(_CREATE_TABLE))
+        for trigger in (_INSERT_TRIGGER, _DELETE_TRIGGER, _UPDATE_TRIGGER):
+            db.session.execute(text(trigger))
+        weights = ", ".join(str(weight) for weight in RANK_WEIGHTS)
+        db.session.execute(
+            text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('rank', :rank)"),
+            {"rank": f"bm25({weights})"},
+        )
+        if not exists:
+            db.session.execute(
+                text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+            )
+        db.session.commit()
+    except OperationalError as e:
+        db.session.rollback()
+        print(f"Full-text search unavailable, using LIKE: {e}")
+        return False
+
+    _state["fts"] = True
+    return True
+
+
+@contextmanager
+def replacing_all_guests():
+    """
+    Context for deleting every guest in one statement (CSV upload).
+
+    The delete trigger would remove each row from the index one at a time;
+    instead it is dropped for the duration and the index is emptied in one
+    step. Runs in the caller's transaction, so a rollback restores both.
+    """
+    if not is_available():
+        yield
+        return
+
+    db.session.execute(text(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad"))
+    try:
+        yield
+        db.session.execute(
+            text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')")
+        )
+    finally:
+        db.session.execute(text(_DELETE_TRIGGER))
+
+
+def is_available() -> bool:
+    """
+    Whether searches use the FTS5 index.
+
+    Processes that did not run ensure_search_index() (web workers started
+    after `flask init-db`) look the index up once, on first use.
+    """
+    if _state["fts"] is None:
+        _state["fts"] = db.engine.dialect.name == "sqlite" and (
+            db.session.execute(
+                text(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"
+                ),
+                {"name": FTS_TABLE},
+            ).first()
+            is not None
+        )
+    return _state["fts"]
+
+
+def _terms(search_text: str) -> List[str]:
+    return re.findall(r"\w+", search_text.lower())
+
+
+def fts_query(search_text: str) -> Optional[str]:
+    """
+    FTS5 MATCH expression for free-text input.
+
+    Every word must match the start of a term in the name, address or note,
+    so "jo smi" finds "John Smith". Words are quoted, so FTS5 operators and
+    punctuation in the input are treated as plain text.
+
+    Returns:
+        The expression, or None if the input has no searchable words
+    """
+    terms = _terms(search_text)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def apply_search(query, search_text: str):
+    """
+    Filter a Guest query to guests matching search_text, best matches first.
+
+    Args:
+        query: Guest query, possibly already filtered (e.g. by status)
+        search_text: Text typed into the search box
+
+    Returns:
+        The query filtered and ordered by rank (then name); ready to paginate
+    """
+    if not is_available():
+        pattern = f"%{search_text}%"
+        return query.filter(
+            or_(
+                Guest.name.ilike(pattern),
+                Guest.address.ilike(pattern),
+                Guest.note.ilike(pattern),
+            )
+        ).order_by(Guest.name)
+
+    expression = fts_query(search_text)
+    if expression is None:
+        return query.filter(db.false())
+
+    matches = (
+        text(
+            f"SELECT rowid AS guest_id, rank FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH :expression"
+        )
+        .bindparams(expression=expression)
+        .columns(guest_id=Integer, rank=Float)
+        .subquery("matches")
+    )
+    # "+ 0" stops SQLite from probing the index with rowid = guests.id, which
+    # with a status filter would re-run the MATCH once per guest; the join is
+    # always driven by the matches instead
+    return query.join(matches, Guest.id == matches.c.guest_id + 0).order_by(
+        matches.c.rank, Guest.name
+    )
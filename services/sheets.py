@@ -1,7 +1,82 @@
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import json
 import re
-import requests
-import pandas as pd
-from typing import Tuple, Optional
+import threading
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+
+from services import http_client
+from services.columns import detect_columns
+from services.classifier import SHEET_RULES
+
+# pandas is imported by the functions that parse sheets, so starting the app
+# (and every request that doesn't sync) doesn't pay for it
+if TYPE_CHECKING:
+    import pandas as pd
+
+# How sheet exports are parsed: "csv" uses the stdlib csv module and never
+# imports pandas, "pandas" builds a DataFrame with pandas.read_csv
+CSV_PARSERS = ("csv", "pandas")
+_config = {"csv_parser": "csv"}
+
+# Cells pandas.read_csv treats as missing by default; the csv parser blanks
+# the same ones so both parsers produce the same guests
+_NA_VALUES = frozenset(
+    [
+        "",
+        "#N/A",
+        "#N/A N/A",
+        "#NA",
+        "-1.#IND",
+        "-1.#QNAN",
+        "-NaN",
+        "-nan",
+        "1.#IND",
+        "1.#QNAN",
+        "<NA>",
+        "N/A",
+        "NA",
+        "NULL",
+        "NaN",
+        "None",
+        "n/a",
+        "nan",
+        "null",
+    ]
+)
+
+
+class SheetTable:
+    """A sheet export parsed by the csv parser: lowercase headers and rows."""
+
+    def __init__(self, columns: List[str], rows: List[List[str]]):
+        self.columns = columns
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+
+def configure(csv_parser: str = "csv") -> None:
+    """
+    Choose how sheet exports are parsed.
+
+    Args:
+        csv_parser: "csv" (stdlib, light on memory and startup) or "pandas"
+
+    Raises:
+        ValueError for an unknown parser
+    """
+    if csv_parser not in CSV_PARSERS:
+        raise ValueError(
+            f"Unknown CSV parser {csv_parser!r}, expected one of {CSV_PARSERS}"
+        )
+    _config["csv_parser"] = csv_parser
 
 
 def parse_public_url(public_url: str) -> Tuple[Optional[str], Optional[str]]:
@@ -35,194 +110,300 @@ def to_csv_url(spreadsheet_id: str, gid: str = "0") -> str:
     return f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/export?format=csv&gid={gid}"
 
 
-def fetch_csv_data(csv_url: str, timeout: int = 30) -> pd.DataFrame:
-    """Fetch CSV data from Google Sheets export URL and return as DataFrame."""
+def _parse_csv_text(
+    text: str, parser: Optional[str] = None
+) -> Union[pd.DataFrame, SheetTable]:
+    """
+    Parse CSV text with lowercase column names.
+
+    Args:
+        text: CSV export
+        parser: "csv" or "pandas"; defaults to the configured parser
+
+    Returns:
+        SheetTable from the csv parser, DataFrame from pandas
+    """
+    if (parser or _config["csv_parser"]) == "csv":
+        reader = csv.reader(io.StringIO(text))
+        columns = [column.lower().strip() for column in next(reader, [])]
+        # Blank lines are skipped, as pandas does
+        return SheetTable(columns, [row for row in reader if row])
+
+    import pandas as pd
+
+    df = pd.read_csv(io.StringIO(text))
+
+    # Normalize column names to lowercase
+    df.columns = df.columns.str.lower().str.strip()
+
+    return df
+
+
+def fetch_csv_data(csv_url: str, timeout: int = 30) -> Union[pd.DataFrame, SheetTable]:
+    """Fetch CSV data from Google Sheets export URL and parse it."""
     try:
-        response = requests.get(csv_url, timeout=timeout)
+        response = http_client.get(csv_url, "sheet", timeout=timeout)
         response.raise_for_status()
 
-        # Read CSV data into DataFrame
-        from io import StringIO
+        return _parse_csv_text(response.text)
+    except Exception as e:
+        raise Exception(f"Failed to fetch CSV data: {str(e)}")
+
+
+_fetch_stats = {
+    "fetches": 0,
+    "changed": 0,
+    "not_modified": 0,
+    "skipped_unchanged": 0,
+    "bytes_downloaded": 0,
+    "parse_seconds": 0.0,
+    "last_parse_seconds": None,
+    "last_fetch_at": None,
+    "last_result": None,
+}
+_fetch_lock = threading.Lock()
+
+
+def _record_fetch(result: str, downloaded: int = 0, parse_seconds: float = None):
+    with _fetch_lock:
+        _fetch_stats["fetches"] += 1
+        _fetch_stats[result] += 1
+        _fetch_stats["bytes_downloaded"] += downloaded
+        if parse_seconds is not None:
+            _fetch_stats["parse_seconds"] += parse_seconds
+            _fetch_stats["last_parse_seconds"] = round(parse_seconds, 4)
+        _fetch_stats["last_fetch_at"] = datetime.utcnow().isoformat()
+        _fetch_stats["last_result"] = result
+
+
+def fetch_csv_if_changed(
+    csv_url: str, previous: Optional[dict] = None, timeout: int = 30
+) -> Tuple[Optional[Union[pd.DataFrame, SheetTable]], dict]:
+    """
+    Fetch the CSV export only if it changed since the last applied sync.
 
-        csv_data = StringIO(response.text)
-        df = pd.read_csv(csv_data)
+    Sends If-None-Match/If-Modified-Since from the last applied fetch and,
+    since Google's export rarely honours them, also compares a SHA-256 of the
+    body before parsing anything.
 
-        # Normalize column names to lowercase
-        df.columns = df.columns.str.lower().str.strip()
+    Args:
+        csv_url: Google Sheets CSV export URL
+        previous: Validators saved for csv_url (see saved_fetch_state), or
+            None to fetch and parse unconditionally
+        timeout: Request timeout in seconds
 
-        return df
+    Returns:
+        Tuple of (parsed export, or None when unchanged; validators to pass
+        to save_fetch_state once the data has been applied)
+    """
+    previous = previous or {}
+    headers = {}
+    if previous.get("etag"):
+        headers["If-None-Match"] = previous["etag"]
+    if previous.get("last_modified"):
+        headers["If-Modified-Since"] = previous["last_modified"]
+
+    try:
+        response = http_client.get(csv_url, "sheet", timeout=timeout, headers=headers)
+        if response.status_code == 304 and previous:
+            _record_fetch("not_modified")
+            return None, previous
+        response.raise_for_status()
     except Exception as e:
         raise Exception(f"Failed to fetch CSV data: {str(e)}")
 
+    content = response.content
+    validators = {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "content_hash": hashlib.sha256(content).hexdigest(),
+    }
+    if previous and validators["content_hash"] == previous.get("content_hash"):
+        _record_fetch("skipped_unchanged", len(content))
+        return None, validators
+
+    started = time.perf_counter()
+    try:
+        df = _parse_csv_text(response.text)
+    except Exception as e:
+        raise Exception(f"Failed to fetch CSV data: {str(e)}")
+    _record_fetch("changed", len(content), time.perf_counter() - started)
+
+    return df, validators
+
+
+def saved_fetch_state(setting, csv_url: str) -> dict:
+    """
+    Validators of the last export applied from csv_url.
+
+    They live on the Setting row rather than in memory so every web worker
+    sees the same state, whichever one runs the sync or the upload.
+
+    Returns:
+        Validators for fetch_csv_if_changed, empty when none are saved
+    """
+    if setting is None or not setting.sheet_fetch_state:
+        return {}
+    try:
+        state = json.loads(setting.sheet_fetch_state)
+    except ValueError:
+        return {}
+    if state.get("csv_url") != csv_url:
+        return {}
+    return state.get("validators") or {}
+
+
+def save_fetch_state(setting, csv_url: str, validators: dict) -> None:
+    """Remember validators of an export that has been fully applied (caller commits)."""
+    setting.sheet_fetch_state = json.dumps(
+        {"csv_url": csv_url, "validators": validators}
+    )
+
+
+def clear_fetch_state(setting) -> None:
+    """Forget the applied export so the next fetch is applied in full (caller commits)."""
+    setting.sheet_fetch_state = None
+
+
+def get_fetch_stats() -> dict:
+    """Counters showing how many sheet fetches were parsed vs skipped."""
+    with _fetch_lock:
+        stats = dict(_fetch_stats)
+    stats["parse_seconds"] = round(stats["parse_seconds"], 4)
+    return stats
+
 
 def determine_guest_status(notes: str, address: str) -> str:
     """
     Intelligently determine guest status based on notes content and address.
     Returns: 'has_address', 'needs_address', 'requested', or 'not_on_fb'
     """
-    if not notes:
-        # No notes - use address to determine status
-        return "has_address" if address else "needs_address"
-
-    notes_lower = notes.lower()
-
-    # Check for "address requested" indicators FIRST (higher priority)
-    requested_patterns = [
-        "address requested",
-        "requested address",
-        "messaged",
-        "sent message",
-        "contacted",
-        "reached out",
-        "asked for address",
-        "request sent",
-        "waiting for address",
-        "pending address",
-        "awaiting response",
-        "message sent",
-        "facebook messaged",
-        "fb messaged",
-        "dm sent",
-        "direct message sent",
-        "sent dm",
-    ]
+    # "Address requested" notes outrank "not on facebook" ones; with no
+    # matching note the address decides
+    return SHEET_RULES.classify_one(notes, address)
 
-    for pattern in requested_patterns:
-        if pattern in notes_lower:
-            return "requested"
-
-    # Check for "not on facebook" indicators (lower priority)
-    not_on_fb_patterns = [
-        "no facebook",
-        "not on facebook",
-        "not on fb",
-        "no fb",
-        "facebook not found",
-        "fb not found",
-        "no social media",
-        "not found on facebook",
-        "no facebook match",
-        "no facebook account",
-        "doesnt have facebook",
-        "doesn't have facebook",
-        "not active on facebook",
-        "deactivated facebook",
-        "deleted facebook",
-    ]
 
-    for pattern in not_on_fb_patterns:
-        if pattern in notes_lower:
-            return "not_on_fb"
+def determine_guest_statuses(notes: pd.Series, addresses: pd.Series) -> pd.Series:
+    """
+    determine_guest_status for whole columns.
 
-    # If has address, mark as has_address
-    if address and address.strip():
-        return "has_address"
+    Args:
+        notes: Stripped notes, "" where missing
+        addresses: Stripped addresses, "" where missing
 
-    # Default to needs_address if no patterns match
-    return "needs_address"
+    Returns:
+        Series of statuses aligned with the inputs
+    """
+    import pandas as pd
 
+    statuses = SHEET_RULES.classify(notes.tolist(), addresses.tolist())
+    return pd.Series(statuses, index=notes.index)
 
-def process_guest_data(df: pd.DataFrame) -> list:
-    """
-    Process DataFrame to extract guest information.
-    Auto-detects columns for: Name (required), Address, Notes, facebook_profile
-    """
-    guests = []
 
-    # Make columns lowercase for easier matching
-    df.columns = df.columns.str.lower()
-
-    # Detect name column (required) - prioritize specific patterns
-    name_col = None
-    # Order matters - more specific patterns first
-    name_patterns = [
-        "wedding guest name",  # Most specific first
-        "guest name",
-        "full name",
-        "name",
-        "guest",  # Most generic last
-    ]
-    for pattern in name_patterns:
-        for col in df.columns:
-            if pattern in col:
-                name_col = col
-                break
-        if name_col:
-            break
+def _sheet_table_guests(table: SheetTable, detected: dict) -> list:
+    """process_guest_data for a SheetTable, in plain Python."""
+    indexes = {
+        key: table.columns.index(column) if column else None
+        for key, column in detected.items()
+    }
 
-    if not name_col:
-        raise ValueError(
-            "CSV must contain a column with 'name' or 'guest' in the header"
-        )
+    def cell(row, index):
+        if index is None or index >= len(row):
+            return ""
+        value = row[index]
+        return "" if value in _NA_VALUES else value.strip()
 
-    # Detect other columns (optional)
-    address_col = None
-    address_patterns = ["address", "mailing address", "street", "location"]
-    for col in df.columns:
-        for pattern in address_patterns:
-            if pattern in col:
-                address_col = col
-                break
-        if address_col:
-            break
-
-    notes_col = None
-    notes_patterns = ["notes", "note", "comments", "comment", "remarks"]
-    for col in df.columns:
-        for pattern in notes_patterns:
-            if pattern in col:
-                notes_col = col
-                break
-        if notes_col:
-            break
-
-    facebook_col = None
-    facebook_patterns = ["facebook", "fb", "social", "profile", "facebook_profile"]
-    for col in df.columns:
-        for pattern in facebook_patterns:
-            if pattern in col:
-                facebook_col = col
-                break
-        if facebook_col:
-            break
-
-    # Store detected fields for reporting
-    process_guest_data._name_field = name_col
-    process_guest_data._address_field = address_col
-    process_guest_data._notes_field = notes_col
-    process_guest_data._facebook_field = facebook_col
-
-    for _, row in df.iterrows():
-        name = str(row[name_col]).strip()
+    name_index = indexes["name"]
+    guests = []
+    for row_number, row in enumerate(table.rows, 1):
+        name = cell(row, name_index)
         if not name or name.lower() == "nan":
             continue
-
-        notes = (
-            str(row.get(notes_col, "")).strip()
-            if notes_col and pd.notna(row.get(notes_col))
-            else ""
-        )
-        address = (
-            str(row.get(address_col, "")).strip()
-            if address_col and pd.notna(row.get(address_col))
-            else ""
+        guests.append(
+            {
+                "name": name,
+                "address": cell(row, indexes["address"]),
+                "note": cell(row, indexes["notes"]),
+                "facebook_profile": cell(row, indexes["facebook"]),
+                # Position in the sheet, used to match rows on later syncs
+                "csv_row_number": row_number,
+            }
         )
 
-        guest = {
-            "name": name,
-            "address": address,
-            "note": notes,
-            "facebook_profile": (
-                str(row.get(facebook_col, "")).strip()
-                if facebook_col and pd.notna(row.get(facebook_col))
-                else ""
-            ),
-        }
-
-        # Smart status detection based on notes and address
-        status = determine_guest_status(notes, address)
+    statuses = SHEET_RULES.classify(
+        [guest["note"] for guest in guests], [guest["address"] for guest in guests]
+    )
+    for guest, status in zip(guests, statuses):
         guest["status"] = status
+    return guests
 
-        guests.append(guest)
 
-    return guests
+def process_guest_data(
+    df: Union[pd.DataFrame, SheetTable], mapping: Optional[Dict] = None
+) -> list:
+    """
+    Process a parsed sheet export to extract guest information.
+    Auto-detects columns for: Name (required), Address, Notes, facebook_profile
+
+    Both parsers give the same guests, except that the csv parser keeps cell
+    text as written where pandas would reformat numbers ("12" -> "12.0" in a
+    column with blanks).
+
+    Args:
+        df: Export from fetch_csv_data/fetch_csv_if_changed
+        mapping: Column mapping from services.columns for these headers;
+            detected when omitted
+    """
+    if isinstance(df, SheetTable):
+        columns = df.columns
+    else:
+        # Make columns lowercase for easier matching
+        df.columns = df.columns.str.lower()
+        columns = list(df.columns)
+
+    detected = mapping or detect_columns(columns)
+    name_col = detected["name"]
+    address_col = detected["address"]
+    notes_col = detected["notes"]
+    facebook_col = detected["facebook"]
+
+    if not name_col:
+        raise ValueError("CSV must contain a column with 'name' in the header")
+
+    if isinstance(df, SheetTable):
+        return _sheet_table_guests(df, detected)
+
+    import numpy as np
+    import pandas as pd
+
+    def text_column(col):
+        # Missing cells and missing columns become "", everything else is
+        # stripped text
+        if not col:
+            return pd.Series("", index=df.index)
+        values = df[col]
+        return values.astype(str).str.strip().where(values.notna(), "")
+
+    names = text_column(name_col)
+    guests = pd.DataFrame(
+        {
+            "name": names,
+            "address": text_column(address_col),
+            "note": text_column(notes_col),
+            "facebook_profile": text_column(facebook_col),
+            # Position in the sheet, used to match rows on later syncs
+            "csv_row_number": np.arange(1, len(df) + 1),
+        },
+        index=df.index,
+    )
+    guests = guests[(names != "") & (names.str.lower() != "nan")]
+
+    # Smart status detection based on notes and address
+    guests["status"] = determine_guest_statuses(guests["note"], guests["address"])
+
+    # Zipping plain column lists is much cheaper than DataFrame.to_dict
+    columns = list(guests.columns)
+    return [
+        dict(zip(columns, values))
+        for values in zip(*(guests[column].tolist() for column in columns))
+    ]
@@ -0,0 +1,186 @@
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import func, select, update
+
+from models import db, Guest, Setting
+
+# Guest status -> key in the dashboard stats
+STATUS_KEYS = {
+    "has_address": "with_address",
+    "needs_address": "needs_address",
+    "requested": "requested",
+    "not_on_fb": "not_on_fb",
+}
+
+_config = {"ttl": 60}
+# {"counts": {...}, "computed_at": float, "generation": int} once computed
+_cache = {}
+_stats = {
+    "queries": 0,
+    "hits": 0,
+    "adjustments": 0,
+    "invalidations": 0,
+    "remote_changes": 0,
+}
+_lock = threading.Lock()
+
+
+def configure(ttl: float = 60) -> None:
+    """
+    Set how long cached counts are served before being recomputed.
+
+    Edits reported through adjust() and invalidate() keep the cache exact in
+    every worker; the TTL bounds how stale it can get when scripts or other
+    tools change guests.
+
+    Args:
+        ttl: Seconds before cached counts expire (0 disables caching)
+    """
+    with _lock:
+        _config["ttl"] = ttl
+
+
+def _query_counts() -> dict:
+    counts = {key: 0 for key in STATUS_KEYS.values()}
+    total = 0
+    rows = db.session.query(Guest.status, func.count(Guest.id)).group_by(Guest.status)
+    for status, count in rows:
+        total += count
+        key = STATUS_KEYS.get(status)
+        if key:
+            counts[key] += count
+    counts["total"] = total
+    return counts
+
+
+def _generation() -> Optional[int]:
+    """Shared stats generation (None until the settings row exists)."""
+    return db.session.execute(select(Setting.stats_generation).limit(1)).scalar()
+
+
+def _bump_generation() -> Optional[int]:
+    """Tell every worker its cached counts are stale; returns the new value."""
+    db.session.execute(
+        update(Setting).values(
+            stats_generation=func.coalesce(Setting.stats_generation, 0) + 1,
+            # Not a settings change
+            updated_at=Setting.updated_at,
+        )
+    )
+    generation = _generation()
+    db.session.commit()
+    return generation
+
+
+def guest_counts(max_age: Optional[float] = None) -> dict:
+    """
+    Guest counts per status for the dashboard, from one GROUP BY query.
+
+    Cached counts are reused while they are younger than max_age and no
+    worker has changed guests since (Setting.stats_generation, one primary
+    key lookup).
+
+    Args:
+        max_age: Recompute if the cached counts are older than this many
+            seconds (defaults to the configured TTL)
+
+    Returns:
+        Dict with total, with_address, needs_address, requested and not_on_fb
+    """
+    max_age = _config["ttl"] if max_age is None else max_age
+    with _lock:
+        fresh = bool(_cache) and time.time() - _cache["computed_at"] < max_age
+
+    # Read before counting, so a change made during the count is seen next time
+    generation = _generation()
+    if fresh:
+        with _lock:
+            if _cache and _cache["generation"] == generation:
+                _stats["hits"] += 1
+                return dict(_cache["counts"])
+            _stats["remote_changes"] += 1
+
+    counts = _query_counts()
+    with _lock:
+        _cache.update(counts=counts, computed_at=time.time(), generation=generation)
+        _stats["queries"] += 1
+    return dict(counts)
+
+
+def status_count(status: Optional[str] = None) -> Optional[int]:
+    """
+    Cached number of guests with a status, for page counts.
+
+    Args:
+        status: Guest status; None or "all" for every guest
+
+    Returns:
+        The count, or None for a status the dashboard doesn't count
+    """
+    counts = guest_counts()
+    if status is None or status == "all":
+        return counts["total"]
+    key = STATUS_KEYS.get(status)
+    return counts[key] if key else None
+
+
+def adjust(old_status: Optional[str], new_status: Optional[str]) -> None:
+    """
+    Update cached counts after one guest changed status; call after commit.
+
+    Other workers recount on their next request.
+
+    Args:
+        old_status: Status before the change (None for a new guest)
+        new_status: Status after the change (None for a deleted guest)
+    """
+    if old_status == new_status:
+        return
+
+    generation = _bump_generation()
+    with _lock:
+        if not _cache:
+            return
+        # Another worker changed guests since these counts were taken
+        if generation is not None and _cache["generation"] != generation - 1:
+            _cache.clear()
+            _stats["remote_changes"] += 1
+            return
+        # An unknown status can't be placed in a bucket, so recount instead
+        if any(
+            status is not None and status not in STATUS_KEYS
+            for status in (old_status, new_status)
+        ):
+            _cache.clear()
+            _stats["invalidations"] += 1
+            return
+
+        counts = _cache["counts"]
+        if old_status is not None:
+            counts[STATUS_KEYS[old_status]] -= 1
+        else:
+            counts["total"] += 1
+        if new_status is not None:
+            counts[STATUS_KEYS[new_status]] += 1
+        else:
+            counts["total"] -= 1
+        _cache["generation"] = generation
+        _stats["adjustments"] += 1
+
+
+def invalidate() -> None:
+    """Drop cached counts in every worker after bulk changes (sync, upload)."""
+    _bump_generation()
+    with _lock:
+        _cache.clear()
+        _stats["invalidations"] += 1
+
+
+def get_stats() -> dict:
+    """Cache hit, query and adjustment counters."""
+    with _lock:
+        stats = dict(_stats)
+        stats["cached"] = bool(_cache)
+    return stats
@@ -0,0 +1,178 @@
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from sqlalchemy import delete, update
+
+from models import db, Guest, ActionLog, DraftMessage, DraftFailure, normalize_name
+from services.ingest import bulk_insert_guests
+from services.sheets import determine_guest_status
+
+# Fields the sheet owns; empty sheet cells never overwrite values edited in the app
+SHEET_FIELDS = ("address", "note", "facebook_profile")
+
+# Keep IN (...) lists under SQLite's bound parameter limit
+DELETE_CHUNK_SIZE = 500
+
+# A guest and an unmatched row at its sheet position are the same person
+# renamed (a typo fix, an added surname) only if their names score at least
+# this (rapidfuzz token_set_ratio, 0-100); otherwise someone else took the
+# row and the old guest is deleted
+RENAME_SIMILARITY = 80
+
+
+def _match_rows(
+    existing: List[Guest], rows: List[dict]
+) -> Tuple[List[Tuple[Guest, dict]], List[dict], List[Guest]]:
+    """
+    Pair incoming sheet rows with existing guests.
+
+    Rows are matched by normalized name first (preferring the guest with the
+    same csv_row_number when a name appears more than once), then leftover
+    rows and guests that share a csv_row_number are paired when their names
+    are similar, which keeps a guest renamed in place in the sheet. A
+    different name at the same position is a delete plus an insert, so the
+    new person never inherits the old guest's data or history.
+
+    Row numbers are only refreshed with other changes, so after rows are
+    inserted or removed above them several leftover guests can hold the same
+    stale number; a row then goes to the most similar of them.
+
+    Returns:
+        Tuple of (matched pairs, rows to insert, guests to delete)
+    """
+    by_name = defaultdict(list)
+    for guest in existing:
+        by_name[normalize_name(guest.name)].append(guest)
+
+    matched = []
+    unmatched_rows = []
+    for row in rows:
+        candidates = by_name.get(normalize_name(row["name"]))
+        if not candidates:
+            unmatched_rows.append(row)
+            continue
+
+        guest = next(
+            (g for g in candidates if g.csv_row_number == row.get("csv_row_number")),
+            candidates[0],
+        )
+        candidates.remove(guest)
+        matched.append((guest, row))
+
+    leftover = defaultdict(list)
+    for candidates in by_name.values():
+        for guest in candidates:
+            if guest.csv_row_number is not None:
+                leftover[guest.csv_row_number].append(guest)
+
+    inserts = []
+    if unmatched_rows and leftover:
+        # Imported only when there are renames to check
+        from rapidfuzz import fuzz
+
+    for row in unmatched_rows:
+        name = normalize_name(row["name"])
+        guests = leftover.get(row.get("csv_row_number"), [])
+        scored = [
+            (fuzz.token_set_ratio(normalize_name(guest.name), name), guest)
+            for guest in guests
+        ]
+        score, guest = max(scored, key=lambda pair: pair[0], default=(0, None))
+        if score >= RENAME_SIMILARITY:
+            guests.remove(guest)
+            matched.append((guest, row))
+        else:
+            inserts.append(row)
+
+    matched_ids = {guest.id for guest, _ in matched}
+    deletes = [guest for guest in existing if guest.id not in matched_ids]
+    return matched, inserts, deletes
+
+
+def _changes_for(guest: Guest, row: dict) -> Dict[str, object]:
+    """Column values that differ between a guest and its sheet row."""
+    changes = {}
+
+    if row["name"] != guest.name:
+        changes["name"] = row["name"]
+        changes["name_normalized"] = normalize_name(row["name"])
+
+    for field in SHEET_FIELDS:
+        value = row.get(field) or ""
+        if value and value != (getattr(guest, field) or ""):
+            changes[field] = value
+
+    # Keep manually set statuses unless the data they were based on changed
+    if "address" in changes or "note" in changes:
+        status = determine_guest_status(
+            changes.get("note", guest.note or ""),
+            changes.get("address", guest.address or ""),
+        )
+        if status != guest.status:
+            changes["status"] = status
+
+    # Inserting or removing a sheet row shifts every row below it; only
+    # rewrite the row number alongside a real change so a shift isn't a
+    # rewrite of the whole table
+    row_number = row.get("csv_row_number")
+    if row_number != guest.csv_row_number and (changes or guest.csv_row_number is None):
+        changes["csv_row_number"] = row_number
+
+    return changes
+
+
+def sync_guests(rows: List[dict]) -> dict:
+    """
+    Apply sheet rows to the guests table, touching only rows that changed.
+
+    Guest ids, action history and manual edits of matched guests are kept.
+    Guests missing from the sheet are deleted together with their action
+    logs and cached drafts. The caller commits.
+
+    Args:
+        rows: Guest dicts from process_guest_data (with csv_row_number)
+
+    Returns:
+        Summary dict with inserted/updated/deleted/unchanged counts, the
+        number of rows in the sheet and the time taken
+    """
+    started = time.perf_counter()
+    existing = Guest.query.all()
+    matched, inserts, deletes = _match_rows(existing, rows)
+
+    updates = []
+    for guest, row in matched:
+        changes = _changes_for(guest, row)
+        if changes:
+            updates.append({"id": guest.id, **changes})
+
+    if inserts:
+        bulk_insert_guests(
+            {
+                **row,
+                "status": row.get("status")
+                or determine_guest_status(row.get("note", ""), row.get("address", "")),
+            }
+            for row in inserts
+        )
+
+    if updates:
+        db.session.execute(update(Guest), updates)
+
+    delete_ids = [guest.id for guest in deletes]
+    for start in range(0, len(delete_ids), DELETE_CHUNK_SIZE):
+        chunk = delete_ids[start : start + DELETE_CHUNK_SIZE]
+        db.session.execute(delete(ActionLog).where(ActionLog.guest_id.in_(chunk)))
+        db.session.execute(delete(DraftMessage).where(DraftMessage.guest_id.in_(chunk)))
+        db.session.execute(delete(DraftFailure).where(DraftFailure.guest_id.in_(chunk)))
+        db.session.execute(delete(Guest).where(Guest.id.in_(chunk)))
+
+    return {
+        "total": len(rows),
+        "inserted": len(inserts),
+        "updated": len(updates),
+        "deleted": len(delete_ids),
+        "unchanged": len(matched) - len(updates),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
@@ -0,0 +1,91 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: one process per machine is assumed
+    fcntl = None
+
+# {"path": str, "file": open lock file} while this process holds the lock
+_state = {}
+_lock = threading.Lock()
+
+
+def acquire_leader(path: str) -> bool:
+    """
+    Try to become the one process on this machine that runs background jobs.
+
+    Every web worker imports the app, so without this each would start its
+    own scheduler and sheet syncs would run once per worker. The first
+    process to take an exclusive flock on path wins and keeps the file open
+    for its lifetime; the OS releases the lock when it exits, so a restarted
+    worker can take over. Never blocks.
+
+    Args:
+        path: Lock file shared by all workers (created if missing)
+
+    Returns:
+        True if this process holds the lock (already held counts)
+    """
+    with _lock:
+        if _state:
+            return True
+        if fcntl is None:
+            _state.update(path=path, file=None)
+            return True
+
+        lock_file = open(path, "a+")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+
+        # Record the holder for anyone inspecting the file
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(f"{os.getpid()}\n")
+        lock_file.flush()
+        _state.update(path=path, file=lock_file)
+        return True
+
+
+def release_leader() -> None:
+    """Give up the lock so another process can take over."""
+    with _lock:
+        lock_file = _state.get("file")
+        if lock_file is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+        _state.clear()
+
+
+def leader_lock_path() -> Optional[str]:
+    """Lock file path if this process runs the background jobs, else None."""
+    with _lock:
+        return _state.get("path")
+
+
+@contextmanager
+def exclusive(path: str):
+    """
+    Run a block in one process at a time, waiting for the others to finish.
+
+    Used for startup work every worker does on import (creating tables,
+    upgrading the schema), which races when several workers start at once.
+
+    Args:
+        path: Lock file shared by all workers (created if missing)
+    """
+    if fcntl is None:
+        yield
+        return
+
+    with open(path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
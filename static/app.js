@@ -50,6 +50,96 @@ function copyAndOpenMessenger(button, messengerLink) {
     });
 }
 
+// Throw away the cached draft and ask for a fresh message
+async function regenerateMessage(button, guestId) {
+    const messageContainer = button.closest('.mb-4');
+    const textarea = messageContainer.querySelector('.message-text');
+    const originalText = button.textContent;
+
+    button.disabled = true;
+    button.textContent = 'Drafting...';
+
+    try {
+        const response = await fetch(`/regenerate-message/${guestId}`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            }
+        });
+
+        const data = await response.json();
+
+        if (data.success) {
+            textarea.value = data.message;
+        } else {
+            alert(`Error: ${data.error}`);
+        }
+    } catch (error) {
+        alert('Failed to regenerate message');
+    } finally {
+        button.disabled = false;
+        button.textContent = originalText;
+    }
+}
+
+// Fill in drafts as they stream from /review/stream
+function streamDrafts(url) {
+    const source = new EventSource(url);
+
+    source.onmessage = (event) => {
+        const data = JSON.parse(event.data);
+        const textarea = document.getElementById(`message-${data.guest_id}`);
+        if (!textarea) return;
+
+        if (data.type === 'token') {
+            textarea.value += data.text;
+        } else if (data.type === 'done') {
+            textarea.value = data.message;
+        }
+    };
+
+    source.addEventListener('end', () => source.close());
+
+    // Don't let EventSource reconnect and redraft the whole page
+    source.onerror = () => source.close();
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    const guestList = document.getElementById('guest-list');
+    if (guestList && guestList.dataset.streamUrl) {
+        streamDrafts(guestList.dataset.streamUrl);
+    }
+});
+
+// Keep dashboard counts current from /dashboard-stats
+async function refreshDashboardStats(url) {
+    try {
+        const response = await fetch(url);
+        if (!response.ok) return;
+        const stats = await response.json();
+        document.querySelectorAll('[data-stat]').forEach((element) => {
+            const value = stats[element.dataset.stat];
+            if (value !== undefined) element.textContent = value;
+        });
+    } catch (error) {
+        // Keep showing the last counts until the next poll
+    }
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    const statsGrid = document.getElementById('dashboard-stats');
+    if (!statsGrid) return;
+
+    const url = statsGrid.dataset.statsUrl;
+    setInterval(() => {
+        if (!document.hidden) refreshDashboardStats(url);
+    }, 30000);
+    // Pick up changes made in another tab as soon as this one is shown again
+    document.addEventListener('visibilitychange', () => {
+        if (!document.hidden) refreshDashboardStats(url);
+    });
+});
+
 // Edit address functionality
 function editAddress(guestId) {
     const displayDiv = document.getElementById(`address-display-${guestId}`);
@@ -0,0 +1,28 @@
+"""
+Header detection in services.columns: each field takes its best scoring
+header, and weak matches never become the guest name.
+"""
+
+from services.columns import detect_columns
+
+
+def test_specific_headers_win():
+    mapping = detect_columns(
+        ["Guest Tag", "Wedding Guest Name(s)", "Email Address", "Address", "Notes"]
+    )
+    assert mapping["name"] == "Wedding Guest Name(s)"
+    assert mapping["address"] == "Address"
+    assert mapping["notes"] == "Notes"
+
+
+def test_name_header_is_detected():
+    assert detect_columns(["Name", "Address"])["name"] == "Name"
+
+
+def test_bare_guest_header_is_not_the_name():
+    assert detect_columns(["Guest", "Address"])["name"] is None
+    assert detect_columns(["Guests", "Address"])["name"] is None
+
+
+def test_emergency_contact_is_not_the_name():
+    assert detect_columns(["Emergency Contact", "Notes"])["name"] is None
@@ -0,0 +1,40 @@
+"""
+Importing the app must stay cheap: no pandas, numpy or rapidfuzz, and no
+database work. See scripts/bench_startup.py for timings.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+HEAVY = ("pandas", "numpy", "rapidfuzz")
+
+
+def test_import_app_skips_heavy_modules_and_database(tmp_path):
+    database = tmp_path / "startup.db"
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{database}",
+        SCHEDULER_LOCK_FILE=str(tmp_path / "scheduler.lock"),
+    )
+    # A fresh interpreter, since this one may already have loaded them
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import json, sys, app; "
+            "print(json.dumps(sorted({m.split('.')[0] for m in sys.modules})))",
+        ],
+        cwd=ROOT,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+    loaded = set(json.loads(output.strip().splitlines()[-1]))
+    assert not loaded & set(HEAVY)
+    assert not database.exists()
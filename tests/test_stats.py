@@ -0,0 +1,62 @@
+"""
+Dashboard counts in services.stats stay cached under several workers: a
+worker's own edits adjust its cache, and edits from other workers (seen as
+a bumped Setting.stats_generation) trigger a recount.
+"""
+
+import pytest
+from flask import Flask
+from sqlalchemy import update
+
+from models import Guest, Setting, db
+from services import stats
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'stats.db'}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        db.session.add(Setting())
+        db.session.add_all(
+            Guest(name=f"Guest {i}", status="needs_address") for i in range(3)
+        )
+        db.session.commit()
+        stats.configure(ttl=60)
+        stats.invalidate()
+        yield app
+        db.session.remove()
+
+
+def test_own_edit_keeps_cache(app):
+    assert stats.guest_counts()["needs_address"] == 3
+    queries = stats.get_stats()["queries"]
+
+    guest = Guest.query.first()
+    guest.status = "has_address"
+    db.session.commit()
+    stats.adjust("needs_address", "has_address")
+
+    counts = stats.guest_counts()
+    assert counts["with_address"] == 1
+    assert counts["needs_address"] == 2
+    assert stats.get_stats()["queries"] == queries
+
+
+def test_edit_in_other_worker_recounts(app):
+    assert stats.guest_counts()["total"] == 3
+    queries = stats.get_stats()["queries"]
+
+    # What adjust() does in another process: commit, then bump the generation
+    db.session.add(Guest(name="Late Guest", status="requested"))
+    db.session.execute(
+        update(Setting).values(stats_generation=Setting.stats_generation + 1)
+    )
+    db.session.commit()
+
+    counts = stats.guest_counts()
+    assert counts["total"] == 4
+    assert counts["requested"] == 1
+    assert stats.get_stats()["queries"] == queries + 1
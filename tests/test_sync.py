@@ -0,0 +1,86 @@
+"""
+Sheet sync in services.sync: only rows that changed are written, renames in
+place keep the guest, and a different person never takes over a guest.
+"""
+
+import pytest
+from flask import Flask
+
+from models import Guest, db
+from services import sync
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'sync.db'}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+def rows_for(names):
+    return [
+        {
+            "name": name,
+            "address": f"{name} Street",
+            "note": "",
+            "facebook_profile": "",
+            "csv_row_number": i,
+        }
+        for i, name in enumerate(names, start=1)
+    ]
+
+
+def apply(names):
+    summary = sync.sync_guests(rows_for(names))
+    db.session.commit()
+    return summary
+
+
+def test_row_inserted_at_top_only_inserts(app):
+    names = [f"Guest {i}" for i in range(200)]
+    apply(names)
+
+    summary = apply(["New Guest"] + names)
+
+    assert summary["inserted"] == 1
+    assert summary["updated"] == 0
+    assert summary["deleted"] == 0
+    assert summary["unchanged"] == 200
+
+
+def test_rename_in_place_keeps_guest(app):
+    apply(["Jane Doe", "Bob Smith"])
+    jane = Guest.query.filter_by(name="Jane Doe").one()
+
+    summary = apply(["Jane Doe Smith", "Bob Smith"])
+
+    assert summary["updated"] == 1
+    assert summary["inserted"] == 0
+    assert db.session.get(Guest, jane.id).name == "Jane Doe Smith"
+
+
+def test_rename_after_shift_keeps_guest(app):
+    apply(["Jane Doe", "Bob Smith"])
+    apply(["New Guest", "Jane Doe", "Bob Smith"])
+    bob = Guest.query.filter_by(name="Bob Smith").one()
+
+    # Bob's stored row number (2) is stale and now also held by New Guest
+    summary = apply(["New Guest", "Bobby Smith", "Jane Doe"])
+
+    assert summary["deleted"] == 0
+    assert db.session.get(Guest, bob.id).name == "Bobby Smith"
+
+
+def test_different_person_in_row_replaces_guest(app):
+    apply(["Jane Doe", "Bob Smith"])
+    jane = Guest.query.filter_by(name="Jane Doe").one()
+
+    summary = apply(["Alice Brown", "Bob Smith"])
+
+    assert summary["inserted"] == 1
+    assert summary["deleted"] == 1
+    assert db.session.get(Guest, jane.id) is None